@@ -1,5 +1,6 @@
 """Base agent class with common functionality."""
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional, Type
 
@@ -12,6 +13,10 @@ from utils import llm_client, get_logger
 
 logger = get_logger(__name__)
 
+# Separator lines for agent start/end logs
+_BAR = "=" * 60
+_BAR_END = _BAR + "\n"
+
 
 class BaseAgent(ABC):
     """Base class for all agents in the workflow."""
@@ -24,6 +29,17 @@ class BaseAgent(ABC):
         """
         self.agent_name = agent_name
         self.llm = llm_client
+        # Availability only changes if credentials change; see refresh_availability()
+        self._llm_available = self.llm.is_available()
+
+    def refresh_availability(self) -> bool:
+        """Re-check LLM availability, e.g. after credentials were rotated.
+
+        Returns:
+            True if the LLM client is available
+        """
+        self._llm_available = self.llm.is_available()
+        return self._llm_available
 
     @abstractmethod
     def execute(self, state: BrandIntelligenceState) -> BrandIntelligenceState:
@@ -39,11 +55,25 @@ class BaseAgent(ABC):
         """
         pass
 
+    async def execute_async(self, state: BrandIntelligenceState) -> BrandIntelligenceState:
+        """Execute the agent's task without blocking the event loop.
+
+        The default implementation runs execute() in a worker thread.
+        Agents with async I/O can override this with a native coroutine.
+
+        Args:
+            state: Current workflow state
+
+        Returns:
+            Updated workflow state
+        """
+        return await asyncio.to_thread(self.execute, state)
+
     def _log_start(self) -> None:
         """Log agent execution start."""
-        logger.info(f"{'='*60}")
-        logger.info(f"Starting {self.agent_name}")
-        logger.info(f"{'='*60}")
+        logger.info(_BAR)
+        logger.info("Starting %s", self.agent_name)
+        logger.info(_BAR)
 
     def _log_end(self, success: bool = True) -> None:
         """Log agent execution end.
@@ -51,9 +81,8 @@ class BaseAgent(ABC):
         Args:
             success: Whether execution was successful
         """
-        status = "Completed" if success else "Failed"
-        logger.info(f"{self.agent_name} {status}")
-        logger.info(f"{'='*60}\n")
+        logger.info("%s %s", self.agent_name, "Completed" if success else "Failed")
+        logger.info(_BAR_END)
 
     def _add_error(self, state: BrandIntelligenceState, error_msg: str) -> None:
         """Add an error to the state.
@@ -62,9 +91,7 @@ class BaseAgent(ABC):
             state: Current workflow state
             error_msg: Error message to add
         """
-        if "errors" not in state:
-            state["errors"] = []
-        state["errors"].append({
+        state.setdefault("errors", []).append({
             "agent": self.agent_name,
             "error": error_msg
         })
@@ -99,6 +126,4 @@ class BaseAgent(ABC):
             # Validation failed — store original data and record warning.
             state[key] = data
             if warnings:
-                if "errors" not in state:
-                    state["errors"] = []
-                state["errors"].append(warnings)
+                state.setdefault("errors", []).append(warnings)
@@ -1,16 +1,400 @@
 """Categorization agent - classifies industries, products, and market positioning."""
 
 import json
-from typing import Dict, Any
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Sequence
 from agents.base_agent import BaseAgent
 from models.state import BrandIntelligenceState
 from config.prompts import CATEGORIZATION_PROMPT
 from models.output_models import CategorizationOutput
 from utils.logger import get_logger
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
 logger = get_logger(__name__)
 
 
+# Keyword tables are built once at import time and are read-only.
+
+# Industry classification based on keywords (English-only with underscores).
+# Order matters: when several industries match, the first one listed wins.
+_INDUSTRY_KEYWORDS = MappingProxyType({
+    "ride_hailing": {
+        "keywords": ("تاکسی", "taxi", "ride", "snapp", "tap30"),
+        "industry": {"name_en": "Transportation_&_Mobility", "category_l1": "Technology_Services", "category_l2": "On-Demand_Platforms", "category_l3": "Ride-Hailing", "isic_code": "4931"},
+        "business_model": "B2C",
+        "price_tier": "mid"
+    },
+    "food_delivery": {
+        "keywords": ("سفارش غذا", "food delivery", "restaurant", "snappfood"),
+        "industry": {"name_en": "Food_Delivery_Services", "category_l1": "Technology_Services", "category_l2": "On-Demand_Platforms", "category_l3": "Food_Delivery", "isic_code": "5610"},
+        "business_model": "B2C",
+        "price_tier": "mid"
+    },
+    "insurance_technology": {
+        "keywords": ("بیمه", "insurance", "bimeh"),
+        "industry": {"name_en": "Insurance_Technology", "category_l1": "Financial_Services", "category_l2": "Insurance", "category_l3": "Health_&_Auto_Insurance", "isic_code": "6512"},
+        "business_model": "B2C",
+        "price_tier": "varied"
+    },
+    "fintech_payments": {
+        "keywords": ("پرداخت", "payment", "wallet", "کیف پول", "pay"),
+        "industry": {"name_en": "Financial_Technology", "category_l1": "Financial_Services", "category_l2": "Fintech", "category_l3": "Digital_Payments", "isic_code": "6419"},
+        "business_model": "B2C",
+        "price_tier": "mid"
+    },
+    "telemedicine": {
+        "keywords": ("دکتر", "doctor", "مشاوره پزشکی", "medical consultation"),
+        "industry": {"name_en": "Healthcare_Technology", "category_l1": "Healthcare_&_Life_Sciences", "category_l2": "Digital_Health", "category_l3": "Telemedicine", "isic_code": "8610"},
+        "business_model": "B2C",
+        "price_tier": "mid"
+    },
+    "mental_health_counseling": {
+        "keywords": ("مشاوره روانشناسی", "مشاوره", "روانشناس", "روانشناسی", "سلامت روان", "counseling", "psychologist", "psychology", "mental health", "therapy", "therapist"),
+        "industry": {"name_en": "Healthcare_&_Medical_Services", "name_fa": "خدمات بهداشت و درمان", "category_l1": "Healthcare_Services", "category_l2": "Mental_Health_Services", "category_l3": "Online_Counseling_Platforms", "isic_code": "8690"},
+        "business_model": "B2C",
+        "price_tier": "mid"
+    },
+    "travel_technology": {
+        "keywords": ("سفر", "travel", "هتل", "hotel", "flight", "پرواز"),
+        "industry": {"name_en": "Travel_Technology", "category_l1": "Technology_Services", "category_l2": "Travel_&_Hospitality", "category_l3": "Online_Travel_Booking", "isic_code": "7911"},
+        "business_model": "B2C",
+        "price_tier": "mid"
+    },
+    "logistics_delivery": {
+        "keywords": ("ارسال", "delivery", "logistics", "لجستیک", "box", "باکس"),
+        "industry": {"name_en": "Logistics_&_Delivery", "category_l1": "Transportation_&_Logistics", "category_l2": "Last-Mile_Delivery", "category_l3": "Package_Delivery", "isic_code": "5320"},
+        "business_model": "B2B_and_B2C",
+        "price_tier": "mid"
+    },
+    "online_grocery": {
+        "keywords": ("سوپرمارکت", "supermarket", "grocery", "مواد غذایی", "market"),
+        "industry": {"name_en": "E-Commerce_Grocery", "category_l1": "Consumer_Services", "category_l2": "E-Commerce", "category_l3": "Online_Grocery", "isic_code": "4711"},
+        "business_model": "B2C",
+        "price_tier": "mid"
+    },
+    "cleaning_products": {
+        "keywords": ("ظرفشویی", "شوینده", "تاژ", "تمیزکننده", "dishwashing", "cleaner", "detergent", "tage"),
+        "industry": {"name_en": "Cleaning_Products", "category_l1": "Consumer_Goods", "category_l2": "Home_Care", "category_l3": "Dishwashing_&_Surface_Cleaners", "isic_code": "2023"},
+        "business_model": "B2C",
+        "price_tier": "mid"
+    },
+    "laundry_care": {
+        "keywords": ("لباسشویی", "laundry", "persil", "پرسیل"),
+        "industry": {"name_en": "Laundry_Care", "category_l1": "Consumer_Goods", "category_l2": "Home_Care", "category_l3": "Laundry_Detergents", "isic_code": "2023"},
+        "business_model": "B2C",
+        "price_tier": "mid_to_premium"
+    },
+    "confectionery_macaron": {
+        "keywords": ("ماکارون", "شیرینی", "بیسکویت", "macaron", "بیسکویت", "کوکی", "cookie", "زر", "zar"),
+        "industry": {"name_en": "Confectionery_&_Biscuits", "category_l1": "Food_&_Beverage", "category_l2": "Sweet_Snacks", "category_l3": "Macarons_&_Cookies", "isic_code": "1073"},
+        "business_model": "B2C",
+        "price_tier": "economy_to_mid"
+    },
+    "chocolate_manufacturing": {
+        "keywords": ("شکلات", "chocolate"),
+        "industry": {"name_en": "Chocolate_Manufacturing", "category_l1": "Food_&_Beverage", "category_l2": "Sweet_Snacks", "category_l3": "Chocolate_Products", "isic_code": "1082"},
+        "business_model": "B2C",
+        "price_tier": "mid"
+    },
+    "pharmaceutical_biotech": {
+        "keywords": ("دارو", "داروسازی", "بیوتکنولوژی", "زیست", "سلول", "pharma", "biotech", "medicine", "drug", "biopharmaceutical", "orchid", "cinnagen"),
+        "industry": {"name_en": "Pharmaceutical_&_Biotechnology", "category_l1": "Healthcare_&_Life_Sciences", "category_l2": "Biopharmaceuticals", "category_l3": "Biosimilar_Drugs", "isic_code": "2100"},
+        "business_model": "B2B_and_B2C",
+        "price_tier": "premium"
+    },
+    "industrial_manufacturing": {
+        "keywords": ("صنعتی", "تولید", "manufacturing", "industrial"),
+        "industry": {"name_en": "Industrial_Manufacturing", "category_l1": "Manufacturing", "category_l2": "General_Manufacturing", "category_l3": "Industrial_Products", "isic_code": "2500"},
+        "business_model": "B2B",
+        "price_tier": "mid"
+    }
+})
+
+# Target audience keywords; every matching audience is reported
+_AUDIENCE_KEYWORDS = MappingProxyType({
+    "families": ("خانواده", "کودک", "family", "kids"),
+    "urban_professionals": ("شهری", "شاغل", "آنلاین", "urban", "professional"),
+    "women": ("بانوان", "زنان", "women"),
+    "youth": ("جوان", "نوجوان", "youth", "teen")
+})
+
+# Distribution channel keywords
+_CHANNEL_KEYWORDS = MappingProxyType({
+    "online": ("آنلاین", "online"),
+    "retail": ("فروشگاه", "store")
+})
+
+
+# Prompt size limits for the brand data sent to the LLM
+_PROMPT_TOKEN_BUDGET = 8000
+_MAX_DEPTH = 4
+_MAX_LIST_ITEMS = 10
+_MAX_STR_CHARS = 500
+
+# Fields that help categorization; contact details, links, raw HTML and
+# scraper bookkeeping (notes, manual search URLs) are left out of the prompt
+_WEB_SEARCH_FIELDS = (
+    "brand_name", "website_url", "page_title", "meta_data", "headings",
+    "about_us", "content_summary", "products_services", "social_media"
+)
+_PARENT_COMPANY_FIELDS = ("name", "name_fa", "industry")
+_SISTER_BRAND_FIELDS = ("name", "industry", "industry_category", "business_model")
+_LINKA_FIELDS = ("instagram_handle", "social_media")
+_CODAL_FIELDS = (
+    "company_name", "symbol", "revenue", "profit", "assets",
+    "liabilities", "equity", "fiscal_year"
+)
+# Structured data keys come from LLM extraction, so drop known noise instead
+_STRUCTURED_EXCLUDED = ("contact_info", "sources_used")
+_WEBSITE_INFO_EXCLUDED = ("internal_links",)
+
+
+def _project(data: Optional[Dict[str, Any]], fields: Sequence[str]) -> Dict[str, Any]:
+    """Keep only the given fields of a dict (empty dict for missing data)."""
+    if not data:
+        return {}
+    return {k: data[k] for k in fields if k in data}
+
+
+def _project_relationships(relationships: Dict[str, Any]) -> Dict[str, Any]:
+    """Project relationship data to the fields categorization uses."""
+    return {
+        "parent_company": _project(relationships.get("parent_company"), _PARENT_COMPANY_FIELDS),
+        "sister_brands": [
+            _project(sister, _SISTER_BRAND_FIELDS)
+            for sister in relationships.get("sister_brands") or []
+        ],
+    }
+
+
+def _project_structured(structured: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop contact details and bookkeeping from structured brand data."""
+    projected = {k: v for k, v in structured.items() if k not in _STRUCTURED_EXCLUDED}
+    if isinstance(projected.get("website_info"), dict):
+        projected["website_info"] = {
+            k: v for k, v in projected["website_info"].items()
+            if k not in _WEBSITE_INFO_EXCLUDED
+        }
+    return projected
+
+
+def _summarize_for_prompt(
+    obj: Any,
+    max_depth: int = _MAX_DEPTH,
+    max_list: int = _MAX_LIST_ITEMS,
+    max_str: int = _MAX_STR_CHARS
+) -> Any:
+    """Trim data for a prompt: drop empty values, cap lists, strings and depth.
+
+    Args:
+        obj: Data to summarize
+        max_depth: Nesting levels kept below obj; deeper containers are dropped
+        max_list: Maximum items kept per list
+        max_str: Maximum characters kept per string
+
+    Returns:
+        Trimmed copy of obj (None if nothing is left)
+    """
+    if isinstance(obj, str):
+        return obj if len(obj) <= max_str else obj[:max_str] + "..."
+
+    if isinstance(obj, dict):
+        if max_depth <= 0:
+            return None
+        summary = {}
+        for key, value in obj.items():
+            value = _summarize_for_prompt(value, max_depth - 1, max_list, max_str)
+            if value not in (None, "", [], {}):
+                summary[key] = value
+        return summary or None
+
+    if isinstance(obj, (list, tuple)):
+        if max_depth <= 0:
+            return None
+        summary = []
+        for item in obj[:max_list]:
+            item = _summarize_for_prompt(item, max_depth - 1, max_list, max_str)
+            if item not in (None, "", [], {}):
+                summary.append(item)
+        return summary or None
+
+    return obj
+
+
+@lru_cache(maxsize=1)
+def _get_token_encoding():
+    """Load the cl100k_base encoding on first use (it may need to be downloaded).
+
+    Returns:
+        The tiktoken encoding, or None if tiktoken or the encoding is unavailable
+    """
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable, estimating token counts: {e}")
+        return None
+
+
+def _count_tokens(text: str) -> int:
+    """Count prompt tokens (estimated at ~4 characters per token without tiktoken)."""
+    encoding = _get_token_encoding()
+    if encoding is not None:
+        # Scraped text may contain special-token strings; count them as plain text
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def _dumps_pretty(data: Any) -> str:
+    """Serialize data as indented, non-ASCII-escaped JSON for prompts."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # Unsupported type or integer beyond 64 bits; stdlib handles the latter
+            pass
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def _normalize_text(text: str) -> str:
+    """Normalize text for keyword matching (NFC + casefold)."""
+    # is_normalized() is a C-level quick check; most scraped text is already NFC
+    if not unicodedata.is_normalized("NFC", text):
+        text = unicodedata.normalize("NFC", text)
+    return text.casefold()
+
+
+class _KeywordMatcher:
+    """Match named keyword groups against a text in a single pass.
+
+    Uses an Aho-Corasick automaton when pyahocorasick is installed and falls
+    back to one precompiled regex alternation per group otherwise. Groups
+    are ranked by the insertion order of the mapping they were built from.
+    """
+
+    def __init__(self, groups: Mapping[str, Sequence[str]]):
+        self.names = list(groups)
+        self._groups = [
+            tuple(_normalize_text(keyword) for keyword in keywords)
+            for keywords in groups.values()
+        ]
+        self._automaton = None
+        self._patterns = None
+
+        if AHOCORASICK_AVAILABLE:
+            # A keyword may belong to several groups, so store all their ranks
+            ranks_by_keyword = defaultdict(set)
+            for rank, keywords in enumerate(self._groups):
+                for keyword in keywords:
+                    ranks_by_keyword[keyword].add(rank)
+
+            automaton = ahocorasick.Automaton()
+            for keyword, ranks in ranks_by_keyword.items():
+                automaton.add_word(keyword, tuple(sorted(ranks)))
+            automaton.make_automaton()
+            self._automaton = automaton
+        else:
+            # One C-level scan per group instead of a Python loop over keywords
+            self._patterns = [
+                re.compile("|".join(re.escape(keyword) for keyword in keywords))
+                for keywords in self._groups
+            ]
+
+    def _matched_ranks(self, text: str) -> set:
+        if self._automaton is not None:
+            ranks = set()
+            for _, group_ranks in self._automaton.iter(text):
+                ranks.update(group_ranks)
+            return ranks
+
+        return {
+            rank for rank, pattern in enumerate(self._patterns)
+            if pattern.search(text)
+        }
+
+    def match_all(self, text: str) -> List[str]:
+        """Return the names of all groups matching text, in rank order."""
+        return [self.names[rank] for rank in sorted(self._matched_ranks(text))]
+
+    def match_first(self, text: str) -> Optional[str]:
+        """Return the name of the highest-priority group matching text."""
+        if self._patterns is not None:
+            # Groups are checked in rank order, so stop at the first hit
+            for rank, pattern in enumerate(self._patterns):
+                if pattern.search(text):
+                    return self.names[rank]
+            return None
+
+        ranks = self._matched_ranks(text)
+        return self.names[min(ranks)] if ranks else None
+
+
+_SYSTEM_PROMPT = "You are an industry categorization specialist for Iranian brands."
+
+_STATIC_PROMPT = f"""{CATEGORIZATION_PROMPT}
+
+Analyze the following brand data and provide comprehensive categorization."""
+
+# Compiled once at import time and shared by all agent instances
+_INDUSTRY_MATCHER = _KeywordMatcher(
+    {key: data["keywords"] for key, data in _INDUSTRY_KEYWORDS.items()}
+)
+_AUDIENCE_MATCHER = _KeywordMatcher(_AUDIENCE_KEYWORDS)
+_CHANNEL_MATCHER = _KeywordMatcher(_CHANNEL_KEYWORDS)
+
+
+def _new_categorization() -> Dict[str, Any]:
+    """Return an empty rule-based categorization with default values."""
+    return {
+        "primary_industry": {},
+        "sub_industries": [],
+        "product_categories": [],
+        "business_model": "B2C",
+        "price_tier": "mid",
+        "target_audiences": [],
+        "distribution_channels": [],
+        "market_position": {}
+    }
+
+
+def _match_industry(text_idx: str) -> Optional[str]:
+    """Return the highest-priority industry key found in normalized text."""
+    return _INDUSTRY_MATCHER.match_first(text_idx)
+
+
+def _match_audiences(text_idx: str) -> List[str]:
+    """Return all target audiences found in normalized text."""
+    return _AUDIENCE_MATCHER.match_all(text_idx)
+
+
+def _match_channels(text_idx: str) -> List[str]:
+    """Return all distribution channels found in normalized text."""
+    return _CHANNEL_MATCHER.match_all(text_idx)
+
+
 class CategorizationAgent(BaseAgent):
     """Agent responsible for categorizing brands across multiple dimensions."""
 
@@ -67,46 +451,18 @@ class CategorizationAgent(BaseAgent):
             Dictionary containing categorization data
         """
         # Try LLM if available
-        if self.llm.is_available():
+        if self._llm_available:
             try:
-                # Prepare data for categorization
-                analysis_input = self._prepare_categorization_data(
-                    brand_name,
-                    raw_data,
-                    relationships
-                )
+                messages = self._build_messages(brand_name, raw_data, relationships)
 
                 logger.info("Categorizing brand using LLM...")
 
-                # Use LLM to categorize
-                prompt = f"""Analyze the following brand data and provide comprehensive categorization.
-
-Brand: {brand_name}
-
-{analysis_input}
-
-{CATEGORIZATION_PROMPT}"""
-
                 response = self.llm.generate(
-                    prompt=prompt,
-                    system_prompt="You are an industry categorization specialist for Iranian brands.",
+                    messages=messages,
                     json_mode=True
                 )
 
-                categorization = json.loads(response)
-                logger.info("[OK] Successfully categorized brand")
-
-                # Log key categorizations
-                if categorization.get("primary_industry"):
-                    logger.info(f"  Industry: {categorization['primary_industry'].get('name_fa', 'N/A')}")
-
-                if categorization.get("business_model"):
-                    logger.info(f"  Model: {categorization['business_model']}")
-
-                if categorization.get("price_tier"):
-                    logger.info(f"  Tier: {categorization['price_tier']}")
-
-                return categorization
+                return self._parse_llm_response(response)
 
             except Exception as e:
                 logger.error(f"LLM categorization failed: {e}")
@@ -115,6 +471,69 @@ Brand: {brand_name}
         logger.info("Using rule-based categorization...")
         return self._rule_based_categorization(brand_name, raw_data, relationships)
 
+    def _build_messages(
+        self,
+        brand_name: str,
+        raw_data: Dict[str, Any],
+        relationships: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Build the categorization messages for the LLM.
+
+        The system prompt and instructions are byte-identical across brands
+        and form a cacheable prefix; brand data goes in a trailing message.
+
+        Args:
+            brand_name: Name of the brand
+            raw_data: Raw and structured data
+            relationships: Relationship data
+
+        Returns:
+            Chat messages for llm.generate(messages=...)
+        """
+        # Prepare data for categorization
+        analysis_input = self._prepare_categorization_data(
+            brand_name,
+            raw_data,
+            relationships
+        )
+
+        return [
+            {"role": "system", "content": _SYSTEM_PROMPT, "cache": True},
+            {"role": "user", "content": _STATIC_PROMPT, "cache": True},
+            {"role": "user", "content": f"Brand: {brand_name}\n\n{analysis_input}"},
+        ]
+
+    def _parse_llm_response(self, response: str) -> Dict[str, Any]:
+        """Parse and validate the LLM categorization response.
+
+        Args:
+            response: JSON text returned by the LLM
+
+        Returns:
+            Dictionary containing categorization data
+
+        Raises:
+            pydantic.ValidationError: If the response is not valid categorization JSON
+        """
+        # Parse and validate in a single pass (raises on malformed output)
+        categorization = CategorizationOutput.model_validate_json(
+            response
+        ).model_dump(mode="python")
+        logger.info("[OK] Successfully categorized brand")
+
+        # Log key categorizations (skipped entirely when INFO is disabled)
+        if logger.isEnabledFor(logging.INFO):
+            if categorization.get("primary_industry"):
+                logger.info("  Industry: %s", categorization["primary_industry"].get("name_fa", "N/A"))
+
+            if categorization.get("business_model"):
+                logger.info("  Model: %s", categorization["business_model"])
+
+            if categorization.get("price_tier"):
+                logger.info("  Tier: %s", categorization["price_tier"])
+
+        return categorization
+
     def _rule_based_categorization(
         self,
         brand_name: str,
@@ -131,203 +550,37 @@ Brand: {brand_name}
         Returns:
             Categorization data
         """
-        categorization = {
-            "primary_industry": {},
-            "sub_industries": [],
-            "product_categories": [],
-            "business_model": "B2C",
-            "price_tier": "mid",
-            "target_audiences": [],
-            "distribution_channels": [],
-            "market_position": {}
-        }
-
-        # PRIORITY 1: Check if we have category from knowledge base via relationships
-        sister_brands = relationships.get("sister_brands", [])
-        if sister_brands:
-            # Use category from first sister brand (they share same parent, likely same industry)
-            for sister in sister_brands:
-                if sister.get("industry_category"):
-                    categorization["primary_industry"] = sister["industry_category"]
-                    categorization["business_model"] = sister.get("business_model", "B2C")
-                    logger.info(f"[Rule] Using category from knowledge base: {sister['industry_category'].get('name_en', 'N/A')}")
-                    return categorization
-
-        # Check parent company for industry info
-        parent = relationships.get("parent_company", {})
-        if parent.get("industry"):
-            # Map industry string to category structure
-            industry_name = parent.get("industry", "")
-            if "Healthcare" in industry_name or "Mental" in industry_name:
-                categorization["primary_industry"] = {
-                    "name_en": "Healthcare_&_Medical_Services",
-                    "name_fa": "خدمات بهداشت و درمان",
-                    "isic_code": "8690",
-                    "category_level_1": "Healthcare_Services",
-                    "category_level_2": "Mental_Health_Services",
-                    "category_level_3": "Online_Counseling_Platforms"
-                }
-                categorization["business_model"] = "B2C"
-                logger.info(f"[Rule] Using category from parent company: Healthcare Services")
+        # PRIORITY 1: Knowledge-base signals settle the category outright,
+        # so the keyword work below is skipped entirely
+        for resolver in (self._from_sister_brands, self._from_parent_company):
+            categorization = resolver(relationships)
+            if categorization is not None:
                 return categorization
 
         # PRIORITY 2: Keyword-based matching from website content
         # Extract website description and title
         structured = raw_data.get("structured", {})
         website_info = structured.get("website_info") or {}
-        title = (website_info.get("title") or "").lower()
-        description = (website_info.get("meta_description") or "").lower()
-        brand_lower = (brand_name or "").lower()
-
-        # Combine text for keyword matching
-        combined_text = f"{title} {description} {brand_lower}"
-
-        # Industry classification based on keywords (English-only with underscores)
-        industry_keywords = {
-            "ride_hailing": {
-                "keywords": ["تاکسی", "taxi", "ride", "snapp", "tap30"],
-                "industry": {"name_en": "Transportation_&_Mobility", "category_l1": "Technology_Services", "category_l2": "On-Demand_Platforms", "category_l3": "Ride-Hailing", "isic_code": "4931"},
-                "business_model": "B2C",
-                "price_tier": "mid"
-            },
-            "food_delivery": {
-                "keywords": ["سفارش غذا", "food delivery", "restaurant", "snappfood"],
-                "industry": {"name_en": "Food_Delivery_Services", "category_l1": "Technology_Services", "category_l2": "On-Demand_Platforms", "category_l3": "Food_Delivery", "isic_code": "5610"},
-                "business_model": "B2C",
-                "price_tier": "mid"
-            },
-            "insurance_technology": {
-                "keywords": ["بیمه", "insurance", "bimeh"],
-                "industry": {"name_en": "Insurance_Technology", "category_l1": "Financial_Services", "category_l2": "Insurance", "category_l3": "Health_&_Auto_Insurance", "isic_code": "6512"},
-                "business_model": "B2C",
-                "price_tier": "varied"
-            },
-            "fintech_payments": {
-                "keywords": ["پرداخت", "payment", "wallet", "کیف پول", "pay"],
-                "industry": {"name_en": "Financial_Technology", "category_l1": "Financial_Services", "category_l2": "Fintech", "category_l3": "Digital_Payments", "isic_code": "6419"},
-                "business_model": "B2C",
-                "price_tier": "mid"
-            },
-            "telemedicine": {
-                "keywords": ["دکتر", "doctor", "مشاوره پزشکی", "medical consultation"],
-                "industry": {"name_en": "Healthcare_Technology", "category_l1": "Healthcare_&_Life_Sciences", "category_l2": "Digital_Health", "category_l3": "Telemedicine", "isic_code": "8610"},
-                "business_model": "B2C",
-                "price_tier": "mid"
-            },
-            "mental_health_counseling": {
-                "keywords": ["مشاوره روانشناسی", "مشاوره", "روانشناس", "روانشناسی", "سلامت روان", "counseling", "psychologist", "psychology", "mental health", "therapy", "therapist"],
-                "industry": {"name_en": "Healthcare_&_Medical_Services", "name_fa": "خدمات بهداشت و درمان", "category_l1": "Healthcare_Services", "category_l2": "Mental_Health_Services", "category_l3": "Online_Counseling_Platforms", "isic_code": "8690"},
-                "business_model": "B2C",
-                "price_tier": "mid"
-            },
-            "travel_technology": {
-                "keywords": ["سفر", "travel", "هتل", "hotel", "flight", "پرواز"],
-                "industry": {"name_en": "Travel_Technology", "category_l1": "Technology_Services", "category_l2": "Travel_&_Hospitality", "category_l3": "Online_Travel_Booking", "isic_code": "7911"},
-                "business_model": "B2C",
-                "price_tier": "mid"
-            },
-            "logistics_delivery": {
-                "keywords": ["ارسال", "delivery", "logistics", "لجستیک", "box", "باکس"],
-                "industry": {"name_en": "Logistics_&_Delivery", "category_l1": "Transportation_&_Logistics", "category_l2": "Last-Mile_Delivery", "category_l3": "Package_Delivery", "isic_code": "5320"},
-                "business_model": "B2B_and_B2C",
-                "price_tier": "mid"
-            },
-            "online_grocery": {
-                "keywords": ["سوپرمارکت", "supermarket", "grocery", "مواد غذایی", "market"],
-                "industry": {"name_en": "E-Commerce_Grocery", "category_l1": "Consumer_Services", "category_l2": "E-Commerce", "category_l3": "Online_Grocery", "isic_code": "4711"},
-                "business_model": "B2C",
-                "price_tier": "mid"
-            },
-            "cleaning_products": {
-                "keywords": ["ظرفشویی", "شوینده", "تاژ", "تمیزکننده", "dishwashing", "cleaner", "detergent", "tage"],
-                "industry": {"name_en": "Cleaning_Products", "category_l1": "Consumer_Goods", "category_l2": "Home_Care", "category_l3": "Dishwashing_&_Surface_Cleaners", "isic_code": "2023"},
-                "business_model": "B2C",
-                "price_tier": "mid"
-            },
-            "laundry_care": {
-                "keywords": ["لباسشویی", "laundry", "persil", "پرسیل"],
-                "industry": {"name_en": "Laundry_Care", "category_l1": "Consumer_Goods", "category_l2": "Home_Care", "category_l3": "Laundry_Detergents", "isic_code": "2023"},
-                "business_model": "B2C",
-                "price_tier": "mid_to_premium"
-            },
-            "confectionery_macaron": {
-                "keywords": ["ماکارون", "شیرینی", "بیسکویت", "macaron", "بیسکویت", "کوکی", "cookie", "زر", "zar"],
-                "industry": {"name_en": "Confectionery_&_Biscuits", "category_l1": "Food_&_Beverage", "category_l2": "Sweet_Snacks", "category_l3": "Macarons_&_Cookies", "isic_code": "1073"},
-                "business_model": "B2C",
-                "price_tier": "economy_to_mid"
-            },
-            "chocolate_manufacturing": {
-                "keywords": ["شکلات", "chocolate"],
-                "industry": {"name_en": "Chocolate_Manufacturing", "category_l1": "Food_&_Beverage", "category_l2": "Sweet_Snacks", "category_l3": "Chocolate_Products", "isic_code": "1082"},
-                "business_model": "B2C",
-                "price_tier": "mid"
-            },
-            "pharmaceutical_biotech": {
-                "keywords": ["دارو", "داروسازی", "بیوتکنولوژی", "زیست", "سلول", "pharma", "biotech", "medicine", "drug", "biopharmaceutical", "orchid", "cinnagen"],
-                "industry": {"name_en": "Pharmaceutical_&_Biotechnology", "category_l1": "Healthcare_&_Life_Sciences", "category_l2": "Biopharmaceuticals", "category_l3": "Biosimilar_Drugs", "isic_code": "2100"},
-                "business_model": "B2B_and_B2C",
-                "price_tier": "premium"
-            },
-            "industrial_manufacturing": {
-                "keywords": ["صنعتی", "تولید", "manufacturing", "industrial"],
-                "industry": {"name_en": "Industrial_Manufacturing", "category_l1": "Manufacturing", "category_l2": "General_Manufacturing", "category_l3": "Industrial_Products", "isic_code": "2500"},
-                "business_model": "B2B",
-                "price_tier": "mid"
-            }
-        }
+        title = website_info.get("title") or ""
+        description = website_info.get("meta_description") or ""
 
-        # Match industry
-        for industry_key, industry_data in industry_keywords.items():
-            for keyword in industry_data["keywords"]:
-                if keyword in combined_text:
-                    industry_info = industry_data["industry"]
-                    categorization["primary_industry"] = {
-                        "name_en": industry_info.get("name_en", "Unknown"),
-                        "name_fa": "",  # Empty per user request (English-only)
-                        "isic_code": industry_info.get("isic_code", ""),
-                        "category_level_1": industry_info.get("category_l1", "Unknown"),
-                        "category_level_2": industry_info.get("category_l2", "Unknown"),
-                        "category_level_3": industry_info.get("category_l3", "Unknown")
-                    }
-                    categorization["business_model"] = industry_data["business_model"]
-                    categorization["price_tier"] = industry_data["price_tier"]
-                    logger.info(f"[Rule] دسته‌بندی: {industry_key}")
-                    logger.info(f"[Rule] Levels: {industry_info.get('category_l1')} → {industry_info.get('category_l2')} → {industry_info.get('category_l3')}")
-                    break
-            if categorization["primary_industry"]:
-                break
-
-        # Use parent company industry if available
-        if not categorization["primary_industry"] and relationships.get("parent_company"):
-            parent_industry = relationships["parent_company"].get("industry")
-            if parent_industry:
-                categorization["primary_industry"] = {
-                    "name_en": parent_industry,
-                    "name_fa": parent_industry,
-                    "source": "parent_company"
-                }
-                logger.info(f"[Rule] Used parent industry: {parent_industry}")
+        # Normalize the searchable text once and share it across all matchers
+        text_idx = _normalize_text(" ".join((title, description, brand_name or "")))
 
-        # Determine target audience based on text
-        audience_keywords = {
-            "families": ["خانواده", "کودک", "family", "kids"],
-            "urban_professionals": ["شهری", "شاغل", "آنلاین", "urban", "professional"],
-            "women": ["بانوان", "زنان", "women"],
-            "youth": ["جوان", "نوجوان", "youth", "teen"]
-        }
+        categorization = _new_categorization()
 
-        for audience, keywords in audience_keywords.items():
-            if any(kw in combined_text for kw in keywords):
-                categorization["target_audiences"].append(audience)
+        # Match industry, else use parent company industry if available
+        industry = self._from_keywords(text_idx) or self._from_parent_fallback(relationships)
+        if industry:
+            categorization.update(industry)
 
+        # Determine target audience based on text
+        categorization["target_audiences"] = _match_audiences(text_idx)
         if not categorization["target_audiences"]:
             categorization["target_audiences"] = ["general_public"]
 
         # Distribution channels
-        if "آنلاین" in combined_text or "online" in combined_text:
-            categorization["distribution_channels"].append("online")
-        if "فروشگاه" in combined_text or "store" in combined_text:
-            categorization["distribution_channels"].append("retail")
+        categorization["distribution_channels"] = _match_channels(text_idx)
         if not categorization["distribution_channels"]:
             categorization["distribution_channels"] = ["retail", "online"]
 
@@ -341,6 +594,111 @@ Brand: {brand_name}
         logger.info(f"[Rule] Categorization complete")
         return categorization
 
+    def _from_sister_brands(self, relationships: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Take the category from the first sister brand that has one.
+
+        Sister brands share a parent, so they are likely in the same industry.
+
+        Args:
+            relationships: Relationship data
+
+        Returns:
+            Complete categorization, or None if no sister brand has a category
+        """
+        for sister in relationships.get("sister_brands") or []:
+            if sister.get("industry_category"):
+                categorization = _new_categorization()
+                categorization["primary_industry"] = sister["industry_category"]
+                categorization["business_model"] = sister.get("business_model", "B2C")
+                logger.info("[Rule] Using category from knowledge base: %s", sister["industry_category"].get("name_en", "N/A"))
+                return categorization
+
+        return None
+
+    def _from_parent_company(self, relationships: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Map a known parent company industry to a category.
+
+        Args:
+            relationships: Relationship data
+
+        Returns:
+            Complete categorization, or None if the parent industry is not mapped
+        """
+        industry_name = (relationships.get("parent_company") or {}).get("industry") or ""
+        if "Healthcare" in industry_name or "Mental" in industry_name:
+            categorization = _new_categorization()
+            categorization["primary_industry"] = {
+                "name_en": "Healthcare_&_Medical_Services",
+                "name_fa": "خدمات بهداشت و درمان",
+                "isic_code": "8690",
+                "category_level_1": "Healthcare_Services",
+                "category_level_2": "Mental_Health_Services",
+                "category_level_3": "Online_Counseling_Platforms"
+            }
+            categorization["business_model"] = "B2C"
+            logger.info(f"[Rule] Using category from parent company: Healthcare Services")
+            return categorization
+
+        return None
+
+    def _from_keywords(self, text_idx: str) -> Optional[Dict[str, Any]]:
+        """Match the industry from website keywords.
+
+        Args:
+            text_idx: Normalized searchable text
+
+        Returns:
+            Industry fields (primary_industry, business_model, price_tier), or None
+        """
+        industry_key = _match_industry(text_idx)
+        if not industry_key:
+            return None
+
+        industry_data = _INDUSTRY_KEYWORDS[industry_key]
+        industry_info = industry_data["industry"]
+        logger.info("[Rule] دسته‌بندی: %s", industry_key)
+        logger.info(
+            "[Rule] Levels: %s → %s → %s",
+            industry_info.get("category_l1"),
+            industry_info.get("category_l2"),
+            industry_info.get("category_l3")
+        )
+
+        return {
+            "primary_industry": {
+                "name_en": industry_info.get("name_en", "Unknown"),
+                "name_fa": "",  # Empty per user request (English-only)
+                "isic_code": industry_info.get("isic_code", ""),
+                "category_level_1": industry_info.get("category_l1", "Unknown"),
+                "category_level_2": industry_info.get("category_l2", "Unknown"),
+                "category_level_3": industry_info.get("category_l3", "Unknown")
+            },
+            "business_model": industry_data["business_model"],
+            "price_tier": industry_data["price_tier"]
+        }
+
+    def _from_parent_fallback(self, relationships: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Use the parent company's industry string as-is.
+
+        Args:
+            relationships: Relationship data
+
+        Returns:
+            Industry fields (primary_industry), or None
+        """
+        parent_industry = (relationships.get("parent_company") or {}).get("industry")
+        if not parent_industry:
+            return None
+
+        logger.info(f"[Rule] Used parent industry: {parent_industry}")
+        return {
+            "primary_industry": {
+                "name_en": parent_industry,
+                "name_fa": parent_industry,
+                "source": "parent_company"
+            }
+        }
+
     def _prepare_categorization_data(
         self,
         brand_name: str,
@@ -349,6 +707,9 @@ Brand: {brand_name}
     ) -> str:
         """Prepare data for categorization analysis.
 
+        Each section is pruned with _summarize_for_prompt(); sections are
+        added in priority order until _PROMPT_TOKEN_BUDGET is reached.
+
         Args:
             brand_name: Name of the brand
             raw_data: Raw data from scrapers
@@ -357,35 +718,37 @@ Brand: {brand_name}
         Returns:
             Formatted string for LLM input
         """
-        lines = []
-
-        # Add structured data
-        structured = raw_data.get("structured", {})
-        if structured:
-            lines.append("=== BRAND INFORMATION ===")
-            lines.append(json.dumps(structured, ensure_ascii=False, indent=2))
+        scraped = raw_data.get("scraped", {})
 
-        # Add relationship context
-        if relationships:
-            lines.append("\n=== CORPORATE RELATIONSHIPS ===")
-            lines.append(json.dumps(relationships, ensure_ascii=False, indent=2))
+        sections = [
+            ("=== BRAND INFORMATION ===", _project_structured(raw_data.get("structured") or {})),
+            # Relationship context
+            ("=== CORPORATE RELATIONSHIPS ===", _project_relationships(relationships or {})),
+            # Social media data (useful for understanding audience)
+            ("=== SOCIAL MEDIA DATA ===", _project(scraped.get("linka"), _LINKA_FIELDS)),
+            # Financial data (helps determine price tier and market position)
+            ("=== FINANCIAL DATA ===", _project(scraped.get("codal"), _CODAL_FIELDS)),
+            # Website data (useful for understanding products/services)
+            ("=== WEBSITE DATA ===", _project(scraped.get("web_search"), _WEB_SEARCH_FIELDS)),
+        ]
 
-        # Add social media data (useful for understanding audience)
-        scraped = raw_data.get("scraped", {})
-        if scraped.get("linka"):
-            lines.append("\n=== SOCIAL MEDIA DATA ===")
-            lines.append(json.dumps(scraped["linka"], ensure_ascii=False, indent=2))
-
-        # Add financial data (helps determine price tier and market position)
-        if scraped.get("codal"):
-            lines.append("\n=== FINANCIAL DATA ===")
-            lines.append(json.dumps(scraped["codal"], ensure_ascii=False, indent=2))
-
-        # Add website data (useful for understanding products/services)
-        if scraped.get("web_search"):
-            lines.append("\n=== WEBSITE DATA ===")
-            web_data = {k: v for k, v in scraped["web_search"].items()
-                       if k not in ["raw_html"]}
-            lines.append(json.dumps(web_data, ensure_ascii=False, indent=2))
+        lines = []
+        tokens_used = 0
+
+        for header, data in sections:
+            data = _summarize_for_prompt(data)
+            if not data:
+                continue
+
+            section = _dumps_pretty(data)
+            section_tokens = _count_tokens(section)
+            # The first (brand information) section is always kept
+            if lines and tokens_used + section_tokens > _PROMPT_TOKEN_BUDGET:
+                logger.warning(f"Prompt token budget reached, skipping section {header}")
+                continue
+
+            lines.append(f"\n{header}" if lines else header)
+            lines.append(section)
+            tokens_used += section_tokens
 
         return "\n".join(lines)
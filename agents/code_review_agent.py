@@ -1,74 +1,294 @@
 """Code Review Agent - Automated code review using LLM analysis."""
 
+import asyncio
 import json
 import os
 import ast
+import hashlib
+import re
 import time
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Any, List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from types import MappingProxyType
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 
 from agents.base_agent import BaseAgent
 from models import BrandIntelligenceState
 from config.prompts import CODE_REVIEW_PROMPT
-from utils import llm_client, get_logger, generate_timestamp, save_json
+from utils import llm_client, get_logger, generate_timestamp, save_json, LLMResponseCache
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
 
 logger = get_logger(__name__)
 
 # Files/directories to skip during review
-SKIP_DIRS = {
+SKIP_DIRS = frozenset({
     "__pycache__", ".git", ".venv", "venv", "node_modules",
     "data", "output", "state", "logs", ".mypy_cache", ".pytest_cache",
     ".ruff_cache", "cache", "test_data", ".claude",
-}
+})
 
-SKIP_FILES = {
+SKIP_FILES = frozenset({
     "__init__.py",  # Usually just imports
-}
+})
 
 MAX_FILE_SIZE = 50_000  # Skip files larger than 50KB (likely generated)
-MAX_WORKERS = 3  # Parallel LLM review calls
+MAX_WORKERS = 16  # Concurrent LLM review calls
+READ_WORKERS = 8  # Threads used to read source files up front
+
+# Small files are reviewed several at a time in one LLM call
+BATCH_FILE_MAX_CHARS = 5_000  # Larger files are always reviewed on their own
+BATCH_MAX_CHARS = 20_000  # Combined source size of one batch
+BATCH_MAX_FILES = 8
+
+_BATCH_REVIEW_INSTRUCTION = (
+    "Review each of the following {count} Python files independently. "
+    'Return ONLY valid JSON of the form {{"reviews": [...]}} with exactly one '
+    "review object per file, in the same order as the files, each following "
+    "the structure described above."
+)
+
+# Hardcoded secret heuristic: an assignment to a secret-like name (any case)
+# on a line that is not an env var / settings lookup, an empty or None value,
+# or a function signature
+_SECRET_RE = re.compile(
+    r"""^(?!.*(?:os\.environ|settings\.|getenv|""|''|None|def |->))"""
+    r".*?(?i:password|secret|api_key|token) *="
+)
+_SECRET_HINT_RE = re.compile(r"(?i:password|secret|api_key|token) *=")
+
+_TODO_TAGS = ("TODO", "FIXME", "HACK", "XXX")
+
+# Score penalty per static finding, by severity
+_SEVERITY_WEIGHTS = MappingProxyType({"critical": 3, "high": 2, "medium": 1, "low": 0.5, "info": 0})
+
+# Source sent to the LLM is capped by tokens (~4 characters each without tiktoken)
+MAX_INPUT_TOKENS = 7_500
+DATA_FILE_MIN_LINES = 100  # Larger modules without functions/classes skip the LLM
+
+
+@lru_cache(maxsize=1)
+def _get_token_encoding():
+    """Load the cl100k_base encoding on first use (it may need to be downloaded).
+
+    Returns:
+        The tiktoken encoding, or None if tiktoken or the encoding is unavailable
+    """
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable, truncating by characters: {e}")
+        return None
+
+
+def _truncate_source(source: str) -> Tuple[str, str]:
+    """Cap source at MAX_INPUT_TOKENS for the review prompt.
+
+    Args:
+        source: File source code.
+
+    Returns:
+        (possibly truncated source, truncation note or "") tuple.
+    """
+    # Token counts never exceed character counts, so short files skip encoding
+    if len(source) <= MAX_INPUT_TOKENS:
+        return source, ""
+
+    encoding = _get_token_encoding()
+    if encoding is None:
+        max_chars = MAX_INPUT_TOKENS * 4
+        if len(source) <= max_chars:
+            return source, ""
+        return source[:max_chars], f"\n\n[FILE TRUNCATED - only first {max_chars:,} characters shown]"
+
+    tokens = encoding.encode(source, disallowed_special=())
+    if len(tokens) <= MAX_INPUT_TOKENS:
+        return source, ""
+    return (
+        encoding.decode(tokens[:MAX_INPUT_TOKENS]),
+        f"\n\n[FILE TRUNCATED - only first {MAX_INPUT_TOKENS:,} tokens shown]",
+    )
+
+
+# Recently parsed ASTs, keyed by the SHA-256 of their source. Kept small:
+# a tree takes roughly 40x the memory of its source text
+AST_CACHE_SIZE = 16
+_ast_cache: "OrderedDict[str, Optional[ast.AST]]" = OrderedDict()
+_ast_cache_lock = Lock()
+
+# Reviews are cached per file content so unchanged files are not re-reviewed.
+# LLM reviews are invalidated by a prompt change, static reviews by any change
+# to this module (where the static rules live)
+REVIEW_CACHE_FILE = Path("output") / "code_review" / ".review_cache.sqlite"
+REVIEW_CACHE_TTL_HOURS = 24 * 30
+_PROMPT_DIGEST = hashlib.sha256(CODE_REVIEW_PROMPT.encode("utf-8")).hexdigest()[:16]
+_STATIC_RULES_DIGEST = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+
+def _iter_py_files(root: Path) -> Iterator[Tuple[Path, int]]:
+    """Walk a directory tree for Python files, skipping SKIP_DIRS.
+
+    Uses os.scandir so each file costs a single stat() call.
+
+    Args:
+        root: Directory to search.
+
+    Yields:
+        (path, size in bytes) for every .py file found.
+    """
+    stack = [str(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    # No skipped name ends in .py, so this can never drop a file;
+                    # skipped directories are pruned without a type check
+                    if entry.name in SKIP_DIRS:
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.endswith(".py") and entry.is_file():
+                            yield Path(entry.path), entry.stat().st_size
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.warning(f"Cannot scan {directory}: {e}")
+
+
+def _read_source(filepath: Path) -> Optional[str]:
+    """Read a source file.
+
+    Args:
+        filepath: Path to the file.
+
+    Returns:
+        File contents, or None if the file can't be read.
+    """
+    try:
+        return filepath.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError) as e:
+        logger.warning(f"Cannot read {filepath}: {e}")
+        return None
+
+
+def _read_sources(files: List[Path]) -> Dict[Path, Optional[str]]:
+    """Read many source files concurrently.
+
+    Args:
+        files: Files to read.
+
+    Returns:
+        Mapping of each path to its contents (None where unreadable).
+    """
+    if len(files) < 2:
+        return {filepath: _read_source(filepath) for filepath in files}
+
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        return dict(zip(files, executor.map(_read_source, files)))
+
+
+def _parse_source(digest: str, source: str) -> Optional[ast.AST]:
+    """Parse source, reusing the tree of a recently parsed identical source.
+
+    Args:
+        digest: SHA-256 hex digest of source
+        source: Python source code
+
+    Returns:
+        Parsed module, or None if the source has a syntax error
+    """
+    with _ast_cache_lock:
+        if digest in _ast_cache:
+            _ast_cache.move_to_end(digest)
+            return _ast_cache[digest]
+
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        tree = None
+
+    with _ast_cache_lock:
+        _ast_cache[digest] = tree
+        if len(_ast_cache) > AST_CACHE_SIZE:
+            _ast_cache.popitem(last=False)
+
+    return tree
+
+
+def _walk_nodes(tree: ast.AST) -> List[ast.AST]:
+    """List every node of a tree in ast.walk() (breadth-first) order.
+
+    Walks with a plain list and inlined child lookup, avoiding the
+    generator and deque overhead of ast.walk()/ast.iter_child_nodes().
+
+    Args:
+        tree: Root node
+
+    Returns:
+        All nodes, root first
+    """
+    nodes = [tree]
+    append = nodes.append
+    for node in nodes:
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if isinstance(value, ast.AST):
+                append(value)
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        append(item)
+    return nodes
 
 
 class FileMetrics:
     """Compute basic code metrics from a Python source file."""
 
     def __init__(self, source: str):
+        """Parse the source (through the AST cache) and count lines.
+
+        Args:
+            source: Python source code
+        """
         self.source = source
         self.lines = source.splitlines()
         self.total_lines = len(self.lines)
-        self._tree = None
-        try:
-            self._tree = ast.parse(source)
-        except SyntaxError:
-            pass
+        digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        self._tree = _parse_source(digest, source)
 
-    @property
-    def function_count(self) -> int:
-        if not self._tree:
-            return 0
-        return sum(
-            1 for node in ast.walk(self._tree)
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
-        )
+        self.function_count = 0
+        self.class_count = 0
+        self.import_count = 0
+        self.function_nodes: List[ast.AST] = []
+        if self._tree:
+            self._analyze()
 
-    @property
-    def class_count(self) -> int:
-        if not self._tree:
-            return 0
-        return sum(
-            1 for node in ast.walk(self._tree)
-            if isinstance(node, ast.ClassDef)
-        )
+    def _analyze(self) -> None:
+        """Collect all AST-based counts in a single traversal.
 
-    @property
-    def import_count(self) -> int:
-        if not self._tree:
-            return 0
-        return sum(
-            1 for node in ast.walk(self._tree)
-            if isinstance(node, (ast.Import, ast.ImportFrom))
-        )
+        Function nodes are kept in ast.walk() order so checks that iterate
+        them report findings in the same order as a fresh walk would.
+        """
+        for node in _walk_nodes(self._tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self.function_nodes.append(node)
+            elif isinstance(node, ast.ClassDef):
+                self.class_count += 1
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                self.import_count += 1
+        self.function_count = len(self.function_nodes)
 
     @property
     def comment_ratio(self) -> str:
@@ -77,6 +297,16 @@ class FileMetrics:
             return "0%"
         return f"{(comment_lines / self.total_lines) * 100:.1f}%"
 
+    @property
+    def is_data_file(self) -> bool:
+        """Whether the module parses but defines no functions or classes (data or generated code)."""
+        return (
+            self._tree is not None
+            and self.function_count == 0
+            and self.class_count == 0
+            and self.total_lines > DATA_FILE_MIN_LINES
+        )
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "total_lines": self.total_lines,
@@ -105,6 +335,8 @@ class CodeReviewAgent(BaseAgent):
         super().__init__(agent_name="CodeReviewAgent")
         self.project_root = Path(project_root) if project_root else Path.cwd()
         self.reviews: List[Dict[str, Any]] = []
+        self._review_cache: Optional[LLMResponseCache] = None
+        self._sources: Dict[Path, Optional[str]] = {}
 
     def execute(self, state: BrandIntelligenceState) -> BrandIntelligenceState:
         """Execute code review as part of the LangGraph pipeline.
@@ -160,29 +392,18 @@ class CodeReviewAgent(BaseAgent):
             search_root = self.project_root
 
         files = []
-        for path in sorted(search_root.rglob("*.py")):
-            # Skip excluded directories
-            if any(skip in path.parts for skip in SKIP_DIRS):
-                continue
-
+        for path, size in sorted(_iter_py_files(search_root)):
             # Skip __init__.py unless it has significant content
-            if path.name in SKIP_FILES:
-                try:
-                    if path.stat().st_size < 500:
-                        continue
-                except OSError:
-                    continue
+            if path.name in SKIP_FILES and size < 500:
+                continue
 
             # Skip test files if not wanted
             if not include_tests and path.name.startswith("test_"):
                 continue
 
             # Skip oversized files
-            try:
-                if path.stat().st_size > MAX_FILE_SIZE:
-                    logger.warning(f"Skipping large file: {path} ({path.stat().st_size} bytes)")
-                    continue
-            except OSError:
+            if size > MAX_FILE_SIZE:
+                logger.warning(f"Skipping large file: {path} ({size} bytes)")
                 continue
 
             files.append(path)
@@ -207,35 +428,212 @@ class CodeReviewAgent(BaseAgent):
         self.reviews = []
         errors = []
 
-        if parallel and len(files) > 1 and self.llm.is_available():
-            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                futures = {
-                    executor.submit(self._review_single_file, f): f for f in files
-                }
-                for future in as_completed(futures):
-                    filepath = futures[future]
-                    try:
-                        result = future.result()
-                        if result:
-                            self.reviews.append(result)
-                    except Exception as e:
-                        logger.error(f"Review failed for {filepath}: {e}")
-                        errors.append({"file": str(filepath), "error": str(e)})
+        if self.llm.is_available():
+            batches = self._plan_batches(files)
         else:
-            for f in files:
+            batches = [[f] for f in files]
+        use_async = parallel and len(batches) > 1 and self.llm.is_available()
+        if use_async:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+            else:
+                # Already inside an event loop (e.g. an async caller), where a
+                # nested loop cannot run; review sequentially instead
+                use_async = False
+
+        # Read all sources up front so reviews never wait on disk I/O. The
+        # async path instead reads each batch in a worker thread as soon as
+        # it is scheduled, overlapping reads with requests already in flight
+        if not use_async:
+            self._sources = _read_sources(files)
+
+        if use_async:
+            # Private loop, as in DataCollectionAgent._scrape_all_sources:
+            # asyncio.run() would also reset the thread's current event loop.
+            # Its executor gives every in-flight review a worker thread
+            loop = asyncio.new_event_loop()
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=MAX_WORKERS))
+            try:
+                reviews, errors = loop.run_until_complete(self._review_all_async(batches))
+            finally:
+                loop.close()
+            self.reviews.extend(reviews)
+        else:
+            for batch in batches:
                 try:
-                    result = self._review_single_file(f)
-                    if result:
-                        self.reviews.append(result)
+                    self.reviews.extend(self._review_batch(batch))
                 except Exception as e:
-                    logger.error(f"Review failed for {f}: {e}")
-                    errors.append({"file": str(f), "error": str(e)})
+                    for f in batch:
+                        logger.error(f"Review failed for {f}: {e}")
+                        errors.append({"file": str(f), "error": str(e)})
 
+        self._sources = {}
         elapsed = time.time() - start_time
 
         report = self._build_report(elapsed, errors)
         return report
 
+    def _plan_batches(self, files: List[Path]) -> List[List[Path]]:
+        """Group files into LLM review batches.
+
+        Small files are packed greedily, in order, into batches bounded by
+        BATCH_MAX_CHARS and BATCH_MAX_FILES; larger files get a batch of their own.
+
+        Args:
+            files: Files to review.
+
+        Returns:
+            List of batches, each a list of file paths.
+        """
+        batches = []
+        current: List[Path] = []
+        current_size = 0
+
+        for path in files:
+            try:
+                size = path.stat().st_size
+            except OSError:
+                size = BATCH_FILE_MAX_CHARS + 1  # Reviewed alone, where the read error is reported
+
+            if size > BATCH_FILE_MAX_CHARS:
+                batches.append([path])
+                continue
+
+            if current and (
+                current_size + size > BATCH_MAX_CHARS or len(current) >= BATCH_MAX_FILES
+            ):
+                batches.append(current)
+                current, current_size = [], 0
+
+            current.append(path)
+            current_size += size
+
+        if current:
+            batches.append(current)
+
+        return batches
+
+    async def _review_all_async(
+        self, batches: List[List[Path]]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+        """Review batches concurrently.
+
+        Each batch goes through the same _review_loaded() as the sequential
+        path, in a worker thread. A semaphore caps the number of LLM requests
+        in flight so provider rate limits are respected.
+
+        Args:
+            batches: Batches from _plan_batches().
+
+        Returns:
+            (reviews, errors) tuple, with reviews in batch order.
+        """
+        semaphore = asyncio.Semaphore(MAX_WORKERS)
+
+        async def _run(batch: List[Path]) -> List[Dict[str, Any]]:
+            # Read outside the semaphore so disk I/O proceeds while slots are
+            # busy; parsing stays on this thread (AST construction is not
+            # thread-safe on every supported Python version)
+            sources = await asyncio.to_thread(lambda: [_read_source(path) for path in batch])
+            self._sources.update(zip(batch, sources))
+
+            reviews, loaded = self._load_batch(batch)
+            if not loaded:
+                return reviews
+            async with semaphore:
+                reviews.extend(await asyncio.to_thread(self._review_loaded, loaded))
+            return reviews
+
+        results = await asyncio.gather(
+            *[_run(batch) for batch in batches], return_exceptions=True
+        )
+
+        reviews = []
+        errors = []
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                for filepath in batch:
+                    logger.error(f"Review failed for {filepath}: {result}")
+                    errors.append({"file": str(filepath), "error": str(result)})
+            else:
+                reviews.extend(result)
+
+        return reviews, errors
+
+    def _load_batch(
+        self, batch: List[Path], use_llm: bool = True
+    ) -> Tuple[List[Dict[str, Any]], List[Tuple[Path, str, FileMetrics]]]:
+        """Read a batch, splitting off files with a cached review.
+
+        Cache hits cost only the read and a lookup; the remaining readable,
+        non-empty files are measured for review.
+
+        Args:
+            batch: Files to load.
+            use_llm: Whether LLM reviews (rather than static reviews) are wanted.
+
+        Returns:
+            (cached reviews, (filepath, source, metrics) tuples to review) tuple.
+        """
+        reviews = []
+        loaded = []
+        for filepath in batch:
+            if filepath in self._sources:
+                source = self._sources[filepath]
+            else:
+                source = _read_source(filepath)
+
+            if not source or not source.strip():
+                continue
+
+            cached = self._cached_review(filepath, source, use_llm)
+            if cached is not None:
+                reviews.append(cached)
+                continue
+
+            # Compute local metrics (no LLM needed)
+            metrics = FileMetrics(source)
+            loaded.append((filepath, source, metrics))
+
+        return reviews, loaded
+
+    def _review_loaded(
+        self, loaded: List[Tuple[Path, str, FileMetrics]]
+    ) -> List[Dict[str, Any]]:
+        """Review a loaded batch, using a single LLM call when it holds several.
+
+        Args:
+            loaded: (filepath, source, metrics) tuples from _load_batch().
+
+        Returns:
+            Review results, one per loaded file.
+        """
+        if not loaded:
+            return []
+        if len(loaded) == 1:
+            return [self._llm_review(*loaded[0])]
+
+        return self._llm_review_batch(loaded)
+
+    def _review_batch(self, batch: List[Path]) -> List[Dict[str, Any]]:
+        """Review a batch of files, using a single LLM call when it holds several.
+
+        Args:
+            batch: Files to review together.
+
+        Returns:
+            Review results for the files that could be read.
+        """
+        if len(batch) == 1:
+            review = self._review_single_file(batch[0])
+            return [review] if review else []
+
+        reviews, loaded = self._load_batch(batch)
+        reviews.extend(self._review_loaded(loaded))
+        return reviews
+
     def _review_single_file(self, filepath: Path) -> Optional[Dict[str, Any]]:
         """Review a single Python file.
 
@@ -245,30 +643,86 @@ class CodeReviewAgent(BaseAgent):
         Returns:
             Review result dict, or None if file can't be read.
         """
-        try:
-            source = filepath.read_text(encoding="utf-8")
-        except (OSError, UnicodeDecodeError) as e:
-            logger.warning(f"Cannot read {filepath}: {e}")
-            return None
-
-        if not source.strip():
+        use_llm = self.llm.is_available()
+        reviews, loaded = self._load_batch([filepath], use_llm)
+        if reviews:
+            return reviews[0]
+        if not loaded:
             return None
 
-        # Compute local metrics (no LLM needed)
-        metrics = FileMetrics(source)
-
         # If LLM is available, get AI-powered review
-        if self.llm.is_available():
-            review = self._llm_review(filepath, source, metrics)
+        if use_llm:
+            review = self._llm_review(*loaded[0])
         else:
-            review = self._static_review(filepath, source, metrics)
+            review = self._static_review(*loaded[0])
+            self._store_review(loaded[0][1], review, use_llm=False)
 
         return review
 
-    def _llm_review(
+    def _review_cache_key(self, relative_path: str, source: str, use_llm: bool) -> str:
+        """Compute the review cache key for a file.
+
+        Trailing whitespace is ignored so whitespace-only edits still hit,
+        while line numbers in the cached findings stay valid. The path is
+        part of the key because reviews mention it. LLM reviews are keyed by
+        model and prompt, static reviews by the rules' code.
+
+        Args:
+            relative_path: File path relative to the project root.
+            source: File source code.
+            use_llm: Whether the key is for an LLM review (vs a static review).
+
+        Returns:
+            Hex digest identifying the review.
+        """
+        normalized = "\n".join(line.rstrip() for line in source.splitlines()).rstrip("\n")
+        reviewer = f"{self.llm.model}\x1f{_PROMPT_DIGEST}" if use_llm else f"static\x1f{_STATIC_RULES_DIGEST}"
+        key_material = f"{reviewer}\x1f{relative_path}\x1f{normalized}"
+        return hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+
+    def _get_review_cache(self) -> LLMResponseCache:
+        """Open the persistent review cache on first use."""
+        if self._review_cache is None:
+            self._review_cache = LLMResponseCache(
+                db_path=str(self.project_root / REVIEW_CACHE_FILE),
+                ttl_hours=REVIEW_CACHE_TTL_HOURS,
+            )
+        return self._review_cache
+
+    def _cached_review(
+        self, filepath: Path, source: str, use_llm: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """Look up a previous review of the same source.
+
+        An exact source match reuses the stored metrics as well; after a
+        whitespace-only edit the metrics are recomputed.
+
+        Args:
+            filepath: Path to the file.
+            source: File source code.
+            use_llm: Whether to look up an LLM review (vs a static review).
+
+        Returns:
+            Review result dictionary, or None on a miss.
+        """
+        relative_path = str(filepath.relative_to(self.project_root))
+        cached = self._get_review_cache().get(self._review_cache_key(relative_path, source, use_llm))
+        if cached is None:
+            return None
+
+        entry = json.loads(cached)
+        review = entry["review"]
+        if entry["source_sha256"] != hashlib.sha256(source.encode("utf-8")).hexdigest():
+            metrics = FileMetrics(source)
+            review["metrics"] = metrics.to_dict()
+        return review
+
+    def _review_without_llm(
         self, filepath: Path, source: str, metrics: FileMetrics
-    ) -> Dict[str, Any]:
-        """Perform LLM-powered code review.
+    ) -> Optional[Dict[str, Any]]:
+        """Resolve a review without an LLM call where one would add nothing.
+
+        Data-only modules get the static review.
 
         Args:
             filepath: Path to the file.
@@ -276,22 +730,118 @@ class CodeReviewAgent(BaseAgent):
             metrics: Pre-computed file metrics.
 
         Returns:
-            Review result dictionary.
+            Review result dictionary, or None if the file needs an LLM review.
+        """
+        if metrics.is_data_file:
+            logger.info(f"Skipping LLM review of data-only module {filepath}")
+            return self._static_review(filepath, source, metrics)
+
+        return None
+
+    def _store_review(self, source: str, review: Dict[str, Any], use_llm: bool = True) -> None:
+        """Persist a review for reuse on unchanged source.
+
+        Args:
+            source: File source code.
+            review: Review result dictionary.
+            use_llm: Whether this is an LLM review (vs a static review).
+        """
+        # Don't cache empty reviews (unrecoverable JSON) so the next run retries
+        if not set(review) - {"file_path", "metrics"}:
+            return
+
+        entry = {
+            "source_sha256": hashlib.sha256(source.encode("utf-8")).hexdigest(),
+            "review": review,
+        }
+        key = self._review_cache_key(review["file_path"], source, use_llm)
+        self._get_review_cache().set(key, json.dumps(entry))
+
+    def _review_prompt(self, filepath: Path, source: str) -> Tuple[str, str]:
+        """Build the LLM review prompt for a single file.
+
+        Args:
+            filepath: Path to the file.
+            source: File source code.
+
+        Returns:
+            (relative_path, prompt) tuple.
         """
         relative_path = str(filepath.relative_to(self.project_root))
 
         # Truncate very long files to fit context window
-        truncated = source[:30_000] if len(source) > 30_000 else source
-        truncation_note = (
-            "\n\n[FILE TRUNCATED - only first 30,000 characters shown]"
-            if len(source) > 30_000
-            else ""
-        )
+        truncated, truncation_note = _truncate_source(source)
 
         prompt = (
             f"Review the following Python file: `{relative_path}`\n\n"
             f"```python\n{truncated}{truncation_note}\n```"
         )
+        return relative_path, prompt
+
+    def _batch_prompt(self, files: List[Tuple[Path, str, FileMetrics]]) -> Tuple[List[str], str]:
+        """Build the LLM review prompt for a batch of files.
+
+        Args:
+            files: (filepath, source, metrics) tuples.
+
+        Returns:
+            (relative_paths, prompt) tuple.
+        """
+        relative_paths = [str(filepath.relative_to(self.project_root)) for filepath, _, _ in files]
+
+        sections = [
+            f"File {number}: `{relative_path}`\n\n```python\n{source}\n```"
+            for number, (relative_path, (_, source, _)) in enumerate(zip(relative_paths, files), 1)
+        ]
+        prompt = (
+            _BATCH_REVIEW_INSTRUCTION.format(count=len(files))
+            + "\n\n"
+            + "\n\n".join(sections)
+        )
+        return relative_paths, prompt
+
+    @staticmethod
+    def _parse_batch_response(response: str, count: int) -> List[Optional[Dict[str, Any]]]:
+        """Split a batch review response into per-file reviews.
+
+        Args:
+            response: Raw LLM response text.
+            count: Number of files in the batch.
+
+        Returns:
+            One review per file, or None where no usable review was returned.
+        """
+        parsed = json.loads(response) if response else {}
+        items = (parsed.get("reviews") or []) if isinstance(parsed, dict) else parsed
+        if not isinstance(items, list):
+            items = []
+
+        # Reviews are matched by position, so a short or long list cannot be trusted
+        if len(items) != count:
+            if items:
+                logger.warning(f"Batch review returned {len(items)} reviews for {count} files")
+            return [None] * count
+
+        return [item if isinstance(item, dict) else None for item in items]
+
+    def _llm_review(
+        self, filepath: Path, source: str, metrics: FileMetrics
+    ) -> Dict[str, Any]:
+        """Perform LLM-powered code review.
+
+        Args:
+            filepath: Path to the file.
+            source: File source code.
+            metrics: Pre-computed file metrics.
+
+        Returns:
+            Review result dictionary.
+        """
+        resolved = self._review_without_llm(filepath, source, metrics)
+        if resolved is not None:
+            return resolved
+
+        relative_path, prompt = self._review_prompt(filepath, source)
 
         try:
             response = self.llm.generate(
@@ -307,12 +857,66 @@ class CodeReviewAgent(BaseAgent):
             review["file_path"] = relative_path
             review["metrics"] = metrics.to_dict()
 
+            self._store_review(source, review)
             return review
 
         except (json.JSONDecodeError, Exception) as e:
             logger.warning(f"LLM review failed for {relative_path}, falling back to static: {e}")
             return self._static_review(filepath, source, metrics)
 
+    def _llm_review_batch(
+        self, files: List[Tuple[Path, str, FileMetrics]]
+    ) -> List[Dict[str, Any]]:
+        """Review several small files with a single LLM call.
+
+        Reviews are matched to files by position. Files without a usable
+        review in the response are reviewed individually instead.
+
+        Args:
+            files: (filepath, source, metrics) tuples.
+
+        Returns:
+            One review result dictionary per file, in input order.
+        """
+        # Only files that need a fresh review are sent to the LLM
+        resolved = [self._review_without_llm(*item) for item in files]
+        pending = [item for item, review in zip(files, resolved) if review is None]
+        if len(pending) < len(files):
+            if len(pending) > 1:
+                fresh = self._llm_review_batch(pending)
+            else:
+                fresh = [self._llm_review(*item) for item in pending]
+            fresh_reviews = iter(fresh)
+            return [review if review is not None else next(fresh_reviews) for review in resolved]
+
+        relative_paths, prompt = self._batch_prompt(files)
+
+        try:
+            response = self.llm.generate(
+                prompt=prompt,
+                system_prompt=CODE_REVIEW_PROMPT,
+                json_mode=True,
+                temperature=0.3,
+            )
+            items = self._parse_batch_response(response, len(files))
+        except Exception as e:
+            logger.warning(f"Batch LLM review failed for {len(files)} files, reviewing individually: {e}")
+            items = [None] * len(files)
+
+        reviews = []
+        for (filepath, source, metrics), relative_path, review in zip(files, relative_paths, items):
+            if review is None:
+                reviews.append(self._llm_review(filepath, source, metrics))
+                continue
+
+            # Override file_path and metrics with our computed values
+            review["file_path"] = relative_path
+            review["metrics"] = metrics.to_dict()
+            self._store_review(source, review)
+            reviews.append(review)
+
+        return reviews
+
     def _static_review(
         self, filepath: Path, source: str, metrics: FileMetrics
     ) -> Dict[str, Any]:
@@ -331,13 +935,27 @@ class CodeReviewAgent(BaseAgent):
         relative_path = str(filepath.relative_to(self.project_root))
         findings = []
 
-        lines = source.splitlines()
-
-        # Check for bare except
-        for i, line in enumerate(lines, 1):
+        # Line-based checks share one pass over the source; each check keeps
+        # its own list so findings are reported grouped by check as before
+        bare_except_findings = []
+        secret_findings = []
+        eval_findings = []
+        todo_findings = []
+
+        # A whole-source substring search is much cheaper than testing every
+        # line, so checks whose trigger text never occurs are skipped
+        check_except = "except" in source
+        check_secrets = _SECRET_HINT_RE.search(source) is not None
+        check_eval = "eval(" in source or "exec(" in source
+        check_todo = any(tag in source for tag in _TODO_TAGS)
+        scan_lines = check_except or check_secrets or check_eval or check_todo
+
+        for i, line in enumerate(metrics.lines if scan_lines else (), 1):
             stripped = line.strip()
-            if stripped == "except:" or stripped == "except Exception:":
-                findings.append({
+
+            # Check for bare except
+            if check_except and (stripped == "except:" or stripped == "except Exception:"):
+                bare_except_findings.append({
                     "severity": "medium",
                     "category": "error_handling",
                     "line_range": str(i),
@@ -346,33 +964,20 @@ class CodeReviewAgent(BaseAgent):
                     "code_snippet": stripped,
                 })
 
-        # Check for hardcoded secrets patterns
-        secret_patterns = ["password", "secret", "api_key", "token"]
-        for i, line in enumerate(lines, 1):
-            lower = line.lower().replace(" ", "")
-            if any(f"{p}=" in lower or f"{p} =" in line.lower() for p in secret_patterns):
-                # Skip if it's a parameter name or env var lookup
-                if "os.environ" in line or "settings." in line or "getenv" in line:
-                    continue
-                if '""' in line or "''" in line or "None" in line:
-                    continue
-                # Skip function parameter defaults and type annotations
-                if "def " in line or "->" in line:
-                    continue
-                findings.append({
+            # Check for hardcoded secrets patterns
+            if check_secrets and _SECRET_RE.match(line):
+                secret_findings.append({
                     "severity": "high",
                     "category": "security",
                     "line_range": str(i),
                     "issue": "Possible hardcoded secret detected",
                     "suggestion": "Use environment variables or a secrets manager",
-                    "code_snippet": line.strip()[:80],
+                    "code_snippet": stripped[:80],
                 })
 
-        # Check for eval/exec usage
-        for i, line in enumerate(lines, 1):
-            stripped = line.strip()
-            if "eval(" in stripped or "exec(" in stripped:
-                findings.append({
+            # Check for eval/exec usage
+            if check_eval and ("eval(" in stripped or "exec(" in stripped):
+                eval_findings.append({
                     "severity": "critical",
                     "category": "security",
                     "line_range": str(i),
@@ -381,54 +986,54 @@ class CodeReviewAgent(BaseAgent):
                     "code_snippet": stripped[:80],
                 })
 
-        # Check for mutable default arguments
-        if metrics._tree:
-            for node in ast.walk(metrics._tree):
-                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                    for default in node.args.defaults + node.args.kw_defaults:
-                        if default and isinstance(default, (ast.List, ast.Dict, ast.Set)):
-                            findings.append({
-                                "severity": "medium",
-                                "category": "best_practices",
-                                "line_range": str(node.lineno),
-                                "issue": f"Mutable default argument in function '{node.name}'",
-                                "suggestion": "Use None as default and initialize inside the function",
-                                "code_snippet": None,
-                            })
-
-        # Check for long functions
-        if metrics._tree:
-            for node in ast.walk(metrics._tree):
-                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                    end_line = getattr(node, "end_lineno", node.lineno + 50)
-                    length = end_line - node.lineno
-                    if length > 50:
-                        findings.append({
-                            "severity": "low",
+            # Check for TODO/FIXME/HACK comments
+            if check_todo and stripped.startswith("#"):
+                for tag in _TODO_TAGS:
+                    if tag in stripped:
+                        todo_findings.append({
+                            "severity": "info",
                             "category": "code_quality",
-                            "line_range": f"{node.lineno}-{end_line}",
-                            "issue": f"Function '{node.name}' is {length} lines long",
-                            "suggestion": "Consider breaking into smaller functions for readability",
-                            "code_snippet": None,
+                            "line_range": str(i),
+                            "issue": f"{tag} comment found",
+                            "suggestion": "Track in issue tracker and resolve",
+                            "code_snippet": stripped[:80],
                         })
 
-        # Check for TODO/FIXME/HACK comments
-        for i, line in enumerate(lines, 1):
-            stripped = line.strip()
-            for tag in ("TODO", "FIXME", "HACK", "XXX"):
-                if tag in stripped and stripped.startswith("#"):
+        findings.extend(bare_except_findings)
+        findings.extend(secret_findings)
+        findings.extend(eval_findings)
+
+        # Check for mutable default arguments
+        for node in metrics.function_nodes:
+            for default in node.args.defaults + node.args.kw_defaults:
+                if default and isinstance(default, (ast.List, ast.Dict, ast.Set)):
                     findings.append({
-                        "severity": "info",
-                        "category": "code_quality",
-                        "line_range": str(i),
-                        "issue": f"{tag} comment found",
-                        "suggestion": "Track in issue tracker and resolve",
-                        "code_snippet": stripped[:80],
+                        "severity": "medium",
+                        "category": "best_practices",
+                        "line_range": str(node.lineno),
+                        "issue": f"Mutable default argument in function '{node.name}'",
+                        "suggestion": "Use None as default and initialize inside the function",
+                        "code_snippet": None,
                     })
 
+        # Check for long functions
+        for node in metrics.function_nodes:
+            end_line = getattr(node, "end_lineno", node.lineno + 50)
+            length = end_line - node.lineno
+            if length > 50:
+                findings.append({
+                    "severity": "low",
+                    "category": "code_quality",
+                    "line_range": f"{node.lineno}-{end_line}",
+                    "issue": f"Function '{node.name}' is {length} lines long",
+                    "suggestion": "Consider breaking into smaller functions for readability",
+                    "code_snippet": None,
+                })
+
+        findings.extend(todo_findings)
+
         # Score based on findings
-        severity_weights = {"critical": 3, "high": 2, "medium": 1, "low": 0.5, "info": 0}
-        penalty = sum(severity_weights.get(f["severity"], 0) for f in findings)
+        penalty = sum(_SEVERITY_WEIGHTS.get(f["severity"], 0) for f in findings)
         score = max(1, min(10, round(10 - penalty)))
 
         return {
@@ -452,43 +1057,41 @@ class CodeReviewAgent(BaseAgent):
         Returns:
             Complete review report dictionary.
         """
+        # One pass over the reviews flattens findings (pulling the columns we
+        # aggregate into flat lists) and accumulates scores and metric totals
         all_findings = []
+        severities = []
+        categories = []
+        scores = []
+        total_lines = total_functions = total_classes = 0
         for review in self.reviews:
+            if review.get("overall_score"):
+                scores.append(review["overall_score"])
+
+            review_metrics = review.get("metrics", {})
+            total_lines += review_metrics.get("total_lines", 0)
+            total_functions += review_metrics.get("function_count", 0)
+            total_classes += review_metrics.get("class_count", 0)
+
+            file_path = review.get("file_path", "unknown")
             for finding in review.get("findings", []):
-                finding["file_path"] = review.get("file_path", "unknown")
+                finding["file_path"] = file_path
                 all_findings.append(finding)
+                severities.append(finding.get("severity", "info"))
+                categories.append(finding.get("category", "other"))
 
-        # Count by severity
-        severity_counts = {}
-        for f in all_findings:
-            sev = f.get("severity", "info")
-            severity_counts[sev] = severity_counts.get(sev, 0) + 1
-
-        # Count by category
-        category_counts = {}
-        for f in all_findings:
-            cat = f.get("category", "other")
-            category_counts[cat] = category_counts.get(cat, 0) + 1
+        # Count by severity and category
+        severity_counts = dict(Counter(severities))
+        category_counts = dict(Counter(categories))
 
         # Average score
-        scores = [r.get("overall_score", 5) for r in self.reviews if r.get("overall_score")]
         avg_score = round(sum(scores) / len(scores), 1) if scores else 0
 
-        # Total metrics
-        total_lines = sum(
-            r.get("metrics", {}).get("total_lines", 0) for r in self.reviews
-        )
-        total_functions = sum(
-            r.get("metrics", {}).get("function_count", 0) for r in self.reviews
-        )
-        total_classes = sum(
-            r.get("metrics", {}).get("class_count", 0) for r in self.reviews
-        )
-
-        # Top issues (critical + high)
-        top_issues = [
-            f for f in all_findings if f.get("severity") in ("critical", "high")
-        ]
+        # Top issues (critical + high); only the first ten are reported
+        top_issues = list(islice(
+            (f for f, sev in zip(all_findings, severities) if sev in ("critical", "high")),
+            10,
+        ))
 
         report = {
             "timestamp": generate_timestamp(),
@@ -500,7 +1103,7 @@ class CodeReviewAgent(BaseAgent):
                 "total_findings": len(all_findings),
                 "by_severity": severity_counts,
                 "by_category": category_counts,
-                "top_issues": top_issues[:10],
+                "top_issues": top_issues,
             },
             "project_metrics": {
                 "total_lines": total_lines,
@@ -522,92 +1125,101 @@ class CodeReviewAgent(BaseAgent):
         Returns:
             Formatted Markdown report string.
         """
-        lines = []
-        lines.append("# Code Review Report")
-        lines.append(f"\n**Date:** {report.get('timestamp', 'N/A')}")
-        lines.append(f"**Project:** `{report.get('project_root', 'N/A')}`")
-        lines.append(f"**Files Reviewed:** {report.get('files_reviewed', 0)}")
-        lines.append(f"**Review Time:** {report.get('review_time_seconds', 0):.1f}s")
-        lines.append(f"**Overall Score:** {report.get('overall_score', 'N/A')}/10")
+        return "".join(self.iter_markdown_report(report))
+
+    def iter_markdown_report(self, report: Dict[str, Any]) -> Iterator[str]:
+        """Generate the Markdown report in chunks, for streaming to a file.
+
+        Args:
+            report: The report dict from review_files().
+
+        Yields:
+            Consecutive pieces of the Markdown report.
+        """
+        yield "# Code Review Report\n"
+        yield f"\n**Date:** {report.get('timestamp', 'N/A')}\n"
+        yield f"**Project:** `{report.get('project_root', 'N/A')}`\n"
+        yield f"**Files Reviewed:** {report.get('files_reviewed', 0)}\n"
+        yield f"**Review Time:** {report.get('review_time_seconds', 0):.1f}s\n"
+        yield f"**Overall Score:** {report.get('overall_score', 'N/A')}/10\n"
 
         # Summary
         summary = report.get("summary", {})
-        lines.append("\n## Summary")
-        lines.append(f"\nTotal findings: **{summary.get('total_findings', 0)}**")
+        yield "\n## Summary\n"
+        yield f"\nTotal findings: **{summary.get('total_findings', 0)}**\n"
 
         by_sev = summary.get("by_severity", {})
         if by_sev:
-            lines.append("\n| Severity | Count |")
-            lines.append("|----------|-------|")
+            yield "\n| Severity | Count |\n|----------|-------|\n"
             for sev in ("critical", "high", "medium", "low", "info"):
                 if sev in by_sev:
-                    lines.append(f"| {sev.upper()} | {by_sev[sev]} |")
+                    yield f"| {sev.upper()} | {by_sev[sev]} |\n"
 
         by_cat = summary.get("by_category", {})
         if by_cat:
-            lines.append("\n| Category | Count |")
-            lines.append("|----------|-------|")
+            yield "\n| Category | Count |\n|----------|-------|\n"
             for cat, count in sorted(by_cat.items(), key=lambda x: -x[1]):
-                lines.append(f"| {cat} | {count} |")
+                yield f"| {cat} | {count} |\n"
 
         # Project metrics
         metrics = report.get("project_metrics", {})
-        lines.append("\n## Project Metrics")
-        lines.append(f"- **Total Lines:** {metrics.get('total_lines', 0):,}")
-        lines.append(f"- **Total Functions:** {metrics.get('total_functions', 0)}")
-        lines.append(f"- **Total Classes:** {metrics.get('total_classes', 0)}")
+        yield "\n## Project Metrics\n"
+        yield f"- **Total Lines:** {metrics.get('total_lines', 0):,}\n"
+        yield f"- **Total Functions:** {metrics.get('total_functions', 0)}\n"
+        yield f"- **Total Classes:** {metrics.get('total_classes', 0)}\n"
 
         # Top issues
         top = summary.get("top_issues", [])
         if top:
-            lines.append("\n## Critical & High Priority Issues")
+            yield "\n## Critical & High Priority Issues\n"
             for i, issue in enumerate(top, 1):
-                lines.append(
+                yield (
                     f"\n### {i}. [{issue.get('severity', '').upper()}] "
-                    f"`{issue.get('file_path', '')}` (line {issue.get('line_range', '?')})"
+                    f"`{issue.get('file_path', '')}` (line {issue.get('line_range', '?')})\n"
+                    f"**Category:** {issue.get('category', 'N/A')}\n"
+                    f"**Issue:** {issue.get('issue', 'N/A')}\n"
+                    f"**Suggestion:** {issue.get('suggestion', 'N/A')}\n"
                 )
-                lines.append(f"**Category:** {issue.get('category', 'N/A')}")
-                lines.append(f"**Issue:** {issue.get('issue', 'N/A')}")
-                lines.append(f"**Suggestion:** {issue.get('suggestion', 'N/A')}")
                 if issue.get("code_snippet"):
-                    lines.append(f"```python\n{issue['code_snippet']}\n```")
+                    yield f"```python\n{issue['code_snippet']}\n```\n"
 
         # Per-file details
-        lines.append("\n## File-by-File Review")
+        yield "\n## File-by-File Review\n"
         for review in report.get("file_reviews", []):
             fpath = review.get("file_path", "unknown")
             score = review.get("overall_score", "?")
-            lines.append(f"\n### `{fpath}` - Score: {score}/10")
+            yield f"\n### `{fpath}` - Score: {score}/10\n"
 
             if review.get("summary"):
-                lines.append(f"\n{review['summary']}")
+                yield f"\n{review['summary']}\n"
 
             strengths = review.get("strengths", [])
             if strengths:
-                lines.append("\n**Strengths:**")
+                yield "\n**Strengths:**\n"
                 for s in strengths:
-                    lines.append(f"- {s}")
+                    yield f"- {s}\n"
 
             findings = review.get("findings", [])
             if findings:
-                lines.append(f"\n**Findings ({len(findings)}):**\n")
-                lines.append("| # | Severity | Category | Line | Issue |")
-                lines.append("|---|----------|----------|------|-------|")
+                yield (
+                    f"\n**Findings ({len(findings)}):**\n\n"
+                    "| # | Severity | Category | Line | Issue |\n"
+                    "|---|----------|----------|------|-------|\n"
+                )
                 for j, f in enumerate(findings, 1):
-                    lines.append(
+                    yield (
                         f"| {j} | {f.get('severity', '')} | {f.get('category', '')} "
-                        f"| {f.get('line_range', '')} | {f.get('issue', '')} |"
+                        f"| {f.get('line_range', '')} | {f.get('issue', '')} |\n"
                     )
 
         # Errors
         errs = report.get("errors", [])
         if errs:
-            lines.append("\n## Errors During Review")
+            yield "\n## Errors During Review\n"
             for err in errs:
-                lines.append(f"- `{err.get('file', '')}`: {err.get('error', '')}")
+                yield f"- `{err.get('file', '')}`: {err.get('error', '')}\n"
 
-        lines.append("\n---\n*Generated by CodeReviewAgent*")
-        return "\n".join(lines)
+        yield "\n---\n*Generated by CodeReviewAgent*"
 
     def save_report(
         self,
@@ -643,10 +1255,9 @@ class CodeReviewAgent(BaseAgent):
             logger.info(f"JSON report saved: {json_path}")
 
         if "md" in formats:
-            md_content = self.generate_markdown_report(report)
             md_path = os.path.join(output_dir, f"review_{timestamp}.md")
             with open(md_path, "w", encoding="utf-8") as f:
-                f.write(md_content)
+                f.writelines(self.iter_markdown_report(report))
             saved["md"] = md_path
             logger.info(f"Markdown report saved: {md_path}")
 
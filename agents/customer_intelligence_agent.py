@@ -1,11 +1,22 @@
 """Customer Intelligence Agent - generates customer intelligence report from proprietary data."""
 
+import hashlib
 import json
+import math
+import os
+import sys
+import tempfile
+from bisect import bisect_right
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import numpy as np
+import pandas as pd
+from gspread.utils import fill_gaps
 from agents.base_agent import BaseAgent
+from config.settings import settings
 from models.state import BrandIntelligenceState
 from utils.logger import get_logger
 from utils.google_sheets_client import GoogleSheetsClient
@@ -13,6 +24,94 @@ from utils.helpers import sanitize_filename
 
 logger = get_logger(__name__)
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Both sheets are fetched in one values.batchGet round-trip; Brand_Data only
+# needs the name/website/parent columns, Refrences is read in full.
+BRAND_DATA_RANGE = "Brand_Data!A:C"
+REFERENCES_RANGE = "Refrences"
+
+NOT_AVAILABLE = "Not Available"
+
+# Churn risk (level, probability) per health-score band: below 50, 50 up to
+# 70, and 70 or more. A score equal to a boundary falls in the upper band.
+CHURN_SCORE_BOUNDARIES = (50, 70)
+CHURN_RISK_BANDS = (("high", 0.60), ("medium", 0.35), ("low", 0.15))
+
+
+def _round_metric(value: float, ndigits: int = 0) -> Optional[float]:
+    """Round a metric for the report JSON; non-finite values become null.
+
+    Args:
+        value: Metric to round
+        ndigits: Decimal places (0 returns an int)
+
+    Returns:
+        Rounded value, or None for NaN/infinity
+    """
+    if not math.isfinite(value):
+        return None
+    return round(value, ndigits) if ndigits else round(value)
+
+
+def _dumps_pretty(payload: Dict[str, Any]) -> str:
+    """Serialize a report payload as indented, non-ASCII-escaped JSON."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # Unsupported type or integer beyond 64 bits; stdlib handles the latter
+            pass
+    return json.dumps(payload, indent=2, ensure_ascii=False)
+
+
+class CampaignSummary:
+    """Aggregated metrics for one campaign in the Refrences sheet."""
+
+    __slots__ = (
+        "transaction_count", "total_cost", "total_revenue", "total_views",
+        "total_impressions", "platforms", "min_date", "max_date", "publish_types"
+    )
+
+    def __init__(
+        self,
+        transaction_count: int = 0,
+        total_cost: float = 0.0,
+        total_revenue: float = 0.0,
+        total_views: float = 0.0,
+        total_impressions: float = 0.0,
+        platforms: Optional[Set[str]] = None,
+        min_date: Optional[str] = None,
+        max_date: Optional[str] = None,
+        publish_types: Optional[Set[str]] = None
+    ):
+        """Store the campaign's totals and the distinct values seen.
+
+        Args:
+            transaction_count: Number of sheet rows for the campaign
+            total_cost: Summed Total Cost
+            total_revenue: Summed Revenue
+            total_views: Summed View
+            total_impressions: Summed Normal Imp + VIP Imp
+            platforms: Distinct upper-cased Media values
+            min_date: Earliest non-empty Date value (string order)
+            max_date: Latest non-empty Date value (string order)
+            publish_types: Distinct Publish type values
+        """
+        self.transaction_count = transaction_count
+        self.total_cost = total_cost
+        self.total_revenue = total_revenue
+        self.total_views = total_views
+        self.total_impressions = total_impressions
+        self.platforms = platforms if platforms is not None else set()
+        self.min_date = min_date
+        self.max_date = max_date
+        self.publish_types = publish_types if publish_types is not None else set()
+
 
 class CustomerIntelligenceAgent(BaseAgent):
     """Agent responsible for generating customer intelligence report from proprietary data."""
@@ -28,6 +127,12 @@ class CustomerIntelligenceAgent(BaseAgent):
         self.credentials_path = credentials_path
         self.sheet_id = sheet_id
         self.sheets_client = None
+        self._spreadsheet_obj = None
+        self._sheets_memo = None
+        self._reference_rows = None
+        self._reference_index = []
+        self._brand_rows = None
+        self._brand_index = {}
 
     def execute(self, state: BrandIntelligenceState) -> BrandIntelligenceState:
         """Generate customer intelligence report.
@@ -44,13 +149,18 @@ class CustomerIntelligenceAgent(BaseAgent):
         output_dir = self._get_output_dir(brand_name)
 
         try:
-            # Initialize Google Sheets client
-            logger.info("Initializing Google Sheets client...")
-            self.sheets_client = GoogleSheetsClient(self.credentials_path)
+            # Initialize Google Sheets client once per agent instance
+            if self.sheets_client is None:
+                logger.info("Initializing Google Sheets client...")
+                self.sheets_client = GoogleSheetsClient(self.credentials_path)
+
+            # Fetch Brand_Data and Refrences in a single API round-trip
+            logger.info("Fetching Brand_Data and Refrences sheets...")
+            brand_rows, reference_rows = self._fetch_sheets_batch()
 
             # Load brand metadata from Brand_Data sheet
             logger.info("Loading brand metadata from Brand_Data sheet...")
-            brand_metadata = self._load_brand_metadata(brand_name)
+            brand_metadata = self._load_brand_metadata(brand_name, brand_rows)
 
             if not brand_metadata:
                 logger.warning(f"Brand {brand_name} not found in Brand_Data sheet")
@@ -63,9 +173,10 @@ class CustomerIntelligenceAgent(BaseAgent):
 
             # Load transaction data from Refrences sheet
             logger.info(f"Loading transaction data from Refrences sheet for {brand_name}...")
-            transactions = self._load_transaction_data(brand_name)
+            transactions = self._load_transaction_data(brand_name, reference_rows)
 
-            logger.info(f"Found {len(transactions)} transactions for {brand_name}")
+            transaction_count = self._transaction_count(transactions)
+            logger.info(f"Found {transaction_count} transactions for {brand_name}")
 
             # Process data
             logger.info("Processing transaction data...")
@@ -84,7 +195,7 @@ class CustomerIntelligenceAgent(BaseAgent):
             state["customer_intelligence"] = {
                 "status": "completed",
                 "report_path": str(report_path),
-                "transaction_count": len(transactions),
+                "transaction_count": transaction_count,
                 "campaign_count": processed_data.get("total_campaigns", 0),
                 "total_revenue": processed_data.get("total_revenue", 0)
             }
@@ -112,68 +223,215 @@ class CustomerIntelligenceAgent(BaseAgent):
         output_dir.mkdir(parents=True, exist_ok=True)
         return output_dir
 
-    def _load_brand_metadata(self, brand_name: str) -> Dict[str, Any]:
-        """Load brand metadata from Brand_Data sheet."""
-        try:
-            spreadsheet = self.sheets_client.client.open_by_key(self.sheet_id)
-            sheet1 = spreadsheet.worksheet('Brand_Data')
-            all_data = sheet1.get_all_values()
-
-            # Search for brand
-            for row in all_data[1:]:  # Skip header
-                if len(row) >= 1 and row[0].strip() == brand_name:
-                    return {
-                        "brand_name": row[0].strip() if len(row) > 0 else "",
-                        "website": row[1].strip() if len(row) > 1 else "Not Available",
-                        "parent_company": row[2].strip() if len(row) > 2 else "Not Available"
-                    }
+    def _spreadsheet(self):
+        """Return the opened spreadsheet, memoized across execute() calls.
 
-            return None
+        ``open_by_key`` issues a metadata request, so the handle is kept on
+        the agent and reused for every brand processed by this instance.
+        """
+        if self._spreadsheet_obj is None:
+            self._spreadsheet_obj = self.sheets_client.client.open_by_key(self.sheet_id)
+        return self._spreadsheet_obj
+
+    def _fetch_sheets_batch(self) -> Tuple[List[List[str]], List[List[str]]]:
+        """Fetch the Brand_Data and Refrences sheets with one batchGet call.
 
+        The grids are cached on disk keyed by the spreadsheet's Drive
+        ``modifiedTime``, so repeated runs against an unchanged sheet only
+        pay for the metadata lookup.
+
+        Returns:
+            Tuple of (Brand_Data rows, Refrences rows), each padded to a
+            rectangular grid like ``Worksheet.get_all_values()``
+        """
+        if settings.SHEETS_CACHE_ENABLED and self._sheets_memo is None and not self._has_sheets_cache():
+            # Nothing cached for this sheet, so the download is needed whatever
+            # modifiedTime says: overlap the Drive lookup with the batchGet
+            self._spreadsheet()
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                cache_path_future = pool.submit(self._sheets_cache_path)
+                brand_rows, reference_rows = self._download_sheets()
+                cache_path = cache_path_future.result()
+
+            if cache_path is not None:
+                self._write_sheets_cache(cache_path, brand_rows, reference_rows)
+                self._sheets_memo = (cache_path, brand_rows, reference_rows)
+            return brand_rows, reference_rows
+
+        cache_path = self._sheets_cache_path()
+        if cache_path is not None and self._sheets_memo is not None:
+            memo_path, brand_rows, reference_rows = self._sheets_memo
+            if memo_path == cache_path:
+                return brand_rows, reference_rows
+
+        if cache_path is not None and cache_path.exists():
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    cached = json.load(f)
+                logger.info(f"Loaded sheet data from cache: {cache_path.name}")
+                self._sheets_memo = (cache_path, cached["brand_data"], cached["references"])
+                return cached["brand_data"], cached["references"]
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable sheet cache {cache_path.name}: {e}")
+
+        brand_rows, reference_rows = self._download_sheets()
+        if cache_path is not None:
+            self._write_sheets_cache(cache_path, brand_rows, reference_rows)
+            self._sheets_memo = (cache_path, brand_rows, reference_rows)
+        return brand_rows, reference_rows
+
+    def _download_sheets(self) -> Tuple[List[List[str]], List[List[str]]]:
+        """Download both ranges in a single values.batchGet request."""
+        response = self._spreadsheet().values_batch_get([BRAND_DATA_RANGE, REFERENCES_RANGE])
+        value_ranges = response.get("valueRanges", [])
+
+        grids = []
+        for idx in range(2):
+            values = value_ranges[idx].get("values", []) if idx < len(value_ranges) else []
+            grids.append(fill_gaps(values) if values else [])
+        return grids[0], grids[1]
+
+    def _has_sheets_cache(self) -> bool:
+        """Whether any cached revision of this spreadsheet exists on disk."""
+        cache_dir = Path(settings.SHEETS_CACHE_DIR)
+        return cache_dir.is_dir() and any(cache_dir.glob(f"{self.sheet_id}_*.json"))
+
+    def _sheets_cache_path(self) -> Optional[Path]:
+        """Return the cache file for the sheet's current revision.
+
+        Returns:
+            Cache path, or None when caching is disabled or the Drive
+            modifiedTime could not be read
+        """
+        if not settings.SHEETS_CACHE_ENABLED:
+            return None
+        try:
+            modified_time = self._spreadsheet().get_lastUpdateTime()
         except Exception as e:
-            logger.error(f"Error loading brand metadata: {e}")
+            logger.warning(f"Could not read sheet modifiedTime, skipping cache: {e}")
             return None
 
-    def _load_transaction_data(self, brand_name: str) -> List[Dict[str, Any]]:
-        """Load transaction data from Refrences sheet."""
+        key = f"{self.sheet_id}|{modified_time}|{BRAND_DATA_RANGE}|{REFERENCES_RANGE}"
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        return Path(settings.SHEETS_CACHE_DIR) / f"{self.sheet_id}_{digest}.json"
+
+    def _write_sheets_cache(
+        self,
+        cache_path: Path,
+        brand_rows: List[List[str]],
+        reference_rows: List[List[str]]
+    ) -> None:
+        """Atomically write fetched grids and drop older revisions of the sheet."""
         try:
-            spreadsheet = self.sheets_client.client.open_by_key(self.sheet_id)
-            sheet2 = spreadsheet.worksheet('Refrences')
-            all_data = sheet2.get_all_values()
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(
+                        {"brand_data": brand_rows, "references": reference_rows},
+                        f,
+                        ensure_ascii=False
+                    )
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+            for stale in cache_path.parent.glob(f"{self.sheet_id}_*.json"):
+                if stale != cache_path:
+                    stale.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not write sheet cache: {e}")
+
+    def _load_brand_metadata(self, brand_name: str, all_data: List[List[str]]) -> Dict[str, Any]:
+        """Load brand metadata from pre-fetched Brand_Data rows."""
+        try:
+            row = self._indexed_brand_rows(all_data).get(brand_name)
+            if row is None:
+                return None
 
-            if len(all_data) < 2:
-                return []
+            return {
+                "brand_name": row[0].strip() if len(row) > 0 else "",
+                "website": row[1].strip() if len(row) > 1 else "Not Available",
+                "parent_company": row[2].strip() if len(row) > 2 else "Not Available"
+            }
 
-            headers = all_data[0]
-            transactions = []
+        except Exception as e:
+            logger.error(f"Error loading brand metadata: {e}")
+            return None
 
-            # Find all rows for this brand
-            for row in all_data[1:]:
-                if len(row) > 8:
-                    brand_col = row[7] if len(row) > 7 else ''
-                    customer_col = row[8] if len(row) > 8 else ''
+    def _indexed_brand_rows(self, all_data: List[List[str]]) -> Dict[str, List[str]]:
+        """Return Brand_Data rows keyed by their stripped brand name.
 
-                    # Match brand
-                    if brand_name.lower() in str(brand_col).lower() or \
-                       brand_name.lower() in str(customer_col).lower():
+        Built once per fetched grid and reused by every brand looked up
+        against it. The first row for a name wins, as with the old scan.
+        """
+        if self._brand_rows is not all_data:
+            index = {}
+            for row in islice(all_data, 1, None):  # Skip header
+                if row:
+                    index.setdefault(row[0].strip(), row)
+            self._brand_index = index
+            self._brand_rows = all_data
+        return self._brand_index
+
+    def _load_transaction_data(self, brand_name: str, all_data: List[List[str]]) -> Dict[str, List[str]]:
+        """Load transaction data from pre-fetched Refrences rows.
 
-                        # Build transaction dict
-                        transaction = {}
-                        for i, header in enumerate(headers):
-                            transaction[header] = row[i] if i < len(row) else ""
+        Returns:
+            Column-wise transactions: one list of cell values per header,
+            aligned by matching row (empty dict when nothing can be read)
+        """
+        try:
+            if len(all_data) < 2:
+                return {}
 
-                        transactions.append(transaction)
+            # Interned so the column lookups by literal name hit on identity
+            headers = [sys.intern(header) for header in all_data[0]]
+            needle = brand_name.lower()
 
-            return transactions
+            # Find all rows for this brand (brand in column H, customer in column I)
+            rows = [
+                row for brand_col, customer_col, row in self._lowered_reference_rows(all_data)
+                if needle in brand_col or needle in customer_col
+            ]
+
+            # Later duplicate headers win, as with the old per-row dicts
+            return {
+                header: [row[i] if i < len(row) else "" for row in rows]
+                for i, header in enumerate(headers)
+            }
 
         except Exception as e:
             logger.error(f"Error loading transaction data: {e}")
-            return []
+            return {}
+
+    def _lowered_reference_rows(self, all_data: List[List[str]]) -> List[Tuple[str, str, List[str]]]:
+        """Return (lowered brand column, lowered customer column, row) per data row.
 
-    def _process_transaction_data(self, transactions: List[Dict], metadata: Dict) -> Dict[str, Any]:
-        """Process and aggregate transaction data."""
+        Built once per fetched grid and reused by every brand looked up
+        against it, so each cell is lowercased once rather than per brand.
+        """
+        if self._reference_rows is not all_data:
+            self._reference_index = [
+                (row[7].lower(), row[8].lower(), row)
+                for row in islice(all_data, 1, None)
+                if len(row) > 8
+            ]
+            self._reference_rows = all_data
+        return self._reference_index
+
+    def _process_transaction_data(self, transactions: Dict[str, List[str]], metadata: Dict) -> Dict[str, Any]:
+        """Process and aggregate transaction data.
+
+        Takes the column-wise transactions from ``_load_transaction_data``;
+        each field becomes a DataFrame column and is aggregated with
+        groupby, and the results are converted back to the dict schema the
+        report sections expect.
+        """
 
-        if not transactions:
+        transaction_count = self._transaction_count(transactions)
+        if not transaction_count:
             return {
                 "total_campaigns": 0,
                 "total_revenue": 0,
@@ -181,150 +439,160 @@ class CustomerIntelligenceAgent(BaseAgent):
                 "total_transactions": 0
             }
 
-        # Parse and aggregate
-        campaigns = defaultdict(lambda: {
-            "transactions": [],
-            "total_cost": 0,
-            "total_revenue": 0,
-            "total_views": 0,
-            "total_impressions": 0,
-            "platforms": set(),
-            "dates": [],
-            "publish_types": set()
+        def column(name: str) -> pd.Series:
+            """Stripped string column; empty when the sheet lacks the field."""
+            values = transactions.get(name)
+            if values is None:
+                return pd.Series([""] * transaction_count, dtype=object)
+            return pd.Series([value.strip() for value in values], dtype=object)
+
+        def number_column(name: str) -> pd.Series:
+            """Numeric column; 0 when the sheet lacks the field."""
+            values = transactions.get(name)
+            if values is None:
+                return pd.Series(0.0, index=range(transaction_count))
+            return self._parse_number_series(values)
+
+        frame = pd.DataFrame({
+            "campaign": column("Campaign Name").replace("", "Unnamed Campaign"),
+            "platform": column("Media").str.upper(),
+            "publish_type": column("Publish type"),
+            "date": column("Date"),
+            "payment": column("Payment status"),
+            "cost": number_column("Total Cost"),
+            "revenue": number_column("Revenue"),
+            "views": number_column("View"),
+            "normal_imp": number_column("Normal Imp"),
+            "vip_imp": number_column("VIP Imp"),
         })
+        frame["impressions"] = frame["normal_imp"] + frame["vip_imp"]
+
+        # Campaign aggregation (first-seen order, like the sheet)
+        has_platform = frame["platform"] != ""
+        has_publish_type = frame["publish_type"] != ""
+        has_date = frame["date"] != ""
+
+        by_campaign = frame.groupby("campaign", sort=False)
+        campaign_sums = by_campaign[["cost", "revenue", "views", "impressions"]].sum()
+        campaign_rows = by_campaign.indices
+        campaign_platforms = frame[has_platform].groupby("campaign", sort=False)["platform"].agg(set)
+        campaign_publish_types = (
+            frame[has_publish_type].groupby("campaign", sort=False)["publish_type"].agg(set)
+        )
+        campaign_dates = frame[has_date].groupby("campaign", sort=False)["date"].agg(["min", "max"])
+        campaign_min_dates = campaign_dates["min"].to_dict()
+        campaign_max_dates = campaign_dates["max"].to_dict()
+
+        campaigns = {}
+        for campaign_name, cost, revenue, views, impressions in zip(
+            campaign_sums.index,
+            campaign_sums["cost"].tolist(),
+            campaign_sums["revenue"].tolist(),
+            campaign_sums["views"].tolist(),
+            campaign_sums["impressions"].tolist()
+        ):
+            campaigns[campaign_name] = CampaignSummary(
+                transaction_count=len(campaign_rows[campaign_name]),
+                total_cost=cost,
+                total_revenue=revenue,
+                total_views=views,
+                total_impressions=impressions,
+                platforms=campaign_platforms.get(campaign_name, set()),
+                min_date=campaign_min_dates.get(campaign_name),
+                max_date=campaign_max_dates.get(campaign_name),
+                publish_types=campaign_publish_types.get(campaign_name, set())
+            )
 
-        total_revenue = 0
-        total_cost = 0
-        total_views = 0
-        total_normal_impressions = 0
-        total_vip_impressions = 0
-        platforms_used = defaultdict(lambda: {"cost": 0, "revenue": 0, "views": 0, "count": 0})
-        sales_people = set()
-        account_managers = set()
-        operations_team = set()
-        payment_statuses = []
-        dates = []
-        invoices = []
-        year_revenue = defaultdict(float)
-
-        for tx in transactions:
-            # Campaign aggregation
-            campaign_name = tx.get("Campaign Name", "").strip()
-            if not campaign_name:
-                campaign_name = "Unnamed Campaign"
-
-            campaigns[campaign_name]["transactions"].append(tx)
-
-            # Parse numeric values
-            cost = self._parse_persian_number(tx.get("Total Cost", "0"))
-            revenue = self._parse_persian_number(tx.get("Revenue", "0"))
-            views = self._parse_persian_number(tx.get("View", "0"))
-            normal_imp = self._parse_persian_number(tx.get("Normal Imp", "0"))
-            vip_imp = self._parse_persian_number(tx.get("VIP Imp", "0"))
-
-            campaigns[campaign_name]["total_cost"] += cost
-            campaigns[campaign_name]["total_revenue"] += revenue
-            campaigns[campaign_name]["total_views"] += views
-            campaigns[campaign_name]["total_impressions"] += (normal_imp + vip_imp)
-
-            # Platform
-            platform = tx.get("Media", "").strip().upper()
-            if platform:
-                campaigns[campaign_name]["platforms"].add(platform)
-                platforms_used[platform]["cost"] += cost
-                platforms_used[platform]["revenue"] += revenue
-                platforms_used[platform]["views"] += views
-                platforms_used[platform]["count"] += 1
-
-            # Publish type
-            publish_type = tx.get("Publish type", "").strip()
-            if publish_type:
-                campaigns[campaign_name]["publish_types"].add(publish_type)
-
-            # Dates
-            date_str = tx.get("Date", "").strip()
-            if date_str:
-                campaigns[campaign_name]["dates"].append(date_str)
-
-            # Overall aggregation
-            total_cost += cost
-            total_revenue += revenue
-            total_views += views
-            total_normal_impressions += normal_imp
-            total_vip_impressions += vip_imp
-
-            sale = tx.get("Sale", "").strip()
-            if sale and sale != "-":
-                sales_people.add(sale)
-
-            account = tx.get("Account", "").strip()
-            if account and account != "-":
-                account_managers.add(account)
-
-            operation = tx.get("Operation", "").strip()
-            if operation and operation != "-":
-                operations_team.add(operation)
-
-            payment = tx.get("Payment status", "").strip()
-            if payment:
-                payment_statuses.append(payment)
-
-            if date_str:
-                dates.append(date_str)
-                # Extract year for revenue breakdown
-                try:
-                    if len(date_str) == 8:  # Persian date format YYYYMMDD
-                        year = date_str[:4]
-                        year_revenue[year] += revenue
-                except:
-                    pass
-
-            # Invoice tracking
-            invoice_num = tx.get("Invoice Number", "").strip()
-            if invoice_num:
-                invoices.append({
-                    "invoice_number": invoice_num,
-                    "invoice_type": tx.get("Invoice Type", "").strip(),
-                    "amount": revenue,
-                    "payment_status": payment,
-                    "date": date_str
-                })
+        # Platform aggregation
+        platform_stats = frame[has_platform].groupby("platform", sort=False).agg(
+            cost=("cost", "sum"),
+            revenue=("revenue", "sum"),
+            views=("views", "sum"),
+            count=("cost", "size")
+        )
+
+        # Overall aggregation
+        total_cost = float(frame["cost"].sum())
+        total_revenue = float(frame["revenue"].sum())
+        total_views = float(frame["views"].sum())
+        total_impressions = float(frame["normal_imp"].sum() + frame["vip_imp"].sum())
+
+        def people(name: str) -> set:
+            return set(column(name).unique()) - {"", "-"}
+
+        sales_people = people("Sale")
+        account_managers = people("Account")
+        operations_team = people("Operation")
+
+        payment_statuses = frame.loc[frame["payment"] != "", "payment"]
+        dates = frame.loc[has_date, "date"]
+
+        # Revenue by year for Persian YYYYMMDD dates (rows without one drop out
+        # of the groupby as None keys)
+        years = pd.Series(
+            [date[:4] if len(date) == 8 and date[:4].isdigit() else None for date in frame["date"]],
+            dtype=object
+        )
+        year_revenue = frame["revenue"].groupby(years, sort=False).sum()
+
+        # Invoice tracking
+        invoice_numbers = column("Invoice Number")
+        has_invoice = invoice_numbers != ""
+        invoices = [
+            {
+                "invoice_number": invoice_number,
+                "invoice_type": invoice_type,
+                "amount": float(amount),
+                "payment_status": payment,
+                "date": date_str
+            }
+            for invoice_number, invoice_type, amount, payment, date_str in zip(
+                invoice_numbers[has_invoice].tolist(),
+                column("Invoice Type")[has_invoice].tolist(),
+                frame.loc[has_invoice, "revenue"].tolist(),
+                frame.loc[has_invoice, "payment"].tolist(),
+                frame.loc[has_invoice, "date"].tolist()
+            )
+        ]
 
         # Calculate metrics
         profit = total_revenue - total_cost
         profit_margin = (profit / total_revenue * 100) if total_revenue > 0 else 0
 
         # Payment behavior
-        paid_count = sum(1 for p in payment_statuses if p and ("paid" in p.lower() or "پرداخت" in p))
-        payment_rate = (paid_count / len(payment_statuses)) if payment_statuses else 0
+        paid_count = int((
+            payment_statuses.str.lower().str.contains("paid", regex=False)
+            | payment_statuses.str.contains("پرداخت", regex=False)
+        ).sum())
+        payment_rate = (paid_count / len(payment_statuses)) if len(payment_statuses) else 0
 
         # Date range
-        first_date = min(dates) if dates else "Not Available"
-        last_date = max(dates) if dates else "Not Available"
+        first_date = min(dates) if len(dates) else "Not Available"
+        last_date = max(dates) if len(dates) else "Not Available"
 
         # Platform metrics
         platform_breakdown = {}
-        for platform, metrics in platforms_used.items():
+        for platform, metrics in platform_stats.iterrows():
             avg_cpv = metrics["cost"] / metrics["views"] if metrics["views"] > 0 else 0
             platform_breakdown[platform] = {
-                "total_cost": metrics["cost"],
-                "total_revenue": metrics["revenue"],
-                "total_views": metrics["views"],
-                "transactions": metrics["count"],
-                "avg_cpv": avg_cpv
+                "total_cost": float(metrics["cost"]),
+                "total_revenue": float(metrics["revenue"]),
+                "total_views": float(metrics["views"]),
+                "transactions": int(metrics["count"]),
+                "avg_cpv": float(avg_cpv)
             }
 
         return {
             "total_campaigns": len(campaigns),
-            "campaigns": dict(campaigns),
-            "total_transactions": len(transactions),
+            "campaigns": campaigns,
+            "total_transactions": transaction_count,
             "total_revenue": total_revenue,
             "total_cost": total_cost,
             "total_profit": profit,
             "profit_margin": profit_margin,
             "total_views": total_views,
-            "total_impressions": total_normal_impressions + total_vip_impressions,
-            "platforms_used": list(platforms_used.keys()),
+            "total_impressions": total_impressions,
+            "platforms_used": list(platform_stats.index),
             "platform_breakdown": platform_breakdown,
             "sales_people": list(sales_people),
             "account_managers": list(account_managers),
@@ -332,13 +600,34 @@ class CustomerIntelligenceAgent(BaseAgent):
             "payment_rate": payment_rate,
             "first_transaction_date": first_date,
             "last_transaction_date": last_date,
-            "avg_transaction_value": total_revenue / len(transactions) if transactions else 0,
+            "avg_transaction_value": total_revenue / transaction_count,
             "invoices": invoices,
             "total_paid": paid_count,
             "total_unpaid": len(payment_statuses) - paid_count,
-            "year_revenue": dict(year_revenue)
+            "year_revenue": {year: float(revenue) for year, revenue in year_revenue.items()}
         }
 
+    def _transaction_count(self, transactions: Dict[str, List[str]]) -> int:
+        """Number of rows in a column-wise transaction table."""
+        return max(map(len, transactions.values()), default=0)
+
+    def _parse_number_series(self, values: List[Any]) -> pd.Series:
+        """Parse Persian-formatted number strings to a float column.
+
+        Column-wise equivalent of ``_parse_persian_number``: separators are
+        stripped up front and numpy converts the whole column with
+        ``float()`` semantics (so Persian digits still parse). Only a column
+        containing an unparseable cell falls back to the per-cell parser.
+        """
+        cleaned = [
+            str(value).replace(",", "").replace("٬", "").strip() or "0"
+            for value in values
+        ]
+        try:
+            return pd.Series(np.array(cleaned, dtype=object).astype(float))
+        except ValueError:
+            return pd.Series([self._parse_persian_number(value) for value in cleaned], dtype=float)
+
     def _parse_persian_number(self, value: str) -> float:
         """Parse Persian number string to float."""
         try:
@@ -355,402 +644,329 @@ class CustomerIntelligenceAgent(BaseAgent):
         processed_data: Dict,
         output_dir: Path
     ) -> Path:
-        """Generate comprehensive markdown report following template structure."""
+        """Generate comprehensive markdown report following template structure.
+
+        Blocks are streamed to disk as the report yields them instead of
+        being joined into one string first.
+        """
 
         output_path = output_dir / "8_customer_intelligence_report.md"
+        blocks = self._iter_report_blocks(brand_name, metadata, processed_data)
 
-        lines = []
+        # Write file
+        with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.write(next(blocks))
+            f.writelines("\n\n" + block for block in blocks)
+
+        return output_path
+
+    def _iter_report_blocks(
+        self,
+        brand_name: str,
+        metadata: Dict,
+        processed_data: Dict
+    ) -> Iterator[str]:
+        """Yield the report blocks in order, header through footer.
+
+        Each block is one pre-joined string; the writer separates
+        consecutive blocks with a blank line.
+        """
+
+        # One clock read per report; every section shares the same timestamp
+        now = datetime.now()
+        now_iso = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+        now_human = now.strftime("%Y-%m-%d %H:%M:%S")
 
         # Header
-        lines.append("# Customer Intelligence Folder Specification")
-        lines.append("## Trend Media — AI Agent Data Architecture")
-        lines.append("")
-        lines.append(f"**Brand:** {brand_name}")
-        lines.append(f"**Parent Company:** {metadata.get('parent_company', 'Not Available')}")
-        lines.append(f"**Website:** {metadata.get('website', 'Not Available')}")
-        lines.append(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        lines.append(f"**Data Source:** Google Sheets - Refrences")
-        lines.append(f"**Total Transactions:** {processed_data.get('total_transactions', 0)}")
-        lines.append(f"**Total Campaigns:** {processed_data.get('total_campaigns', 0)}")
-        lines.append(f"**Report Version:** 1.0")
-        lines.append("")
-        lines.append("---")
-        lines.append("")
-
-        # Section 8: CRM Record
-        lines.extend(self._generate_section_8(brand_name, metadata, processed_data))
-        lines.append("")
-
-        # Section 9: Campaign History
-        lines.extend(self._generate_section_9(processed_data))
-        lines.append("")
-
-        # Section 10: Creator Performance
-        lines.extend(self._generate_section_10(processed_data))
-        lines.append("")
-
-        # Section 11: Financial History
-        lines.extend(self._generate_section_11(processed_data))
-        lines.append("")
-
-        # Section 12: Communications Log
-        lines.extend(self._generate_section_12())
-        lines.append("")
-
-        # Section 13: Relationship Score
-        lines.extend(self._generate_section_13(processed_data))
-        lines.append("")
-
-        # Section 14: MMM Readiness
-        lines.extend(self._generate_section_14(processed_data))
-        lines.append("")
+        yield f"""# Customer Intelligence Folder Specification
+## Trend Media — AI Agent Data Architecture
+
+**Brand:** {brand_name}
+**Parent Company:** {metadata.get('parent_company', 'Not Available')}
+**Website:** {metadata.get('website', 'Not Available')}
+**Generated:** {now_human}
+**Data Source:** Google Sheets - Refrences
+**Total Transactions:** {processed_data.get('total_transactions', 0)}
+**Total Campaigns:** {processed_data.get('total_campaigns', 0)}
+**Report Version:** 1.0
+
+---"""
+
+        # Sections 8-14
+        yield self._generate_section_8(brand_name, metadata, processed_data, now_iso)
+        yield self._generate_section_9(processed_data, now_iso)
+        yield self._generate_section_10(processed_data, now_iso)
+        yield self._generate_section_11(processed_data, now_iso)
+        yield self._generate_section_12(now_iso)
+        yield self._generate_section_13(processed_data, now_iso)
+        yield self._generate_section_14(processed_data, now_iso)
 
         # Footer
-        lines.append("---")
-        lines.append("")
-        lines.append(f"*Report generated by Customer Intelligence Agent on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
-        lines.append("")
-        lines.append("**Data Source:** Google Sheets - Internal Operations Database (Refrences)")
+        yield f"""---
 
-        # Write file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write("\n".join(lines))
+*Report generated by Customer Intelligence Agent on {now_human}*
 
-        return output_path
+**Data Source:** Google Sheets - Internal Operations Database (Refrences)"""
 
-    def _generate_section_8(self, brand_name: str, metadata: Dict, data: Dict) -> List[str]:
-        """Generate Section 8: CRM Record (JSON schema in markdown)."""
-        lines = []
-        lines.append("## 8. CRM Record — CRM Data")
-        lines.append("")
-        lines.append("**Source:** Google Sheets (Refrences)")
-        lines.append("")
-        lines.append("```json")
-        lines.append("{")
-        lines.append('  "crm_record": {')
-        lines.append(f'    "sync_date": "{datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")}",')
-        lines.append('    "crm_account_id": "Not Available",')
-        lines.append('    "source_system": "google_sheets"')
-        lines.append('  },')
-        lines.append('  "account": {')
-        lines.append(f'    "name": "{brand_name}",')
-        lines.append(f'    "name_fa": "{brand_name}",')
-        lines.append('    "account_type": "Not Available",')
-        lines.append('    "industry_vertical": "Not Available",')
-        lines.append('    "sub_vertical": "Not Available",')
-        lines.append('    "tier": "Not Available",')
+    def _render_section(self, heading: str, source: str, payload: Dict[str, Any]) -> str:
+        """Render a section: heading, source note, fenced JSON payload and rule."""
+        return f"""{heading}
 
-        account_managers = data.get("account_managers", [])
-        if account_managers:
-            lines.append(f'    "assigned_account_manager": "{", ".join(account_managers[:2])}",')
-        else:
-            lines.append('    "assigned_account_manager": "Not Available",')
-        lines.append('    "assigned_account_manager_id": "Not Available"')
-        lines.append('  },')
+**Source:** {source}
 
-        lines.append('  "contacts": [')
+```json
+{_dumps_pretty(payload)}
+```
+
+---"""
+
+    def _generate_section_8(
+        self,
+        brand_name: str,
+        metadata: Dict,
+        data: Dict,
+        now_iso: str
+    ) -> str:
+        """Generate Section 8: CRM Record (JSON schema in markdown)."""
+        account_managers = data.get("account_managers", [])
         sales_people = data.get("sales_people", [])
         operations = data.get("operations_team", [])
 
-        if sales_people or operations:
-            all_contacts = list(sales_people[:2]) + list(operations[:1])
-            for idx, person in enumerate(all_contacts):
-                lines.append('    {')
-                lines.append(f'      "name": "{person}",')
-                lines.append('      "title": "Not Available",')
-                role = "sales" if person in sales_people else "operations"
-                lines.append(f'      "role": "{role}",')
-                lines.append('      "email": "Not Available",')
-                lines.append('      "phone": "Not Available",')
-                lines.append('      "preferred_channel": "Not Available",')
-                lines.append('      "last_contacted": "Not Available",')
-                lines.append('      "notes": "Not Available"')
-                if idx < len(all_contacts) - 1:
-                    lines.append('    },')
-                else:
-                    lines.append('    }')
-        lines.append('  ],')
-
-        lines.append('  "deal_pipeline": {')
-        lines.append('    "active_deals": [],')
-        lines.append('    "lost_deals_last_12m": [],')
-        lines.append('    "won_deals_last_12m": "Not Available"')
-        lines.append('  },')
-
-        lines.append('  "relationship_timeline": {')
-        lines.append(f'    "first_engagement": "{data.get("first_transaction_date", "Not Available")}",')
-        lines.append(f'    "total_deals_won": {data.get("total_campaigns", 0)},')
-        lines.append('    "total_deals_lost": "Not Available",')
-        lines.append(f'    "total_lifetime_revenue_tomans": {data.get("total_revenue", 0):.0f},')
-        lines.append(f'    "last_campaign_end_date": "{data.get("last_transaction_date", "Not Available")}",')
-        lines.append('    "days_since_last_campaign": "Not Available",')
-        lines.append('    "renewal_status": "Not Available",')
-        lines.append('    "nps_score": null,')
-        lines.append('    "satisfaction_signals": [],')
-        lines.append('    "risk_signals": []')
-        lines.append('  }')
-        lines.append("}")
-        lines.append("```")
-        lines.append("")
-        lines.append("---")
-        return lines
-
-    def _generate_section_9(self, data: Dict) -> List[str]:
-        """Generate Section 9: Campaign History."""
-        lines = []
-        lines.append("## 9. Campaign History — All Past Campaigns")
-        lines.append("")
-        lines.append("**Source:** Google Sheets (Refrences)")
-        lines.append("")
-        lines.append("```json")
-        lines.append("{")
-        lines.append('  "campaign_history": {')
-        lines.append(f'    "sync_date": "{datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")}",')
-        lines.append(f'    "brand_slug": "{sanitize_filename(data.get("brand_name", "unknown"))}",')
-        lines.append(f'    "total_campaigns": {data.get("total_campaigns", 0)},')
-        lines.append(f'    "first_campaign": "{data.get("first_transaction_date", "Not Available")}",')
-        lines.append(f'    "last_campaign": "{data.get("last_transaction_date", "Not Available")}",')
-        lines.append(f'    "total_spend_tomans": {data.get("total_cost", 0):.0f}')
-        lines.append('  },')
-        lines.append('  "campaigns": [')
+        contacts = []
+        for person in list(sales_people[:2]) + list(operations[:1]):
+            contacts.append({
+                "name": person,
+                "title": NOT_AVAILABLE,
+                "role": "sales" if person in sales_people else "operations",
+                "email": NOT_AVAILABLE,
+                "phone": NOT_AVAILABLE,
+                "preferred_channel": NOT_AVAILABLE,
+                "last_contacted": NOT_AVAILABLE,
+                "notes": NOT_AVAILABLE
+            })
+
+        return self._render_section(
+            "## 8. CRM Record — CRM Data",
+            "Google Sheets (Refrences)",
+            {
+                "crm_record": {
+                    "sync_date": now_iso,
+                    "crm_account_id": NOT_AVAILABLE,
+                    "source_system": "google_sheets"
+                },
+                "account": {
+                    "name": brand_name,
+                    "name_fa": brand_name,
+                    "account_type": NOT_AVAILABLE,
+                    "industry_vertical": NOT_AVAILABLE,
+                    "sub_vertical": NOT_AVAILABLE,
+                    "tier": NOT_AVAILABLE,
+                    "assigned_account_manager": (
+                        ", ".join(account_managers[:2]) if account_managers else NOT_AVAILABLE
+                    ),
+                    "assigned_account_manager_id": NOT_AVAILABLE
+                },
+                "contacts": contacts,
+                "deal_pipeline": {
+                    "active_deals": [],
+                    "lost_deals_last_12m": [],
+                    "won_deals_last_12m": NOT_AVAILABLE
+                },
+                "relationship_timeline": {
+                    "first_engagement": data.get("first_transaction_date", NOT_AVAILABLE),
+                    "total_deals_won": data.get("total_campaigns", 0),
+                    "total_deals_lost": NOT_AVAILABLE,
+                    "total_lifetime_revenue_tomans": _round_metric(data.get("total_revenue", 0)),
+                    "last_campaign_end_date": data.get("last_transaction_date", NOT_AVAILABLE),
+                    "days_since_last_campaign": NOT_AVAILABLE,
+                    "renewal_status": NOT_AVAILABLE,
+                    "nps_score": None,
+                    "satisfaction_signals": [],
+                    "risk_signals": []
+                }
+            }
+        )
 
+    def _generate_section_9(self, data: Dict, now_iso: str) -> str:
+        """Generate Section 9: Campaign History."""
         campaigns = data.get('campaigns', {})
         campaign_list = list(campaigns.items())[:5]  # Show first 5 campaigns
 
+        campaign_entries = []
         for idx, (campaign_name, campaign_data) in enumerate(campaign_list):
-            lines.append('    {')
-            lines.append(f'      "campaign_id": "CAMP-{idx+1:04d}",')
-            lines.append(f'      "campaign_name": "{campaign_name}",')
-            lines.append('      "status": "completed",')
-            lines.append('      "objective": "Not Available",')
-
-            dates = campaign_data.get('dates', [])
-            if dates:
-                lines.append(f'      "start_date": "{min(dates)}",')
-                lines.append(f'      "end_date": "{max(dates)}",')
-            else:
-                lines.append('      "start_date": "Not Available",')
-                lines.append('      "end_date": "Not Available",')
-
-            lines.append(f'      "budget_tomans": {campaign_data["total_cost"]:.0f},')
-            lines.append(f'      "actual_spend_tomans": {campaign_data["total_cost"]:.0f},')
-
-            platforms = list(campaign_data.get('platforms', []))
-            lines.append(f'      "platforms": {json.dumps(platforms)},')
-
-            publish_types = list(campaign_data.get('publish_types', []))
-            lines.append(f'      "content_formats": {json.dumps(publish_types)},')
-
-            lines.append('      "total_creators_used": "Not Available",')
-            lines.append(f'      "total_content_pieces": {len(campaign_data["transactions"])},')
-
-            lines.append('      "performance": {')
-            lines.append('        "total_reach": "Not Available",')
-            lines.append(f'        "total_impressions": {campaign_data["total_impressions"]:.0f},')
-            lines.append(f'        "total_views": {campaign_data["total_views"]:.0f},')
-            lines.append('        "total_engagements": "Not Available",')
-            lines.append('        "engagement_rate": "Not Available",')
-
-            if campaign_data['total_views'] > 0:
-                cpv = campaign_data['total_cost'] / campaign_data['total_views']
-                lines.append(f'        "cost_per_view": {cpv:.0f}')
-            else:
-                lines.append('        "cost_per_view": "Not Available"')
-
-            lines.append('      }')
-            if idx < len(campaign_list) - 1:
-                lines.append('    },')
+            start_date = campaign_data.min_date
+            end_date = campaign_data.max_date
+            if campaign_data.total_views > 0:
+                cost_per_view = _round_metric(campaign_data.total_cost / campaign_data.total_views)
             else:
-                lines.append('    }')
+                cost_per_view = NOT_AVAILABLE
 
-        lines.append('  ],')
-        lines.append('  "aggregate_metrics": {')
-        lines.append('    "avg_engagement_rate": "Not Available",')
+            campaign_entries.append({
+                "campaign_id": f"CAMP-{idx+1:04d}",
+                "campaign_name": campaign_name,
+                "status": "completed",
+                "objective": NOT_AVAILABLE,
+                "start_date": start_date if start_date is not None else NOT_AVAILABLE,
+                "end_date": end_date if end_date is not None else NOT_AVAILABLE,
+                "budget_tomans": _round_metric(campaign_data.total_cost),
+                "actual_spend_tomans": _round_metric(campaign_data.total_cost),
+                "platforms": list(campaign_data.platforms),
+                "content_formats": list(campaign_data.publish_types),
+                "total_creators_used": NOT_AVAILABLE,
+                "total_content_pieces": campaign_data.transaction_count,
+                "performance": {
+                    "total_reach": NOT_AVAILABLE,
+                    "total_impressions": _round_metric(campaign_data.total_impressions),
+                    "total_views": _round_metric(campaign_data.total_views),
+                    "total_engagements": NOT_AVAILABLE,
+                    "engagement_rate": NOT_AVAILABLE,
+                    "cost_per_view": cost_per_view
+                }
+            })
 
         total_views = data.get('total_views', 0)
         total_cost = data.get('total_cost', 0)
-        if total_views > 0:
-            avg_cpv = total_cost / total_views
-            lines.append(f'    "avg_cost_per_view": {avg_cpv:.0f},')
-        else:
-            lines.append('    "avg_cost_per_view": "Not Available",')
-
         platforms = data.get('platforms_used', [])
-        if platforms:
-            lines.append(f'    "best_performing_platform": "{platforms[0]}",')
-        else:
-            lines.append('    "best_performing_platform": "Not Available",')
-
-        lines.append('    "total_unique_creators_used": "Not Available",')
-        lines.append('    "seasonal_patterns": "Not Available"')
-        lines.append('  }')
-        lines.append("}")
-        lines.append("```")
-        lines.append("")
-        lines.append("---")
-        return lines
-
-    def _generate_section_10(self, data: Dict) -> List[str]:
-        """Generate Section 10: Creator Performance."""
-        lines = []
-        lines.append("## 10. Creator Performance — Creator Data for This Client")
-        lines.append("")
-        lines.append("**Source:** Google Sheets (Refrences)")
-        lines.append("")
-        lines.append("```json")
-        lines.append("{")
-        lines.append('  "creator_performance": {')
-        lines.append(f'    "sync_date": "{datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")}",')
-        lines.append('    "brand_slug": "Not Available",')
-        lines.append('    "total_creators_engaged": "Not Available",')
-        lines.append(f'    "analysis_period": "{data.get("first_transaction_date", "Not Available")} to {data.get("last_transaction_date", "Not Available")}"')
-        lines.append('  },')
-        lines.append('  "top_performers": [],')
-
-        lines.append('  "platform_breakdown": {')
-        platform_breakdown = data.get('platform_breakdown', {})
-        platform_list = list(platform_breakdown.items())
-
-        for idx, (platform, metrics) in enumerate(platform_list):
-            lines.append(f'    "{platform.lower()}": {{')
-            lines.append('      "creators_used": "Not Available",')
-            lines.append('      "avg_engagement_rate": "Not Available",')
-            lines.append(f'      "avg_cpv": {metrics["avg_cpv"]:.0f},')
-            lines.append('      "best_format": "Not Available"')
-            if idx < len(platform_list) - 1:
-                lines.append('    },')
-            else:
-                lines.append('    }')
-
-        lines.append('  },')
-        lines.append('  "recommended_for_next_campaign": [],')
-        lines.append('  "blacklisted_creators": []')
-        lines.append("}")
-        lines.append("```")
-        lines.append("")
-        lines.append("---")
-        return lines
-
-    def _generate_section_11(self, data: Dict) -> List[str]:
-        """Generate Section 11: Financial History."""
-        lines = []
-        lines.append("## 11. Financial History — AR, Invoicing, Payment Behavior")
-        lines.append("")
-        lines.append("**Source:** Google Sheets (Refrences)")
-        lines.append("")
-        lines.append("```json")
-        lines.append("{")
-        lines.append('  "financial_history": {')
-        lines.append(f'    "sync_date": "{datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")}",')
-        lines.append('    "brand_slug": "Not Available",')
-        lines.append('    "accounting_entity_id": "Not Available"')
-        lines.append('  },')
-
-        lines.append('  "revenue_summary": {')
-        lines.append(f'    "total_lifetime_revenue_tomans": {data.get("total_revenue", 0):.0f},')
-
-        year_revenue = data.get('year_revenue', {})
-        if year_revenue:
-            lines.append('    "revenue_by_year": {')
-            year_items = list(year_revenue.items())
-            for idx, (year, revenue) in enumerate(year_items):
-                if idx < len(year_items) - 1:
-                    lines.append(f'      "{year}": {revenue:.0f},')
-                else:
-                    lines.append(f'      "{year}": {revenue:.0f}')
-            lines.append('    },')
-        else:
-            lines.append('    "revenue_by_year": {},')
 
-        lines.append(f'    "avg_deal_size_tomans": {data.get("avg_transaction_value", 0):.0f},')
-        lines.append('    "largest_deal_tomans": "Not Available",')
-        lines.append('    "payment_terms_standard": "Not Available"')
-        lines.append('  },')
+        return self._render_section(
+            "## 9. Campaign History — All Past Campaigns",
+            "Google Sheets (Refrences)",
+            {
+                "campaign_history": {
+                    "sync_date": now_iso,
+                    "brand_slug": sanitize_filename(data.get("brand_name", "unknown")),
+                    "total_campaigns": data.get("total_campaigns", 0),
+                    "first_campaign": data.get("first_transaction_date", NOT_AVAILABLE),
+                    "last_campaign": data.get("last_transaction_date", NOT_AVAILABLE),
+                    "total_spend_tomans": _round_metric(total_cost)
+                },
+                "campaigns": campaign_entries,
+                "aggregate_metrics": {
+                    "avg_engagement_rate": NOT_AVAILABLE,
+                    "avg_cost_per_view": (
+                        _round_metric(total_cost / total_views) if total_views > 0 else NOT_AVAILABLE
+                    ),
+                    "best_performing_platform": platforms[0] if platforms else NOT_AVAILABLE,
+                    "total_unique_creators_used": NOT_AVAILABLE,
+                    "seasonal_patterns": NOT_AVAILABLE
+                }
+            }
+        )
 
-        lines.append('  "accounts_receivable": {')
-        lines.append('    "current_outstanding_tomans": "Not Available",')
-        lines.append('    "overdue_tomans": "Not Available"')
-        lines.append('  },')
+    def _generate_section_10(self, data: Dict, now_iso: str) -> str:
+        """Generate Section 10: Creator Performance."""
+        platform_breakdown = {
+            platform.lower(): {
+                "creators_used": NOT_AVAILABLE,
+                "avg_engagement_rate": NOT_AVAILABLE,
+                "avg_cpv": _round_metric(metrics["avg_cpv"]),
+                "best_format": NOT_AVAILABLE
+            }
+            for platform, metrics in data.get('platform_breakdown', {}).items()
+        }
+        first_date = data.get("first_transaction_date", NOT_AVAILABLE)
+        last_date = data.get("last_transaction_date", NOT_AVAILABLE)
+
+        return self._render_section(
+            "## 10. Creator Performance — Creator Data for This Client",
+            "Google Sheets (Refrences)",
+            {
+                "creator_performance": {
+                    "sync_date": now_iso,
+                    "brand_slug": NOT_AVAILABLE,
+                    "total_creators_engaged": NOT_AVAILABLE,
+                    "analysis_period": f"{first_date} to {last_date}"
+                },
+                "top_performers": [],
+                "platform_breakdown": platform_breakdown,
+                "recommended_for_next_campaign": [],
+                "blacklisted_creators": []
+            }
+        )
 
-        lines.append('  "payment_behavior": {')
-        lines.append('    "avg_days_to_pay": "Not Available",')
+    def _generate_section_11(self, data: Dict, now_iso: str) -> str:
+        """Generate Section 11: Financial History."""
         payment_rate = data.get('payment_rate', 0)
-        lines.append(f'    "on_time_payment_rate": {payment_rate:.2f},')
-
         if payment_rate >= 0.9:
             risk = "low"
         elif payment_rate >= 0.7:
             risk = "medium"
         else:
             risk = "high"
-        lines.append(f'    "payment_risk_score": "{risk}",')
-        lines.append(f'    "last_payment_date": "{data.get("last_transaction_date", "Not Available")}",')
-        lines.append('    "payment_trend": "Not Available"')
-        lines.append('  },')
-
-        invoices = data.get('invoices', [])
-        lines.append('  "invoices_last_12m": [')
-        if invoices:
-            for idx, invoice in enumerate(invoices[:5]):  # Show first 5 invoices
-                lines.append('    {')
-                lines.append(f'      "invoice_id": "{invoice.get("invoice_number", "Not Available")}",')
-                lines.append(f'      "date_issued": "{invoice.get("date", "Not Available")}",')
-                lines.append(f'      "amount_tomans": {invoice.get("amount", 0):.0f},')
-                lines.append(f'      "status": "{invoice.get("payment_status", "Not Available")}",')
-                lines.append(f'      "invoice_type": "{invoice.get("invoice_type", "Not Available")}"')
-                if idx < min(5, len(invoices)) - 1:
-                    lines.append('    },')
-                else:
-                    lines.append('    }')
-        lines.append('  ],')
-
-        lines.append('  "creator_payout_summary": {')
-        lines.append(f'    "total_creator_payouts_for_client_tomans": {data.get("total_cost", 0):.0f},')
-        lines.append('    "avg_payout_per_creator_tomans": "Not Available",')
-        margin = data.get('profit_margin', 0) / 100
-        lines.append(f'    "payout_margin_realized": {margin:.2f}')
-        lines.append('  }')
-        lines.append("}")
-        lines.append("```")
-        lines.append("")
-        lines.append("---")
-        return lines
-
-    def _generate_section_12(self) -> List[str]:
+
+        invoices = [
+            {
+                "invoice_id": invoice.get("invoice_number", NOT_AVAILABLE),
+                "date_issued": invoice.get("date", NOT_AVAILABLE),
+                "amount_tomans": _round_metric(invoice.get("amount", 0)),
+                "status": invoice.get("payment_status", NOT_AVAILABLE),
+                "invoice_type": invoice.get("invoice_type", NOT_AVAILABLE)
+            }
+            for invoice in data.get('invoices', [])[:5]  # Show first 5 invoices
+        ]
+
+        return self._render_section(
+            "## 11. Financial History — AR, Invoicing, Payment Behavior",
+            "Google Sheets (Refrences)",
+            {
+                "financial_history": {
+                    "sync_date": now_iso,
+                    "brand_slug": NOT_AVAILABLE,
+                    "accounting_entity_id": NOT_AVAILABLE
+                },
+                "revenue_summary": {
+                    "total_lifetime_revenue_tomans": _round_metric(data.get("total_revenue", 0)),
+                    "revenue_by_year": {
+                        year: _round_metric(revenue)
+                        for year, revenue in data.get('year_revenue', {}).items()
+                    },
+                    "avg_deal_size_tomans": _round_metric(data.get("avg_transaction_value", 0)),
+                    "largest_deal_tomans": NOT_AVAILABLE,
+                    "payment_terms_standard": NOT_AVAILABLE
+                },
+                "accounts_receivable": {
+                    "current_outstanding_tomans": NOT_AVAILABLE,
+                    "overdue_tomans": NOT_AVAILABLE
+                },
+                "payment_behavior": {
+                    "avg_days_to_pay": NOT_AVAILABLE,
+                    "on_time_payment_rate": _round_metric(payment_rate, 2),
+                    "payment_risk_score": risk,
+                    "last_payment_date": data.get("last_transaction_date", NOT_AVAILABLE),
+                    "payment_trend": NOT_AVAILABLE
+                },
+                "invoices_last_12m": invoices,
+                "creator_payout_summary": {
+                    "total_creator_payouts_for_client_tomans": _round_metric(data.get("total_cost", 0)),
+                    "avg_payout_per_creator_tomans": NOT_AVAILABLE,
+                    "payout_margin_realized": _round_metric(data.get('profit_margin', 0) / 100, 2)
+                }
+            }
+        )
+
+    def _generate_section_12(self, now_iso: str) -> str:
         """Generate Section 12: Communications Log."""
-        lines = []
-        lines.append("## 12. Communications Log — Key Communications")
-        lines.append("")
-        lines.append("**Source:** Not Available (requires Telegram/WhatsApp integration)")
-        lines.append("")
-        lines.append("```json")
-        lines.append("{")
-        lines.append('  "communications_log": {')
-        lines.append(f'    "sync_date": "{datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")}",')
-        lines.append('    "brand_slug": "Not Available",')
-        lines.append('    "log_period": "Not Available",')
-        lines.append('    "total_interactions": "Not Available"')
-        lines.append('  },')
-        lines.append('  "recent_interactions": [],')
-        lines.append('  "communication_patterns": {')
-        lines.append('    "avg_response_time_hours": "Not Available",')
-        lines.append('    "preferred_channel": "Not Available",')
-        lines.append('    "ghosting_risk": "Not Available"')
-        lines.append('  }')
-        lines.append("}")
-        lines.append("```")
-        lines.append("")
-        lines.append("---")
-        return lines
-
-    def _generate_section_13(self, data: Dict) -> List[str]:
-        """Generate Section 13: Relationship Score."""
-        lines = []
-        lines.append("## 13. Relationship Score — Agent-Computed Health Signals")
-        lines.append("")
-        lines.append("**Source:** Computed from Refrences transaction data")
-        lines.append("")
+        return self._render_section(
+            "## 12. Communications Log — Key Communications",
+            "Not Available (requires Telegram/WhatsApp integration)",
+            {
+                "communications_log": {
+                    "sync_date": now_iso,
+                    "brand_slug": NOT_AVAILABLE,
+                    "log_period": NOT_AVAILABLE,
+                    "total_interactions": NOT_AVAILABLE
+                },
+                "recent_interactions": [],
+                "communication_patterns": {
+                    "avg_response_time_hours": NOT_AVAILABLE,
+                    "preferred_channel": NOT_AVAILABLE,
+                    "ghosting_risk": NOT_AVAILABLE
+                }
+            }
+        )
 
+    def _generate_section_13(self, data: Dict, now_iso: str) -> str:
+        """Generate Section 13: Relationship Score."""
         # Calculate health score
         total_campaigns = data.get('total_campaigns', 0)
         payment_rate = data.get('payment_rate', 0)
@@ -762,103 +978,81 @@ class CustomerIntelligenceAgent(BaseAgent):
 
         overall_score = (frequency_score + monetary_score + payment_score) / 3
 
-        lines.append("```json")
-        lines.append("{")
-        lines.append('  "relationship_score": {')
-        lines.append(f'    "computed_date": "{datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")}",')
-        lines.append('    "brand_slug": "Not Available",')
-        lines.append('    "model_version": "1.0"')
-        lines.append('  },')
-
-        lines.append('  "health_score": {')
-        lines.append(f'    "overall": {overall_score:.0f},')
-        lines.append('    "components": {')
-        lines.append('      "recency": "Not Available",')
-        lines.append(f'      "frequency": {frequency_score:.0f},')
-        lines.append(f'      "monetary": {monetary_score:.0f},')
-        lines.append('      "satisfaction": "Not Available",')
-        lines.append('      "engagement": "Not Available",')
-        lines.append(f'      "payment_health": {payment_score:.0f}')
-        lines.append('    },')
-        lines.append('    "trend": "Not Available",')
-        lines.append('    "trend_reason": "Not Available"')
-        lines.append('  },')
-
-        lines.append('  "churn_risk": {')
-        if overall_score >= 70:
-            risk_level = "low"
-            probability = 0.15
-        elif overall_score >= 50:
-            risk_level = "medium"
-            probability = 0.35
-        else:
-            risk_level = "high"
-            probability = 0.60
-
-        lines.append(f'    "risk_level": "{risk_level}",')
-        lines.append(f'    "probability": {probability:.2f},')
-        lines.append('    "primary_risk_factors": [],')
-        lines.append('    "mitigating_factors": []')
-        lines.append('  },')
-
-        lines.append('  "upsell_opportunities": [],')
-        lines.append('  "recommended_actions": []')
-        lines.append("}")
-        lines.append("```")
-        lines.append("")
-        lines.append("---")
-        return lines
-
-    def _generate_section_14(self, data: Dict) -> List[str]:
+        risk_level, probability = CHURN_RISK_BANDS[bisect_right(CHURN_SCORE_BOUNDARIES, overall_score)]
+
+        return self._render_section(
+            "## 13. Relationship Score — Agent-Computed Health Signals",
+            "Computed from Refrences transaction data",
+            {
+                "relationship_score": {
+                    "computed_date": now_iso,
+                    "brand_slug": NOT_AVAILABLE,
+                    "model_version": "1.0"
+                },
+                "health_score": {
+                    "overall": _round_metric(overall_score),
+                    "components": {
+                        "recency": NOT_AVAILABLE,
+                        "frequency": _round_metric(frequency_score),
+                        "monetary": _round_metric(monetary_score),
+                        "satisfaction": NOT_AVAILABLE,
+                        "engagement": NOT_AVAILABLE,
+                        "payment_health": _round_metric(payment_score)
+                    },
+                    "trend": NOT_AVAILABLE,
+                    "trend_reason": NOT_AVAILABLE
+                },
+                "churn_risk": {
+                    "risk_level": risk_level,
+                    "probability": probability,
+                    "primary_risk_factors": [],
+                    "mitigating_factors": []
+                },
+                "upsell_opportunities": [],
+                "recommended_actions": []
+            }
+        )
+
+    def _generate_section_14(self, data: Dict, now_iso: str) -> str:
         """Generate Section 14: MMM Readiness."""
-        lines = []
-        lines.append("## 14. MMM Readiness — Marketing Mix Modeling Data Assessment")
-        lines.append("")
-        lines.append("**Source:** Computed from Refrences data availability")
-        lines.append("")
-        lines.append("```json")
-        lines.append("{")
-        lines.append('  "mmm_readiness": {')
-        lines.append(f'    "assessed_date": "{datetime.now().strftime("%Y-%m-%d")}",')
-        lines.append('    "brand_slug": "Not Available",')
-        lines.append('    "assessor": "customer_intelligence_agent"')
-        lines.append('  },')
-
-        lines.append('  "overall_readiness": "partial",')
-        lines.append('  "readiness_score": 45,')
-
-        lines.append('  "data_availability": {')
-        lines.append('    "sales_data": {')
-        lines.append('      "available": false,')
-        lines.append('      "notes": "Client sales data not provided"')
-        lines.append('    },')
-
-        lines.append('    "media_spend_data": {')
-        lines.append('      "available": true,')
-        lines.append('      "granularity": "transaction_level",')
-        platforms = data.get('platforms_used', [])
-        lines.append(f'      "channels_covered": {json.dumps(platforms)},')
-        lines.append(f'      "history_months": "{data.get("total_transactions", 0)} transactions"')
-        lines.append('    },')
-
-        lines.append('    "creator_media_pressure": {')
-        lines.append('      "available": true,')
-        lines.append('      "granularity": "transaction_level",')
-        lines.append('      "metrics": ["spend", "views", "impressions"]')
-        lines.append('    }')
-        lines.append('  },')
-
-        lines.append('  "recommended_next_steps": [')
-        lines.append('    "Request client sales/conversion data",')
-        lines.append('    "Request full media mix breakdown",')
-        lines.append('    "Enrich creator data with engagement metrics"')
-        lines.append('  ],')
-
-        lines.append('  "ideal_mmm_client": false,')
-        lines.append('  "ideal_mmm_client_reason": "Missing sales data and full media mix",')
-        lines.append('  "estimated_time_to_first_model": "3-4 months after data acquisition"')
-        lines.append("}")
-        lines.append("```")
-        lines.append("")
-        lines.append("---")
-        return lines
+        channels = data.get('platforms_used', [])
+        transaction_count = data.get('total_transactions', 0)
+
+        return self._render_section(
+            "## 14. MMM Readiness — Marketing Mix Modeling Data Assessment",
+            "Computed from Refrences data availability",
+            {
+                "mmm_readiness": {
+                    "assessed_date": now_iso[:10],
+                    "brand_slug": NOT_AVAILABLE,
+                    "assessor": "customer_intelligence_agent"
+                },
+                "overall_readiness": "partial",
+                "readiness_score": 45,
+                "data_availability": {
+                    "sales_data": {
+                        "available": False,
+                        "notes": "Client sales data not provided"
+                    },
+                    "media_spend_data": {
+                        "available": True,
+                        "granularity": "transaction_level",
+                        "channels_covered": channels,
+                        "history_months": f"{transaction_count} transactions"
+                    },
+                    "creator_media_pressure": {
+                        "available": True,
+                        "granularity": "transaction_level",
+                        "metrics": ["spend", "views", "impressions"]
+                    }
+                },
+                "recommended_next_steps": [
+                    "Request client sales/conversion data",
+                    "Request full media mix breakdown",
+                    "Enrich creator data with engagement metrics"
+                ],
+                "ideal_mmm_client": False,
+                "ideal_mmm_client_reason": "Missing sales data and full media mix",
+                "estimated_time_to_first_model": "3-4 months after data acquisition"
+            }
+        )
@@ -1,7 +1,8 @@
 """Data collection agent - orchestrates web scraping from all sources."""
 
 import asyncio
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
+import re
 from typing import Dict, Any, Optional
 
 # Modular imports
@@ -18,11 +19,27 @@ from scrapers import (
     TrademarkScraper,
 )
 from config import DATA_EXTRACTION_PROMPT
+from config.settings import settings
 from models.output_models import RawDataOutput
 from utils import get_logger
 
 logger = get_logger(__name__)
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Headings mentioning any of these are treated as products/services; one
+# alternation scans each lowered heading once instead of once per keyword.
+_SERVICE_KEYWORD_RE = re.compile("|".join(map(re.escape, [
+    "خدمات", "محصولات", "services", "products", "مشاوره", "counseling", "therapy", "درمان"
+])))
+
+# Bulky scraper fields that are never sent to the LLM
+_LLM_EXCLUDED_FIELDS = frozenset(("raw_html", "raw_data"))
+
 
 class DataCollectionAgent(BaseAgent):
     """Agent responsible for collecting data from all sources."""
@@ -85,6 +102,16 @@ class DataCollectionAgent(BaseAgent):
 
         return state
 
+    def close(self) -> None:
+        """Close the scrapers' HTTP clients once the agent is no longer needed.
+
+        The clients stay open between execute() calls, so an agent reused
+        for several brands keeps its connections; run_workflow() and the
+        batch drivers call this when they are done.
+        """
+        for scraper in self.scrapers.values():
+            scraper.close()
+
     def _scrape_all_sources(
         self,
         brand_name: str,
@@ -99,40 +126,61 @@ class DataCollectionAgent(BaseAgent):
         Returns:
             Dictionary mapping source names to scraped data
         """
+        # Not asyncio.run(): its shutdown joins the default executor, which
+        # would wait on the worker threads of sources that timed out.
+        # loop.close() releases them without blocking.
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self._scrape_all_sources_async(brand_name, brand_website))
+        finally:
+            loop.close()
+
+    async def _scrape_all_sources_async(
+        self,
+        brand_name: str,
+        brand_website: Optional[str]
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Scrape data from all sources concurrently on one event loop.
+
+        Every scraper is in flight at once; a source that fails or exceeds
+        settings.SCRAPER_SOURCE_TIMEOUT is logged and recorded as None
+        without holding up the others.
+
+        Args:
+            brand_name: Name of the brand
+            brand_website: Optional website URL
+
+        Returns:
+            Dictionary mapping source names to scraped data
+        """
+        async def _scrape(source_name: str, scraper) -> Optional[Dict[str, Any]]:
+            if source_name == "web_search" and brand_website:
+                scrape = scraper.scrape_with_cache_async(brand_name, website_url=brand_website)
+            else:
+                scrape = scraper.scrape_with_cache_async(brand_name)
+            return await asyncio.wait_for(scrape, timeout=settings.SCRAPER_SOURCE_TIMEOUT)
+
+        outcomes = await asyncio.gather(
+            *[_scrape(source_name, scraper) for source_name, scraper in self.scrapers.items()],
+            return_exceptions=True
+        )
+
         results = {}
+        for source_name, outcome in zip(self.scrapers, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                logger.error(f"[X] {source_name}: Timed out after {settings.SCRAPER_SOURCE_TIMEOUT}s")
+                results[source_name] = None
+                continue
+            if isinstance(outcome, BaseException):
+                logger.error(f"[X] {source_name}: Error - {outcome}")
+                results[source_name] = None
+                continue
 
-        # Use ThreadPoolExecutor for parallel scraping
-        with ThreadPoolExecutor(max_workers=6) as executor:
-            # Submit all scraping tasks
-            future_to_source = {}
-
-            for source_name, scraper in self.scrapers.items():
-                if source_name == "web_search" and brand_website:
-                    future = executor.submit(
-                        scraper.scrape_with_cache,
-                        brand_name,
-                        website_url=brand_website
-                    )
-                else:
-                    future = executor.submit(scraper.scrape_with_cache, brand_name)
-
-                future_to_source[future] = source_name
-
-            # Collect results as they complete
-            for future in as_completed(future_to_source):
-                source_name = future_to_source[future]
-                try:
-                    data = future.result()
-                    results[source_name] = data
-
-                    if data:
-                        logger.info(f"[OK] {source_name}: Success")
-                    else:
-                        logger.warning(f"[X] {source_name}: No data")
-
-                except Exception as e:
-                    logger.error(f"[X] {source_name}: Error - {e}")
-                    results[source_name] = None
+            results[source_name] = outcome
+            if outcome:
+                logger.info(f"[OK] {source_name}: Success")
+            else:
+                logger.warning(f"[X] {source_name}: No data")
 
         return results
 
@@ -151,7 +199,7 @@ class DataCollectionAgent(BaseAgent):
             Structured and normalized data
         """
         # First try LLM extraction if available
-        if self.llm.is_available():
+        if self._llm_available:
             try:
                 # Prepare data for LLM
                 data_summary = self._prepare_data_for_llm(raw_data)
@@ -202,8 +250,9 @@ class DataCollectionAgent(BaseAgent):
         structured = {
             "sources_used": [],
             "contact_info": {
-                "emails": [],
-                "phones": [],
+                # Emails and phones are deduplicated as they are collected
+                "emails": set(),
+                "phones": set(),
                 "addresses": []
             },
             "social_media": {},
@@ -220,9 +269,9 @@ class DataCollectionAgent(BaseAgent):
             if "contact_info" in data:
                 contact = data["contact_info"]
                 if "emails" in contact:
-                    structured["contact_info"]["emails"].extend(contact["emails"])
+                    structured["contact_info"]["emails"].update(contact["emails"])
                 if "phones" in contact:
-                    structured["contact_info"]["phones"].extend(contact["phones"])
+                    structured["contact_info"]["phones"].update(contact["phones"])
                 if "addresses" in contact:
                     structured["contact_info"]["addresses"].extend(contact["addresses"])
 
@@ -248,15 +297,14 @@ class DataCollectionAgent(BaseAgent):
                 content = data.get("content_summary", "")
 
                 # Look for product/service keywords in headings
-                service_keywords = ["خدمات", "محصولات", "services", "products", "مشاوره", "counseling", "therapy", "درمان"]
+                products_services = []
+                add_product_service = products_services.append
                 for heading in headings:
-                    if isinstance(heading, str):  # Only process string headings
-                        for keyword in service_keywords:
-                            if keyword in heading.lower():
-                                if "products_services" not in structured:
-                                    structured["products_services"] = []
-                                structured["products_services"].append(heading)
-                                break
+                    # Only process string headings
+                    if isinstance(heading, str) and _SERVICE_KEYWORD_RE.search(heading.lower()):
+                        add_product_service(heading)
+                if products_services:
+                    structured["products_services"] = products_services
 
                 # Extract business description from content
                 if content and len(content) > 100:
@@ -267,9 +315,9 @@ class DataCollectionAgent(BaseAgent):
                 structured["wikipedia_summary"] = data.get("summary")
                 structured["wikipedia_infobox"] = data.get("infobox_data", {})
 
-        # Deduplicate lists
-        structured["contact_info"]["emails"] = list(set(structured["contact_info"]["emails"]))
-        structured["contact_info"]["phones"] = list(set(structured["contact_info"]["phones"]))
+        # Materialize the deduplicated contact sets as lists
+        structured["contact_info"]["emails"] = list(structured["contact_info"]["emails"])
+        structured["contact_info"]["phones"] = list(structured["contact_info"]["phones"])
 
         logger.info(f"[Basic] Extracted data from {len(structured['sources_used'])} sources")
 
@@ -285,17 +333,26 @@ class DataCollectionAgent(BaseAgent):
             raw_data: Raw scraped data
 
         Returns:
-            Formatted string for LLM input
+            Indented JSON of each source's non-empty fields, for LLM input
         """
-        lines = []
-
-        for source, data in raw_data.items():
-            if data:
-                lines.append(f"\n=== {source.upper()} ===")
-
-                # Add relevant fields (exclude raw HTML)
-                for key, value in data.items():
-                    if key not in ["raw_html", "raw_data"] and value:
-                        lines.append(f"{key}: {value}")
+        filtered = {
+            source: {
+                key: value
+                for key, value in data.items()
+                if key not in _LLM_EXCLUDED_FIELDS and value  # exclude raw HTML
+            }
+            for source, data in raw_data.items()
+            if data
+        }
 
-        return "\n".join(lines)
+        if ORJSON_AVAILABLE:
+            try:
+                return orjson.dumps(
+                    filtered,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                    default=str
+                ).decode()
+            except TypeError:
+                # Integer beyond 64 bits; stdlib handles it
+                pass
+        return json.dumps(filtered, ensure_ascii=False, indent=2, default=str)
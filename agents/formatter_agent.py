@@ -2,8 +2,10 @@
 
 import json
 import csv
+import re
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from datetime import datetime
 from agents.base_agent import BaseAgent
 from models.state import BrandIntelligenceState
@@ -15,12 +17,199 @@ from utils.helpers import (
     load_json
 )
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = get_logger(__name__)
 
+# Column order of the tabular exports (CSV files and their JSON row lists)
+BRANDS_DATABASE_FIELDS = [
+    "brand_name",
+    "relationship_type",
+    "parent_company",
+    "category",
+    "category_level_1",
+    "category_level_2",
+    "category_level_3",
+    "cross_sell_potential",
+    "market_position",
+    "price_tier"
+]
+PRODUCTS_EXPORT_FIELDS = ["product_name", "category", "description", "target_market"]
+OPPORTUNITIES_EXPORT_FIELDS = ["partner_brand", "campaign_concept", "potential_reach", "expected_benefit", "timing"]
+
+# Optional unified report sections; state["output_sections"] selects a subset
+REPORT_SECTIONS = (
+    "executive_summary",
+    "complete_analysis_report",
+    "quick_reference",
+    "brands_database",
+    "product_catalog",
+    "campaign_opportunities",
+)
+
+
+# Any character in the Arabic/Persian Unicode block
+_PERSIAN_CHAR_RE = re.compile("[\u0600-\u06FF]")
+
+# (level_1, level_2, level_3) of a _get_category_hierarchy result
+_category_levels = itemgetter("category_level_1", "category_level_2", "category_level_3")
+
+# Normalizes category names: spaces and hyphens become underscores
+_CATEGORY_KEY_TRANS = str.maketrans(" -", "__")
+
+# Category -> 3-level hierarchy (English-only with underscores), keyed by
+# lowercased, normalized category name
+_CATEGORY_HIERARCHY: Dict[str, Dict[str, str]] = {
+    # Technology Services
+    "ride_hailing": {
+        "category_level_1": "Technology_Services",
+        "category_level_2": "On-Demand_Platforms",
+        "category_level_3": "Ride-Hailing"
+    },
+    "food_delivery": {
+        "category_level_1": "Technology_Services",
+        "category_level_2": "On-Demand_Platforms",
+        "category_level_3": "Food_Delivery"
+    },
+    "travel_technology": {
+        "category_level_1": "Technology_Services",
+        "category_level_2": "Travel_&_Hospitality",
+        "category_level_3": "Online_Travel_Booking"
+    },
+
+    # Financial Services
+    "insurance_technology": {
+        "category_level_1": "Financial_Services",
+        "category_level_2": "Insurance",
+        "category_level_3": "Health_&_Auto_Insurance"
+    },
+    "fintech_payments": {
+        "category_level_1": "Financial_Services",
+        "category_level_2": "Fintech",
+        "category_level_3": "Digital_Payments"
+    },
+
+    # Healthcare
+    "telemedicine": {
+        "category_level_1": "Healthcare_&_Life_Sciences",
+        "category_level_2": "Digital_Health",
+        "category_level_3": "Telemedicine"
+    },
+    "pharmaceutical": {
+        "category_level_1": "Healthcare_&_Life_Sciences",
+        "category_level_2": "Biopharmaceuticals",
+        "category_level_3": "Biosimilar_Drugs"
+    },
+    "biotech": {
+        "category_level_1": "Healthcare_&_Life_Sciences",
+        "category_level_2": "Biotechnology",
+        "category_level_3": "Biotech_Products"
+    },
+
+    # Transportation & Logistics
+    "logistics_delivery": {
+        "category_level_1": "Transportation_&_Logistics",
+        "category_level_2": "Last-Mile_Delivery",
+        "category_level_3": "Package_Delivery"
+    },
+    "transportation": {
+        "category_level_1": "Transportation_&_Logistics",
+        "category_level_2": "Mobility_Services",
+        "category_level_3": "Ride_Services"
+    },
+
+    # Consumer Goods
+    "cleaning_products": {
+        "category_level_1": "Consumer_Goods",
+        "category_level_2": "Home_Care",
+        "category_level_3": "Dishwashing_&_Surface_Cleaners"
+    },
+    "laundry_care": {
+        "category_level_1": "Consumer_Goods",
+        "category_level_2": "Home_Care",
+        "category_level_3": "Laundry_Detergents"
+    },
+    "dishwashing": {
+        "category_level_1": "Consumer_Goods",
+        "category_level_2": "Home_Care",
+        "category_level_3": "Dishwashing_Products"
+    },
+
+    # Food & Beverage
+    "confectionery_macaron": {
+        "category_level_1": "Food_&_Beverage",
+        "category_level_2": "Sweet_Snacks",
+        "category_level_3": "Macarons_&_Cookies"
+    },
+    "confectionery": {
+        "category_level_1": "Food_&_Beverage",
+        "category_level_2": "Sweet_Snacks",
+        "category_level_3": "Sweets_&_Confectionery"
+    },
+    "chocolate_manufacturing": {
+        "category_level_1": "Food_&_Beverage",
+        "category_level_2": "Sweet_Snacks",
+        "category_level_3": "Chocolate_Products"
+    },
+    "food": {
+        "category_level_1": "Food_&_Beverage",
+        "category_level_2": "Packaged_Foods",
+        "category_level_3": "Food_Products"
+    },
+
+    # Consumer Services
+    "online_grocery": {
+        "category_level_1": "Consumer_Services",
+        "category_level_2": "E-Commerce",
+        "category_level_3": "Online_Grocery"
+    },
+    "ecommerce": {
+        "category_level_1": "Consumer_Services",
+        "category_level_2": "E-Commerce",
+        "category_level_3": "Online_Marketplace"
+    },
+
+    # Manufacturing
+    "industrial_manufacturing": {
+        "category_level_1": "Manufacturing",
+        "category_level_2": "General_Manufacturing",
+        "category_level_3": "Industrial_Products"
+    }
+}
+
+
+def _write_json_report(output_path: Path, data: Any) -> None:
+    """Write data as indented, non-ASCII-escaped JSON through a large write buffer."""
+    if ORJSON_AVAILABLE:
+        try:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Unsupported type or integer beyond 64 bits; stdlib handles the latter
+            pass
+        else:
+            with open(output_path, 'wb', buffering=1 << 20) as f:
+                f.write(payload)
+            return
+
+    with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _csv_cell(value: Any) -> str:
+    """Render a value the way csv.writer stores it (None becomes empty)."""
+    return "" if value is None else str(value)
+
 
 class OutputFormatterAgent(BaseAgent):
     """Agent responsible for generating comprehensive outputs in 8 formats."""
 
+    # Parsed knowledge base files shared by all instances: path -> (mtime, data)
+    _kb_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
     def __init__(self):
         """Initialize the output formatter agent."""
         super().__init__("OutputFormatterAgent")
@@ -29,17 +218,64 @@ class OutputFormatterAgent(BaseAgent):
 
         # Load knowledge base
         kb_path = Path("data/iranian_brands_knowledge.json")
-        self.knowledge_base = load_json(kb_path) if kb_path.exists() else {}
+        self.knowledge_base = self._load_knowledge_base(kb_path)
 
         if self.knowledge_base:
             logger.info("Loaded Iranian brands knowledge base")
 
+    def _wanted_sections(self, state: Dict) -> frozenset:
+        """Resolve which optional unified report sections to build.
+
+        Args:
+            state: Workflow state; ``output_sections`` lists the wanted
+                REPORT_SECTIONS names (missing or None means all)
+
+        Returns:
+            Set of section names to build
+        """
+        requested = state.get("output_sections")
+        if requested is None:
+            return frozenset(REPORT_SECTIONS)
+
+        wanted = frozenset(requested)
+        unknown = wanted.difference(REPORT_SECTIONS)
+        if unknown:
+            logger.warning(f"Ignoring unknown output sections: {', '.join(sorted(unknown))}")
+        return wanted
+
+    @classmethod
+    def _load_knowledge_base(cls, kb_path: Path) -> Dict[str, Any]:
+        """Load a knowledge base JSON file, reusing the parse while it is unchanged.
+
+        Args:
+            kb_path: Path to the knowledge base file
+
+        Returns:
+            Parsed knowledge base (empty dict when the file does not exist)
+        """
+        try:
+            mtime = kb_path.stat().st_mtime
+        except FileNotFoundError:
+            return {}
+
+        key = str(kb_path)
+        cached = cls._kb_cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        data = load_json(kb_path)
+        cls._kb_cache[key] = (mtime, data)
+        return data
+
     def execute(self, state: BrandIntelligenceState) -> BrandIntelligenceState:
         """Generate a single unified JSON report containing all brand intelligence data.
 
         Writes one file:
         - human_reports/brand_report.json : All content consolidated into one JSON
 
+        Optional sections (REPORT_SECTIONS) can be limited through
+        ``state["output_sections"]``; unrequested ones are neither built nor written.
+
         Args:
             state: Current workflow state
 
@@ -53,13 +289,10 @@ class OutputFormatterAgent(BaseAgent):
 
         safe_brand_name = sanitize_filename(brand_name)
         brand_output_dir = self.output_dir / safe_brand_name
-        brand_output_dir.mkdir(exist_ok=True)
 
-        # Temporary directories used internally by helper methods
+        # Temporary directory used internally by helper methods
         human_reports_dir = brand_output_dir / "human_reports"
-        human_reports_dir.mkdir(exist_ok=True)
-        human_exports_dir = human_reports_dir / "data_exports"
-        human_exports_dir.mkdir(exist_ok=True)
+        human_reports_dir.mkdir(parents=True, exist_ok=True)
 
         state = self._enrich_with_knowledge(state)
 
@@ -69,41 +302,29 @@ class OutputFormatterAgent(BaseAgent):
             logger.info(f"Generating unified JSON report for {brand_name}...")
             logger.info("=" * 60)
 
-            # Generate intermediate files using existing helper methods
-            exec_summary_path = self._generate_executive_summary(state, human_reports_dir, timestamp)
-            complete_report_path = self._generate_complete_analysis_report(state, human_reports_dir, timestamp)
-            quick_ref_path = self._generate_quick_reference(state, human_reports_dir, timestamp)
-            brands_csv_path = self._generate_brands_database(state, human_exports_dir, timestamp)
-            products_csv_path = self._generate_products_export(state, human_exports_dir, timestamp)
-            opps_csv_path = self._generate_opportunities_export(state, human_exports_dir, timestamp)
-
-            # Read content back from intermediate files
-            with open(exec_summary_path, encoding='utf-8') as f:
-                executive_summary_text = f.read()
-
-            with open(complete_report_path, encoding='utf-8') as f:
-                complete_report_text = f.read()
-
-            with open(quick_ref_path, encoding='utf-8') as f:
-                quick_reference = json.load(f)
-
-            with open(brands_csv_path, encoding='utf-8-sig', newline='') as f:
-                brands_database = list(csv.DictReader(f))
-
-            with open(products_csv_path, encoding='utf-8-sig', newline='') as f:
-                product_catalog_rows = list(csv.DictReader(f))
-
-            with open(opps_csv_path, encoding='utf-8-sig', newline='') as f:
-                campaign_opportunities = list(csv.DictReader(f))
-
-            # Remove intermediate files and empty data_exports dir
-            for path in [exec_summary_path, complete_report_path, quick_ref_path,
-                         brands_csv_path, products_csv_path, opps_csv_path]:
-                path.unlink(missing_ok=True)
-            try:
-                human_exports_dir.rmdir()
-            except OSError:
-                pass
+            wanted = self._wanted_sections(state)
+
+            # Formatted reports and summary are built in memory; no file round-trip
+            executive_summary_text = None
+            if "executive_summary" in wanted:
+                executive_summary_text = self._build_executive_summary(state)
+            complete_report_text = None
+            if "complete_analysis_report" in wanted:
+                complete_report_text = self._build_complete_analysis_report(state, timestamp)
+            quick_reference = {}
+            if "quick_reference" in wanted:
+                quick_reference = self._build_quick_reference(state, timestamp)
+
+            # Tabular exports are built in memory; no CSV round-trip
+            brands_database = None
+            if "brands_database" in wanted:
+                brands_database = self._build_brands_rows(state)
+            product_catalog_rows = None
+            if "product_catalog" in wanted:
+                product_catalog_rows = self._build_products_rows(state, human_reports_dir)
+            campaign_opportunities = None
+            if "campaign_opportunities" in wanted:
+                campaign_opportunities = self._build_opportunities_rows(state)
 
             # Build and write the single unified report
             report_path = human_reports_dir / "brand_report.json"
@@ -127,9 +348,11 @@ class OutputFormatterAgent(BaseAgent):
                 "product_catalog": product_catalog_rows,
                 "campaign_opportunities": campaign_opportunities,
             }
+            for section in REPORT_SECTIONS:
+                if section not in wanted:
+                    del unified_report[section]
 
-            with open(report_path, 'w', encoding='utf-8') as f:
-                json.dump(unified_report, f, ensure_ascii=False, indent=2)
+            _write_json_report(report_path, unified_report)
 
             output_files["brand_report"] = str(report_path)
 
@@ -418,7 +641,7 @@ class OutputFormatterAgent(BaseAgent):
             },
             "basic_information": {
                 "brand_name": brand_name,
-                "brand_name_persian": brand_name if any('\u0600' <= c <= '\u06FF' for c in brand_name) else "",
+                "brand_name_persian": brand_name if _PERSIAN_CHAR_RE.search(brand_name) else "",
                 "website": state.get("brand_website", ""),
                 "establishment_year": "Unknown",
                 "business_model": categorization.get("business_model", "B2C"),
@@ -511,269 +734,121 @@ class OutputFormatterAgent(BaseAgent):
         """Map category to 3-level hierarchy.
 
         Returns:
-            Dict with category_level_1 (broad), category_level_2 (mid), category_level_3 (specific)
+            Dict with category_level_1 (broad), category_level_2 (mid), category_level_3 (specific).
+            Known categories return a shared table entry that must not be mutated.
         """
-        # Category hierarchy mapping (English-only with underscores)
-        hierarchy_map = {
-            # Technology Services
-            "ride_hailing": {
-                "level_1": "Technology_Services",
-                "level_2": "On-Demand_Platforms",
-                "level_3": "Ride-Hailing"
-            },
-            "food_delivery": {
-                "level_1": "Technology_Services",
-                "level_2": "On-Demand_Platforms",
-                "level_3": "Food_Delivery"
-            },
-            "travel_technology": {
-                "level_1": "Technology_Services",
-                "level_2": "Travel_&_Hospitality",
-                "level_3": "Online_Travel_Booking"
-            },
-
-            # Financial Services
-            "insurance_technology": {
-                "level_1": "Financial_Services",
-                "level_2": "Insurance",
-                "level_3": "Health_&_Auto_Insurance"
-            },
-            "fintech_payments": {
-                "level_1": "Financial_Services",
-                "level_2": "Fintech",
-                "level_3": "Digital_Payments"
-            },
-
-            # Healthcare
-            "telemedicine": {
-                "level_1": "Healthcare_&_Life_Sciences",
-                "level_2": "Digital_Health",
-                "level_3": "Telemedicine"
-            },
-            "pharmaceutical": {
-                "level_1": "Healthcare_&_Life_Sciences",
-                "level_2": "Biopharmaceuticals",
-                "level_3": "Biosimilar_Drugs"
-            },
-            "biotech": {
-                "level_1": "Healthcare_&_Life_Sciences",
-                "level_2": "Biotechnology",
-                "level_3": "Biotech_Products"
-            },
-
-            # Transportation & Logistics
-            "logistics_delivery": {
-                "level_1": "Transportation_&_Logistics",
-                "level_2": "Last-Mile_Delivery",
-                "level_3": "Package_Delivery"
-            },
-            "transportation": {
-                "level_1": "Transportation_&_Logistics",
-                "level_2": "Mobility_Services",
-                "level_3": "Ride_Services"
-            },
-
-            # Consumer Goods
-            "cleaning_products": {
-                "level_1": "Consumer_Goods",
-                "level_2": "Home_Care",
-                "level_3": "Dishwashing_&_Surface_Cleaners"
-            },
-            "laundry_care": {
-                "level_1": "Consumer_Goods",
-                "level_2": "Home_Care",
-                "level_3": "Laundry_Detergents"
-            },
-            "dishwashing": {
-                "level_1": "Consumer_Goods",
-                "level_2": "Home_Care",
-                "level_3": "Dishwashing_Products"
-            },
-
-            # Food & Beverage
-            "confectionery_macaron": {
-                "level_1": "Food_&_Beverage",
-                "level_2": "Sweet_Snacks",
-                "level_3": "Macarons_&_Cookies"
-            },
-            "confectionery": {
-                "level_1": "Food_&_Beverage",
-                "level_2": "Sweet_Snacks",
-                "level_3": "Sweets_&_Confectionery"
-            },
-            "chocolate_manufacturing": {
-                "level_1": "Food_&_Beverage",
-                "level_2": "Sweet_Snacks",
-                "level_3": "Chocolate_Products"
-            },
-            "food": {
-                "level_1": "Food_&_Beverage",
-                "level_2": "Packaged_Foods",
-                "level_3": "Food_Products"
-            },
-
-            # Consumer Services
-            "online_grocery": {
-                "level_1": "Consumer_Services",
-                "level_2": "E-Commerce",
-                "level_3": "Online_Grocery"
-            },
-            "ecommerce": {
-                "level_1": "Consumer_Services",
-                "level_2": "E-Commerce",
-                "level_3": "Online_Marketplace"
-            },
-
-            # Manufacturing
-            "industrial_manufacturing": {
-                "level_1": "Manufacturing",
-                "level_2": "General_Manufacturing",
-                "level_3": "Industrial_Products"
-            }
-        }
-
-        # Get hierarchy or return defaults
-        category_lower = category.lower().replace(" ", "_").replace("-", "_")
-        hierarchy = hierarchy_map.get(category_lower, {
-            "level_1": "Consumer_Products",
-            "level_2": "General_Products",
-            "level_3": category.replace(" ", "_").replace("-", "_")
-        })
+        hierarchy = _CATEGORY_HIERARCHY.get(category.lower().translate(_CATEGORY_KEY_TRANS))
+        if hierarchy is not None:
+            return hierarchy
 
         return {
-            "category_level_1": hierarchy["level_1"],
-            "category_level_2": hierarchy["level_2"],
-            "category_level_3": hierarchy["level_3"]
+            "category_level_1": "Consumer_Products",
+            "category_level_2": "General_Products",
+            "category_level_3": category.translate(_CATEGORY_KEY_TRANS)
         }
 
     def _generate_brands_database(self, state: Dict, output_dir: Path, timestamp: str) -> Path:
         """Generate brands database CSV - 3_brands_database.csv"""
         output_path = output_dir / "3_brands_database.csv"
+        brands = self._build_brands_rows(state)
+
+        # Write CSV with UTF-8 encoding
+        if brands:
+            self._write_csv(output_path, BRANDS_DATABASE_FIELDS, brands)
+
+        return output_path
 
+    def _build_brands_rows(self, state: Dict) -> List[Dict[str, str]]:
+        """Build the brands database rows (current brand plus related brands).
+
+        Returns:
+            One dict per brand keyed by BRANDS_DATABASE_FIELDS, with every
+            value rendered as text exactly as the CSV export stores it
+        """
         relationships = state.get("relationships", {})
         insights = state.get("insights", {})
         brand_name = state["brand_name"]
 
-        # Build brands list
-        brands = []
+        # Rows are tuples in BRANDS_DATABASE_FIELDS order; dicts are built once at the end
+        rows = []
+        add_row = rows.append
+
+        # Each distinct category is normalized and looked up once per build
+        levels_by_category: Dict[str, Tuple[str, str, str]] = {}
+
+        def category_levels(category: str) -> Tuple[str, str, str]:
+            levels = levels_by_category.get(category)
+            if levels is None:
+                levels = levels_by_category[category] = _category_levels(self._get_category_hierarchy(category))
+            return levels
 
         # Add current brand
         categorization = state.get("categorization", {})
         primary_industry = categorization.get("primary_industry", {})
         current_category = primary_industry.get("name_en", "Unknown")
+        parent_name = relationships.get("parent_company", {}).get("name", "Unknown")
 
         # Use category levels from categorization if available, otherwise derive from hierarchy map
         if "category_level_1" in primary_industry:
-            current_hierarchy = {
-                "category_level_1": primary_industry["category_level_1"],
-                "category_level_2": primary_industry["category_level_2"],
-                "category_level_3": primary_industry["category_level_3"]
-            }
+            current_levels = (
+                primary_industry["category_level_1"],
+                primary_industry["category_level_2"],
+                primary_industry["category_level_3"]
+            )
         else:
-            current_hierarchy = self._get_category_hierarchy(current_category)
+            current_levels = category_levels(current_category)
 
-        brands.append({
-            "brand_name": brand_name,
-            "relationship_type": "SELF",
-            "parent_company": relationships.get("parent_company", {}).get("name", "Unknown"),
-            "category": current_category,
-            "category_level_1": current_hierarchy["category_level_1"],
-            "category_level_2": current_hierarchy["category_level_2"],
-            "category_level_3": current_hierarchy["category_level_3"],
-            "cross_sell_potential": "SELF",
-            "market_position": categorization.get("market_position", {}).get("market_share_estimate", "Unknown"),
-            "price_tier": state.get("categorization", {}).get("price_tier", "Unknown")
-        })
+        add_row((
+            brand_name, "SELF", parent_name, current_category, *current_levels,
+            "SELF",
+            categorization.get("market_position", {}).get("market_share_estimate", "Unknown"),
+            state.get("categorization", {}).get("price_tier", "Unknown")
+        ))
 
         # Add sister brands
         for brand in relationships.get("sister_brands", []):
             brand_category = brand.get("category", "Unknown")
-            brand_hierarchy = self._get_category_hierarchy(brand_category)
-
-            brands.append({
-                "brand_name": brand.get("name"),
-                "relationship_type": "SISTER",
-                "parent_company": relationships.get("parent_company", {}).get("name", "Unknown"),
-                "category": brand_category,
-                "category_level_1": brand_hierarchy["category_level_1"],
-                "category_level_2": brand_hierarchy["category_level_2"],
-                "category_level_3": brand_hierarchy["category_level_3"],
-                "cross_sell_potential": brand.get("synergy_score", "MEDIUM"),
-                "market_position": "Strong",
-                "price_tier": brand.get("price_tier", "Unknown")
-            })
+            add_row((
+                brand.get("name"), "SISTER", parent_name, brand_category,
+                *category_levels(brand_category),
+                brand.get("synergy_score", "MEDIUM"), "Strong", brand.get("price_tier", "Unknown")
+            ))
 
         # Add brand family
         for brand in relationships.get("brand_family", []):
             brand_category = brand.get("category", "Unknown")
-            brand_hierarchy = self._get_category_hierarchy(brand_category)
-
-            brands.append({
-                "brand_name": brand.get("name"),
-                "relationship_type": "FAMILY",
-                "parent_company": brand.get("parent", "Unknown"),
-                "category": brand_category,
-                "category_level_1": brand_hierarchy["category_level_1"],
-                "category_level_2": brand_hierarchy["category_level_2"],
-                "category_level_3": brand_hierarchy["category_level_3"],
-                "cross_sell_potential": "LOW",
-                "market_position": "Unknown",
-                "price_tier": "Unknown"
-            })
+            add_row((
+                brand.get("name"), "FAMILY", brand.get("parent", "Unknown"), brand_category,
+                *category_levels(brand_category),
+                "LOW", "Unknown", "Unknown"
+            ))
 
         # Add competitors
         for brand in relationships.get("competitors", []):
             brand_category = brand.get("category", "Unknown")
-            brand_hierarchy = self._get_category_hierarchy(brand_category)
-
-            brands.append({
-                "brand_name": brand.get("name"),
-                "relationship_type": "COMPETITOR",
-                "parent_company": "Unknown",
-                "category": brand_category,
-                "category_level_1": brand_hierarchy["category_level_1"],
-                "category_level_2": brand_hierarchy["category_level_2"],
-                "category_level_3": brand_hierarchy["category_level_3"],
-                "cross_sell_potential": "NONE",
-                "market_position": brand.get("market_position", "Unknown"),
-                "price_tier": brand.get("price_tier", "Unknown")
-            })
+            add_row((
+                brand.get("name"), "COMPETITOR", "Unknown", brand_category,
+                *category_levels(brand_category),
+                "NONE", brand.get("market_position", "Unknown"), brand.get("price_tier", "Unknown")
+            ))
 
         # Add similar brands
         for brand in relationships.get("similar_brands", []):
             brand_category = brand.get("category", "Unknown")
-            brand_hierarchy = self._get_category_hierarchy(brand_category)
-
-            brands.append({
-                "brand_name": brand.get("name"),
-                "relationship_type": "SIMILAR",
-                "parent_company": "Unknown",
-                "category": brand_category,
-                "category_level_1": brand_hierarchy["category_level_1"],
-                "category_level_2": brand_hierarchy["category_level_2"],
-                "category_level_3": brand_hierarchy["category_level_3"],
-                "cross_sell_potential": "LOW",
-                "market_position": "Unknown",
-                "price_tier": brand.get("price_tier", "Unknown")
-            })
+            add_row((
+                brand.get("name"), "SIMILAR", "Unknown", brand_category,
+                *category_levels(brand_category),
+                "LOW", "Unknown", brand.get("price_tier", "Unknown")
+            ))
 
         # Add complementary brands from relationships
         for brand in relationships.get("complementary_brands", []):
             brand_category = brand.get("category", "Unknown")
-            brand_hierarchy = self._get_category_hierarchy(brand_category)
-
-            brands.append({
-                "brand_name": brand.get("name"),
-                "relationship_type": "COMPLEMENTARY",
-                "parent_company": "Unknown",
-                "category": brand_category,
-                "category_level_1": brand_hierarchy["category_level_1"],
-                "category_level_2": brand_hierarchy["category_level_2"],
-                "category_level_3": brand_hierarchy["category_level_3"],
-                "cross_sell_potential": brand.get("cross_sell_potential", "HIGH").upper(),
-                "market_position": "Unknown",
-                "price_tier": brand.get("price_tier", "Unknown")
-            })
+            add_row((
+                brand.get("name"), "COMPLEMENTARY", "Unknown", brand_category,
+                *category_levels(brand_category),
+                brand.get("cross_sell_potential", "HIGH").upper(), "Unknown", brand.get("price_tier", "Unknown")
+            ))
 
         # Add complementary brands from insights (cross-promotion opportunities)
         cross_promo = insights.get("cross_promotion_opportunities", [])
@@ -782,46 +857,34 @@ class OutputFormatterAgent(BaseAgent):
             tier_1 = insights.get("tier_1_opportunities", {})
             cross_promo = tier_1.get("recommendations", [])
 
-        for opp in cross_promo:
-            partner_name = opp.get("partner_brand") or opp.get("brand_name")
-            if partner_name and partner_name not in [b["brand_name"] for b in brands]:
-                # Extract category from partner_brand name if possible
-                brand_category = "Unknown"
-                brand_hierarchy = self._get_category_hierarchy(brand_category)
-
-                brands.append({
-                    "brand_name": partner_name,
-                    "relationship_type": "COMPLEMENTARY",
-                    "parent_company": "Unknown",
-                    "category": brand_category,
-                    "category_level_1": brand_hierarchy["category_level_1"],
-                    "category_level_2": brand_hierarchy["category_level_2"],
-                    "category_level_3": brand_hierarchy["category_level_3"],
-                    "cross_sell_potential": "HIGH",
-                    "market_position": "Unknown",
-                    "price_tier": "Unknown"
-                })
+        if cross_promo:
+            listed_names = {row[0] for row in rows}
+            # Partner category is not known; use the default hierarchy for "Unknown"
+            unknown_levels = category_levels("Unknown")
 
-        # Write CSV with UTF-8 encoding
-        if brands:
-            with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:  # utf-8-sig for Excel compatibility
-                fieldnames = [
-                    "brand_name",
-                    "relationship_type",
-                    "parent_company",
-                    "category",
-                    "category_level_1",
-                    "category_level_2",
-                    "category_level_3",
-                    "cross_sell_potential",
-                    "market_position",
-                    "price_tier"
-                ]
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(brands)
+            for opp in cross_promo:
+                partner_name = opp.get("partner_brand") or opp.get("brand_name")
+                if partner_name and partner_name not in listed_names:
+                    listed_names.add(partner_name)
+                    add_row((
+                        partner_name, "COMPLEMENTARY", "Unknown", "Unknown", *unknown_levels,
+                        "HIGH", "Unknown", "Unknown"
+                    ))
 
-        return output_path
+        return [dict(zip(BRANDS_DATABASE_FIELDS, map(_csv_cell, row))) for row in rows]
+
+    def _write_csv(self, output_path: Path, fieldnames: List[str], rows: List[Dict[str, Any]]) -> None:
+        """Write rows as a CSV export with a header line.
+
+        Args:
+            output_path: Destination file
+            fieldnames: Column order
+            rows: Row dicts keyed by fieldnames
+        """
+        with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:  # utf-8-sig for Excel compatibility
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
 
     def _generate_embedding_text(self, state: Dict, output_dir: Path, timestamp: str) -> Path:
         """Generate embedding-ready text - 4_embedding_ready.txt (2500+ words)"""
@@ -1066,6 +1129,18 @@ class OutputFormatterAgent(BaseAgent):
         """Generate executive summary MD - 6_executive_summary.md (1800+ words)"""
         output_path = output_dir / "6_executive_summary.md"
 
+        # Write with UTF-8 encoding
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(self._build_executive_summary(state))
+
+        return output_path
+
+    def _build_executive_summary(self, state: Dict) -> str:
+        """Build the executive summary Markdown (1800+ words).
+
+        Returns:
+            Executive summary text
+        """
         brand_name = state["brand_name"]
         relationships = state.get("relationships", {})
         categorization = state.get("categorization", {})
@@ -1525,11 +1600,7 @@ class OutputFormatterAgent(BaseAgent):
         lines.append("")
         lines.append(f"*گزارش تولیدشده توسط عامل هوشمند برند در {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
 
-        # Write with UTF-8 encoding
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write("\n".join(lines))
-
-        return output_path
+        return "\n".join(lines)
 
     def _generate_product_catalog(self, state: Dict, output_dir: Path, timestamp: str) -> Path:
         """Generate complete product catalog JSON - 7_product_catalog.json"""
@@ -1837,6 +1908,17 @@ class OutputFormatterAgent(BaseAgent):
         """Generate complete analysis report (MD) combining all insights."""
         output_path = output_dir / "complete_analysis_report.md"
 
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(self._build_complete_analysis_report(state, timestamp))
+
+        return output_path
+
+    def _build_complete_analysis_report(self, state: Dict, timestamp: str) -> str:
+        """Build the complete analysis report Markdown combining all insights.
+
+        Returns:
+            Report text
+        """
         brand_name = state["brand_name"]
         relationships = state.get("relationships", {})
         categorization = state.get("categorization", {})
@@ -1935,15 +2017,23 @@ class OutputFormatterAgent(BaseAgent):
         lines.append("")
         lines.append(f"*تولید شده توسط Brand Intelligence Agent*")
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write("\n".join(lines))
-
-        return output_path
+        return "\n".join(lines)
 
     def _generate_quick_reference(self, state: Dict, output_dir: Path, timestamp: str) -> Path:
         """Generate quick reference JSON for dashboards/APIs."""
         output_path = output_dir / "quick_reference.json"
 
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(self._build_quick_reference(state, timestamp), f, ensure_ascii=False, indent=2)
+
+        return output_path
+
+    def _build_quick_reference(self, state: Dict, timestamp: str) -> Dict[str, Any]:
+        """Build the quick reference summary for dashboards/APIs.
+
+        Returns:
+            Quick reference dict
+        """
         brand_name = state["brand_name"]
         relationships = state.get("relationships", {})
         categorization = state.get("categorization", {})
@@ -1993,10 +2083,7 @@ class OutputFormatterAgent(BaseAgent):
             }
         }
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(quick_ref, f, ensure_ascii=False, indent=2)
-
-        return output_path
+        return quick_ref
 
     def _extract_products_from_categories(self, categories_data) -> List[Dict]:
         """Extract products from various category structures.
@@ -2040,6 +2127,23 @@ class OutputFormatterAgent(BaseAgent):
         output_path = output_dir / "product_catalog.csv"
         brand_output_dir = output_dir.parent  # Go up to brand directory
 
+        # Empty catalogs still get a CSV with headers
+        self._write_csv(output_path, PRODUCTS_EXPORT_FIELDS, self._build_products_rows(state, brand_output_dir))
+
+        return output_path
+
+    def _build_products_rows(self, state: Dict, catalog_dir: Path) -> List[Dict[str, str]]:
+        """Build the product catalog export rows.
+
+        Args:
+            state: Current workflow state
+            catalog_dir: Directory checked for a saved 7_product_catalog.json
+                when the state has no products
+
+        Returns:
+            One dict per product keyed by PRODUCTS_EXPORT_FIELDS, with every
+            value rendered as text exactly as the CSV export stores it
+        """
         product_catalog = state.get("product_catalog", {})
 
         # Handle nested product_catalog key (common LLM pattern where data is wrapped)
@@ -2062,7 +2166,7 @@ class OutputFormatterAgent(BaseAgent):
             not product_catalog.get("catalog") and
             not product_catalog.get("categories")
         ):
-            json_file = brand_output_dir / "7_product_catalog.json"
+            json_file = catalog_dir / "7_product_catalog.json"
             if json_file.exists():
                 try:
                     import json
@@ -2116,62 +2220,40 @@ class OutputFormatterAgent(BaseAgent):
                     "target_market": service.get("availability", "Available")
                 })
 
-        if products:
-            with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
-                fieldnames = ["product_name", "category", "description", "target_market"]
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-
-                for product in products:
-                    writer.writerow({
-                        "product_name": product.get("product_name", product.get("service_name", product.get("name", ""))),
-                        "category": product.get("category", ""),
-                        "description": product.get("description", ""),
-                        "target_market": product.get("target_market", "")
-                    })
-        else:
-            # Empty CSV with headers
-            with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.DictWriter(f, fieldnames=["product_name", "category", "description", "target_market"])
-                writer.writeheader()
-
-        return output_path
+        return [
+            {
+                "product_name": _csv_cell(product.get("product_name", product.get("service_name", product.get("name", "")))),
+                "category": _csv_cell(product.get("category", "")),
+                "description": _csv_cell(product.get("description", "")),
+                "target_market": _csv_cell(product.get("target_market", ""))
+            }
+            for product in products
+        ]
 
     def _generate_opportunities_export(self, state: Dict, output_dir: Path, timestamp: str) -> Path:
         """Generate campaign opportunities export CSV."""
         output_path = output_dir / "campaign_opportunities.csv"
 
+        # No opportunities still gets a CSV with headers
+        self._write_csv(output_path, OPPORTUNITIES_EXPORT_FIELDS, self._build_opportunities_rows(state))
+
+        return output_path
+
+    def _build_opportunities_rows(self, state: Dict) -> List[Dict[str, str]]:
+        """Build the campaign opportunities export rows.
+
+        Returns:
+            One dict per cross-promotion opportunity keyed by
+            OPPORTUNITIES_EXPORT_FIELDS, with every value rendered as text
+            exactly as the CSV export stores it
+        """
         insights = state.get("insights", {})
         opportunities = insights.get("cross_promotion_opportunities", [])
 
-        if opportunities:
-            with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
-                fieldnames = [
-                    "partner_brand",
-                    "campaign_concept",
-                    "potential_reach",
-                    "expected_benefit",
-                    "timing"
-                ]
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-
-                for opp in opportunities:
-                    writer.writerow({
-                        "partner_brand": opp.get("partner_brand", ""),
-                        "campaign_concept": opp.get("campaign_concept", ""),
-                        "potential_reach": opp.get("potential_reach", ""),
-                        "expected_benefit": opp.get("expected_benefit", ""),
-                        "timing": opp.get("timing", "")
-                    })
-        else:
-            # Empty CSV with headers
-            with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
-                fieldnames = ["partner_brand", "campaign_concept", "potential_reach", "expected_benefit", "timing"]
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-
-        return output_path
+        return [
+            {field: _csv_cell(opp.get(field, "")) for field in OPPORTUNITIES_EXPORT_FIELDS}
+            for opp in opportunities
+        ]
 
     def _generate_semantic_chunks(self, state: Dict, chunks_dir: Path, timestamp: str) -> List[str]:
         """Generate 12 semantic chunks for vector database (500-1000 words each)."""
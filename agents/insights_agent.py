@@ -81,7 +81,7 @@ class StrategicInsightsAgent(BaseAgent):
             Dictionary containing strategic insights
         """
         # Try LLM if available
-        if self.llm.is_available():
+        if self._llm_available:
             try:
                 # Prepare comprehensive data for analysis
                 analysis_input = self._prepare_insights_data(
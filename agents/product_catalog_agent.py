@@ -66,7 +66,7 @@ class ProductCatalogAgent(BaseAgent):
             Complete product catalog
         """
         # Try LLM-based extraction first
-        if self.llm.is_available():
+        if self._llm_available:
             try:
                 return self._llm_based_extraction(brand_name, raw_data, categorization)
             except Exception as e:
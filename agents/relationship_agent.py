@@ -97,7 +97,7 @@ class RelationshipMappingAgent(BaseAgent):
             Dictionary containing relationship mappings
         """
         # Try LLM if available
-        if self.llm.is_available():
+        if self._llm_available:
             try:
                 # Prepare data for analysis
                 analysis_input = self._prepare_relationship_data(brand_name, raw_data)
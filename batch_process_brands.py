@@ -5,6 +5,7 @@ import time
 from pathlib import Path
 from typing import Dict, List
 from utils.google_sheets_client import GoogleSheetsClient
+from agents import DataCollectionAgent
 from graph import run_workflow
 from utils.logger import get_logger
 
@@ -57,6 +58,9 @@ def process_brands_from_sheet(
 
     logger.info(f"\nFound {len(brands)} brands to process\n")
 
+    # One collector for the whole batch so scrapers reuse their connections
+    data_collector = DataCollectionAgent()
+
     # Process each brand
     results = []
     for idx, brand_info in enumerate(brands, 1):
@@ -91,7 +95,8 @@ def process_brands_from_sheet(
             final_state = run_workflow(
                 brand_name=brand_name,
                 brand_website=website,
-                parent_company=parent_company
+                parent_company=parent_company,
+                data_collector=data_collector
             )
             processing_time = time.time() - start_time
 
@@ -155,6 +160,8 @@ def process_brands_from_sheet(
             logger.info(f"\nWaiting {delay_between_brands} seconds before next brand...")
             time.sleep(delay_between_brands)
 
+    data_collector.close()
+
     # Print summary
     _print_summary(results)
 
@@ -22,10 +22,19 @@ class Settings(BaseSettings):
     # Scraper Configuration
     RATE_LIMIT_DELAY: float = 1.5  # seconds between requests
     SCRAPER_TIMEOUT: int = 30  # seconds
+    SCRAPER_SOURCE_TIMEOUT: int = 90  # seconds per source, across all its requests
     USER_AGENT: str = "BrandIntelligenceBot/1.0"
 
     # Cache Configuration
     CACHE_TTL_HOURS: int = 24
+    LLM_CACHE_ENABLED: bool = True  # Reuse responses for identical LLM requests
+    LLM_CACHE_SIZE: int = 1024  # In-memory entries
+    LLM_CACHE_PATH: str = "data/cache/llm_cache.sqlite3"  # Persistent tier
+    SHEETS_CACHE_ENABLED: bool = True  # Reuse sheet data until the spreadsheet changes
+    SHEETS_CACHE_DIR: str = "data/cache/sheets"
+
+    # Workflow Configuration
+    AGENT_MAX_CONCURRENCY: int = 4  # independent agents run concurrently
 
     # Logging
     LOG_LEVEL: str = "INFO"
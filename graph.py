@@ -1,10 +1,16 @@
 """LangGraph workflow definition for brand intelligence system."""
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
 # Modular imports
 from models import BrandIntelligenceState
 from agents import (
+    BaseAgent,
     DataCollectionAgent,
     RelationshipMappingAgent,
     CategorizationAgent,
@@ -13,6 +19,7 @@ from agents import (
     OutputFormatterAgent,
     CustomerIntelligenceAgent,
 )
+from config.settings import settings
 from utils import get_logger
 from utils.exceptions import APIKeyError
 from utils.llm_client import llm_client
@@ -20,12 +27,91 @@ from utils.llm_client import llm_client
 logger = get_logger(__name__)
 
 
-def create_workflow(google_sheets_credentials: str = None, google_sheets_id: str = None) -> StateGraph:
+def _merge_agent_outputs(
+    agents: Dict[str, BaseAgent],
+    state: BrandIntelligenceState,
+    results: List[BrandIntelligenceState]
+) -> dict:
+    """Combine the states returned by independently run agents into one update.
+
+    Args:
+        agents: Agents keyed by the state key each one writes
+        state: Workflow state the agents started from
+        results: Each agent's returned state, in the order of agents
+
+    Returns:
+        Partial state update: every agent's output key plus the combined errors
+    """
+    update = {"errors": list(state.get("errors", []))}
+    for key, result in zip(agents, results):
+        update[key] = result.get(key)
+        update["errors"].extend(result.get("errors", []))
+    return update
+
+
+async def run_agents_concurrently(
+    agents: Dict[str, BaseAgent],
+    state: BrandIntelligenceState,
+    max_concurrency: int = None
+) -> dict:
+    """Run independent agents concurrently, each on its own copy of the state.
+
+    A semaphore caps the number of agents in flight so provider rate limits
+    are respected.
+
+    Args:
+        agents: Agents keyed by the state key each one writes; their inputs
+            must not depend on each other's outputs
+        state: Current workflow state (not modified)
+        max_concurrency: Maximum agents in flight (default: settings.AGENT_MAX_CONCURRENCY)
+
+    Returns:
+        Partial state update with each agent's output and the combined errors
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or settings.AGENT_MAX_CONCURRENCY)
+
+    async def _run(agent: BaseAgent) -> BrandIntelligenceState:
+        async with semaphore:
+            return await agent.execute_async(dict(state, errors=[]))
+
+    results = await asyncio.gather(*[_run(agent) for agent in agents.values()])
+    return _merge_agent_outputs(agents, state, results)
+
+
+def run_agents_in_threads(
+    agents: Dict[str, BaseAgent],
+    state: BrandIntelligenceState,
+    max_concurrency: int = None
+) -> dict:
+    """Synchronous counterpart of run_agents_concurrently() using worker threads.
+
+    Needs no event loop, so it is safe to call from a synchronous graph run
+    even when the caller already has a loop running.
+
+    Args:
+        agents: Agents keyed by the state key each one writes
+        state: Current workflow state (not modified)
+        max_concurrency: Maximum agents in flight (default: settings.AGENT_MAX_CONCURRENCY)
+
+    Returns:
+        Partial state update with each agent's output and the combined errors
+    """
+    with ThreadPoolExecutor(max_workers=max_concurrency or settings.AGENT_MAX_CONCURRENCY) as executor:
+        results = list(executor.map(lambda agent: agent.execute(dict(state, errors=[])), agents.values()))
+    return _merge_agent_outputs(agents, state, results)
+
+
+def create_workflow(
+    google_sheets_credentials: str = None,
+    google_sheets_id: str = None,
+    data_collector: DataCollectionAgent = None
+) -> StateGraph:
     """Create and configure the LangGraph workflow.
 
     Args:
         google_sheets_credentials: Path to Google service account JSON credentials (optional)
         google_sheets_id: Google Sheets ID for customer intelligence data (optional)
+        data_collector: Data collection agent to use instead of a new one (optional)
 
     Returns:
         Configured StateGraph ready for execution
@@ -33,7 +119,8 @@ def create_workflow(google_sheets_credentials: str = None, google_sheets_id: str
     logger.info("Creating brand intelligence workflow...")
 
     # Initialize all agents
-    data_collector = DataCollectionAgent()
+    if data_collector is None:
+        data_collector = DataCollectionAgent()
     relationship_mapper = RelationshipMappingAgent()
     categorizer = CategorizationAgent()
     product_catalog_extractor = ProductCatalogAgent()
@@ -61,12 +148,26 @@ def create_workflow(google_sheets_credentials: str = None, google_sheets_id: str
     workflow.add_node("relationship_mapping", relationship_mapper.execute)
     workflow.add_node("categorization", categorizer.execute)
     workflow.add_node("product_catalog_extraction", product_catalog_extractor.execute)
-    workflow.add_node("insights_generation", insights_generator.execute)
     workflow.add_node("output_formatting", formatter.execute)
 
-    # Add customer intelligence node if enabled
+    # Customer intelligence only needs the brand name, so it runs
+    # concurrently with insights generation (both wait on network I/O).
+    # Each agent works on its own state copy; the node returns the merged
+    # update, via threads under invoke() and the running loop under ainvoke()
     if customer_intelligence_enabled:
-        workflow.add_node("customer_intelligence", customer_intelligence.execute)
+        concurrent_agents = {
+            "insights": insights_generator,
+            "customer_intelligence": customer_intelligence,
+        }
+        workflow.add_node(
+            "insights_generation",
+            RunnableLambda(
+                lambda state: run_agents_in_threads(concurrent_agents, state),
+                afunc=lambda state: run_agents_concurrently(concurrent_agents, state),
+            )
+        )
+    else:
+        workflow.add_node("insights_generation", insights_generator.execute)
 
     # Define the workflow edges (sequential pipeline)
     workflow.set_entry_point("data_collection")
@@ -75,13 +176,7 @@ def create_workflow(google_sheets_credentials: str = None, google_sheets_id: str
     workflow.add_edge("categorization", "product_catalog_extraction")
     workflow.add_edge("product_catalog_extraction", "insights_generation")
     workflow.add_edge("insights_generation", "output_formatting")
-
-    # Connect customer intelligence after output formatting
-    if customer_intelligence_enabled:
-        workflow.add_edge("output_formatting", "customer_intelligence")
-        workflow.add_edge("customer_intelligence", END)
-    else:
-        workflow.add_edge("output_formatting", END)
+    workflow.add_edge("output_formatting", END)
 
     logger.info("[OK] Workflow created successfully")
 
@@ -94,7 +189,9 @@ def run_workflow(
     parent_company: str = None,
     google_sheets_credentials: str = None,
     google_sheets_id: str = None,
-    skip_api_validation: bool = False
+    skip_api_validation: bool = False,
+    output_sections: list = None,
+    data_collector: DataCollectionAgent = None
 ) -> dict:
     """Run the brand intelligence workflow.
 
@@ -105,6 +202,10 @@ def run_workflow(
         google_sheets_credentials: Path to Google service account JSON credentials (optional)
         google_sheets_id: Google Sheets ID for customer intelligence data (optional)
         skip_api_validation: Skip API validation (used in batch mode where validation happens once)
+        output_sections: Unified report sections to build (optional, default all)
+        data_collector: Data collection agent shared across runs (optional). Its
+            scrapers keep their HTTP connections open and the caller closes it;
+            without one, a collector is created for this run and closed after it
 
     Returns:
         Final state with all analysis results
@@ -121,7 +222,10 @@ def run_workflow(
             raise  # Re-raise to stop processing
 
     # Create workflow
-    workflow = create_workflow(google_sheets_credentials, google_sheets_id)
+    owns_collector = data_collector is None
+    if owns_collector:
+        data_collector = DataCollectionAgent()
+    workflow = create_workflow(google_sheets_credentials, google_sheets_id, data_collector)
 
     # Compile the graph
     app = workflow.compile()
@@ -131,6 +235,7 @@ def run_workflow(
         brand_name=brand_name,
         brand_website=brand_website,
         parent_company=parent_company,
+        output_sections=output_sections,
         raw_data={},
         relationships={},
         categorization={},
@@ -163,6 +268,11 @@ def run_workflow(
         logger.error(f"Workflow execution failed: {e}")
         raise
 
+    finally:
+        # Release the scrapers' pooled HTTP connections
+        if owns_collector:
+            data_collector.close()
+
 
 def _log_summary(state: dict) -> None:
     """Log a summary of the workflow results.
@@ -142,6 +142,7 @@ def _run_batch_mode_sequential(args):
         args: Command-line arguments
     """
     import time
+    from agents import DataCollectionAgent
     from utils import GoogleSheetsClient, BrandRegistry, RunLogger
 
     # Initialize run logger
@@ -184,6 +185,9 @@ def _run_batch_mode_sequential(args):
 
     start_time = time.time()
 
+    # One collector for the whole batch so scrapers reuse their connections
+    data_collector = DataCollectionAgent()
+
     # Process each brand
     for idx, brand_data in enumerate(brands, 1):
         brand_name = brand_data.get("brand_name", "")
@@ -224,7 +228,8 @@ def _run_batch_mode_sequential(args):
                 brand_website=website,
                 parent_company=parent,
                 google_sheets_credentials=args.sheets_credentials,
-                google_sheets_id=args.sheets_id
+                google_sheets_id=args.sheets_id,
+                data_collector=data_collector
             )
 
             # Check if successful
@@ -341,6 +346,8 @@ def _run_batch_mode_sequential(args):
             except:
                 pass
 
+    data_collector.close()
+
     # Print summary
     elapsed_time = time.time() - start_time
     print_batch_summary(results, elapsed_time, run_logger)
@@ -457,6 +464,12 @@ Examples:
         help="Google Sheets ID for customer intelligence data"
     )
 
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-download Google Sheets data (ignore the local sheet cache)"
+    )
+
     parser.add_argument(
         "--output-dir",
         "-o",
@@ -522,6 +535,9 @@ Examples:
 
     args = parser.parse_args()
 
+    if args.no_cache:
+        settings.SHEETS_CACHE_ENABLED = False
+
     # Print banner
     print_banner()
 
@@ -9,7 +9,7 @@ import logging
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 logger = logging.getLogger(__name__)
 
@@ -465,6 +465,18 @@ class OutputsResult(BaseModel):
 # Validation helper
 # ---------------------------------------------------------------------------
 
+# TypeAdapter per model class, built on first use and reused afterwards
+_ADAPTERS: Dict[type, TypeAdapter] = {}
+
+
+def _get_adapter(model_class: type) -> TypeAdapter:
+    """Return the cached TypeAdapter for a model class."""
+    adapter = _ADAPTERS.get(model_class)
+    if adapter is None:
+        adapter = _ADAPTERS[model_class] = TypeAdapter(model_class)
+    return adapter
+
+
 def validate_agent_output(
     data: Any,
     model_class: type,
@@ -490,7 +502,7 @@ def validate_agent_output(
         return None, {"agent": agent_name, "warning": warning, "errors": []}
 
     try:
-        validated = model_class.model_validate(data)
+        validated = _get_adapter(model_class).validate_python(data)
         return validated, {}
     except Exception as exc:
         warning = f"[{agent_name}] Validation warning: {exc}"
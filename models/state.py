@@ -16,6 +16,7 @@ class BrandIntelligenceState(TypedDict):
     brand_name: str
     brand_website: Optional[str]
     parent_company: Optional[str]  # Parent company provided by user
+    output_sections: Optional[list]  # Unified report sections to build (None = all)
 
     # Agent outputs
     raw_data: dict  # Output from DataCollectionAgent
@@ -24,6 +25,7 @@ class BrandIntelligenceState(TypedDict):
     product_catalog: dict  # Output from ProductCatalogAgent
     insights: dict  # Output from StrategicInsightsAgent
     outputs: dict  # Output from OutputFormatterAgent
+    customer_intelligence: dict  # Output from CustomerIntelligenceAgent (optional)
 
     # Error tracking
     errors: list  # List of errors encountered during processing
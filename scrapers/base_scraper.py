@@ -1,5 +1,6 @@
 """Base scraper class with common functionality."""
 
+import asyncio
 import time
 import hashlib
 from abc import ABC, abstractmethod
@@ -34,6 +35,7 @@ class BaseScraper(ABC):
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "fa,en;q=0.9",
         }
+        self._client: Optional[httpx.Client] = None
 
     def _rate_limit(self) -> None:
         """Enforce rate limiting between requests."""
@@ -106,6 +108,38 @@ class BaseScraper(ABC):
         except Exception as e:
             logger.warning(f"[{self.source_name}] Failed to cache data: {e}")
 
+    def _http_client(self) -> httpx.Client:
+        """Get the scraper's HTTP client, creating it on first use.
+
+        One pooled client per scraper keeps connections (and their TLS
+        sessions) alive across requests and across brands.
+
+        Returns:
+            Shared httpx client for this scraper
+        """
+        if self._client is None:
+            self._client = httpx.Client(
+                headers=self.headers,
+                timeout=settings.SCRAPER_TIMEOUT,
+                follow_redirects=True
+            )
+        return self._client
+
+    def close(self) -> None:
+        """Close the pooled HTTP client, if one was created.
+
+        The scraper stays usable; a new client is created on the next request.
+        """
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def __enter__(self) -> "BaseScraper":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
     def _make_request(self, url: str, method: str = "GET", **kwargs) -> Optional[httpx.Response]:
         """Make an HTTP request with error handling.
 
@@ -122,14 +156,9 @@ class BaseScraper(ABC):
         try:
             logger.info(f"[{self.source_name}] Requesting {url}")
 
-            with httpx.Client(
-                headers=self.headers,
-                timeout=settings.SCRAPER_TIMEOUT,
-                follow_redirects=True
-            ) as client:
-                response = client.request(method, url, **kwargs)
-                response.raise_for_status()
-                return response
+            response = self._http_client().request(method, url, **kwargs)
+            response.raise_for_status()
+            return response
 
         except httpx.HTTPStatusError as e:
             logger.error(f"[{self.source_name}] HTTP error {e.response.status_code}: {url}")
@@ -194,3 +223,19 @@ class BaseScraper(ABC):
             self._cache_data(brand_name, data)
 
         return data
+
+    async def scrape_with_cache_async(self, brand_name: str, **kwargs) -> Optional[Dict[str, Any]]:
+        """Scrape data with caching support without blocking the event loop.
+
+        The default implementation runs scrape_with_cache() in a worker
+        thread. Scrapers with async I/O can override this with a native
+        coroutine.
+
+        Args:
+            brand_name: Name of the brand to scrape
+            **kwargs: Additional scraper-specific arguments
+
+        Returns:
+            Scraped data as a dictionary, or None on failure
+        """
+        return await asyncio.to_thread(self.scrape_with_cache, brand_name, **kwargs)
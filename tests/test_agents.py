@@ -1,5 +1,9 @@
 """Unit tests for agents."""
 
+import asyncio
+import json
+import re
+
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from models.state import BrandIntelligenceState
@@ -8,6 +12,7 @@ from agents.relationship_agent import RelationshipMappingAgent
 from agents.categorization_agent import CategorizationAgent
 from agents.insights_agent import StrategicInsightsAgent
 from agents.formatter_agent import OutputFormatterAgent
+from agents.customer_intelligence_agent import CustomerIntelligenceAgent
 
 
 @pytest.fixture
@@ -83,6 +88,108 @@ class TestDataCollectionAgent:
         assert "brand_name" in result
         assert "raw_html" not in result  # Should exclude raw HTML
 
+    def test_scrape_all_sources_isolates_failures(self, agent):
+        """Every scraper runs; a raising source is recorded as None."""
+        from scrapers.base_scraper import BaseScraper
+
+        class StubScraper(BaseScraper):
+            def __init__(self, result):
+                self.result = result
+                self.calls = []
+
+            def scrape(self, brand_name, **kwargs):
+                raise NotImplementedError
+
+            def scrape_with_cache(self, brand_name, **kwargs):
+                self.calls.append((brand_name, kwargs))
+                if isinstance(self.result, Exception):
+                    raise self.result
+                return self.result
+
+        web_search = StubScraper({"title": "ok"})
+        agent.scrapers = {"web_search": web_search, "codal": StubScraper(RuntimeError("boom"))}
+
+        results = agent._scrape_all_sources("Acme", "https://acme.ir")
+
+        assert results == {"web_search": {"title": "ok"}, "codal": None}
+        assert web_search.calls == [("Acme", {"website_url": "https://acme.ir"})]
+
+    def test_scrape_all_sources_times_out_slow_source(self, agent, monkeypatch):
+        """A source over the per-source timeout is dropped without waiting for it."""
+        import threading
+        import time
+        from config.settings import settings
+
+        release = threading.Event()
+        slow = MagicMock()
+        slow.scrape_with_cache_async = lambda brand: asyncio.to_thread(release.wait, 5)
+        fast = MagicMock()
+        fast.scrape_with_cache_async = lambda brand: asyncio.sleep(0, result={"title": "ok"})
+        agent.scrapers = {"tsetmc": slow, "example": fast}
+        monkeypatch.setattr(settings, "SCRAPER_SOURCE_TIMEOUT", 0.1)
+
+        started = time.monotonic()
+        try:
+            results = agent._scrape_all_sources("Acme", None)
+        finally:
+            release.set()
+
+        assert results == {"tsetmc": None, "example": {"title": "ok"}}
+        assert time.monotonic() - started < 2
+
+    def test_execute_keeps_scrapers_open_until_close(self, agent, sample_state):
+        """Scrapers stay open across brands; close() releases every one."""
+        scraper = MagicMock()
+        scraper.scrape_with_cache_async = lambda brand, **kwargs: asyncio.sleep(0, result={"title": "ok"})
+        agent.scrapers = {"example": scraper}
+
+        agent.execute(dict(sample_state, errors=[]))
+        agent.execute(dict(sample_state, brand_name="Other", errors=[]))
+        scraper.close.assert_not_called()
+
+        agent.close()
+        scraper.close.assert_called_once_with()
+
+    def test_prepare_data_for_llm_is_json(self, agent):
+        """The LLM summary is JSON of non-empty, non-raw fields per source."""
+        raw_data = {
+            "web_search": {"page_title": "Test", "raw_html": "<html/>", "headings": []},
+            "codal": {"revenue": 1000000},
+            "tsetmc": None,
+        }
+
+        assert json.loads(agent._prepare_data_for_llm(raw_data)) == {
+            "web_search": {"page_title": "Test"},
+            "codal": {"revenue": 1000000},
+        }
+
+    def test_basic_extraction_service_headings(self, agent):
+        """Headings mentioning a service keyword are collected in order."""
+        raw_data = {
+            "web_search": {
+                "headings": ["Our SERVICES", "About", None, "خدمات مشاوره", "Contact"]
+            }
+        }
+
+        result = agent._basic_extraction(raw_data)
+
+        assert result["products_services"] == ["Our SERVICES", "خدمات مشاوره"]
+        assert "products_services" not in agent._basic_extraction({"web_search": {"headings": ["About"]}})
+
+    def test_basic_extraction_dedupes_contacts(self, agent):
+        """Emails and phones are unique across sources; addresses are kept as found."""
+        raw_data = {
+            "web_search": {"contact_info": {"emails": ["a@x.ir", "b@x.ir"], "addresses": ["Tehran"]}},
+            "linka": {"contact_info": {"emails": ["a@x.ir"], "phones": ["021", "021"], "addresses": ["Tehran"]}},
+            "codal": None,
+        }
+
+        contact = agent._basic_extraction(raw_data)["contact_info"]
+
+        assert sorted(contact["emails"]) == ["a@x.ir", "b@x.ir"]
+        assert contact["phones"] == ["021"]
+        assert contact["addresses"] == ["Tehran", "Tehran"]
+
     @patch.object(DataCollectionAgent, '_scrape_all_sources')
     def test_execute_with_no_data(self, mock_scrape, agent, sample_state):
         """Test execute when no data is collected."""
@@ -155,6 +262,26 @@ class TestCategorizationAgent:
         """Test agent initializes correctly."""
         assert agent.agent_name == "CategorizationAgent"
 
+    def test_count_tokens_loads_encoding_lazily(self, monkeypatch):
+        """The encoding is fetched on first count, and special tokens count as text."""
+        from agents import categorization_agent
+
+        encoding = MagicMock()
+        encoding.encode.return_value = [1, 2, 3]
+        get_encoding = MagicMock(return_value=encoding)
+        monkeypatch.setattr(categorization_agent, "TIKTOKEN_AVAILABLE", True)
+        monkeypatch.setattr(categorization_agent, "tiktoken", MagicMock(get_encoding=get_encoding), raising=False)
+        categorization_agent._get_token_encoding.cache_clear()
+        try:
+            get_encoding.assert_not_called()
+            assert categorization_agent._count_tokens("a <|endoftext|>") == 3
+            assert categorization_agent._count_tokens("b") == 3
+        finally:
+            categorization_agent._get_token_encoding.cache_clear()
+
+        get_encoding.assert_called_once_with("cl100k_base")
+        encoding.encode.assert_called_with("b", disallowed_special=())
+
     def test_execute_with_no_data(self, agent):
         """Test execute with no raw data."""
         state = BrandIntelligenceState(
@@ -185,6 +312,73 @@ class TestCategorizationAgent:
 
         assert len(result) > 0
 
+    def test_prepare_categorization_data_prunes_blobs(self, agent):
+        """Test long strings are truncated and irrelevant website fields dropped."""
+        raw_data = {
+            "structured": {"description": "x" * 5000, "empty": None},
+            "scraped": {
+                "web_search": {
+                    "page_title": "Test Brand",
+                    "contact_info": {"emails": ["info@test.com"]},
+                    "raw_html": "<html>...</html>"
+                }
+            }
+        }
+
+        result = agent._prepare_categorization_data("TestBrand", raw_data, {})
+
+        assert "x" * 501 not in result
+        assert "empty" not in result
+        assert "Test Brand" in result
+        assert "info@test.com" not in result
+        assert "raw_html" not in result
+
+    def test_rule_based_industry_priority(self, agent):
+        """Test the first listed industry wins when several keywords match."""
+        raw_data = {
+            "structured": {
+                "website_info": {
+                    "title": "Snapp Taxi",
+                    "meta_description": "Online payment for every ride"
+                }
+            }
+        }
+
+        result = agent._rule_based_categorization("Snapp", raw_data, {})
+
+        assert result["primary_industry"]["category_level_3"] == "Ride-Hailing"
+        assert result["distribution_channels"] == ["online"]
+
+    def test_rule_based_sister_brand_short_circuits(self, agent):
+        """Test a sister brand category is used without keyword matching."""
+        relationships = {
+            "sister_brands": [
+                {"name": "No Category"},
+                {"industry_category": {"name_en": "Laundry_Care"}, "business_model": "B2B"}
+            ]
+        }
+
+        with patch("agents.categorization_agent._match_industry") as mock_match:
+            result = agent._rule_based_categorization("Brand", {"structured": {}}, relationships)
+
+        mock_match.assert_not_called()
+        assert result["primary_industry"] == {"name_en": "Laundry_Care"}
+        assert result["business_model"] == "B2B"
+        assert result["target_audiences"] == []
+
+    def test_rule_based_audiences(self, agent):
+        """Test all matching audiences are collected in declaration order."""
+        raw_data = {
+            "structured": {
+                "website_info": {"title": "Teen fashion for WOMEN", "meta_description": ""}
+            }
+        }
+
+        result = agent._rule_based_categorization("Brand", raw_data, {})
+
+        assert result["target_audiences"] == ["women", "youth"]
+        assert result["distribution_channels"] == ["retail", "online"]
+
 
 class TestStrategicInsightsAgent:
     """Test cases for StrategicInsightsAgent."""
@@ -293,6 +487,136 @@ class TestOutputFormatterAgent:
         assert md_path.exists()
         assert md_path.suffix == ".md"
 
+    def test_export_rows_match_csv_readback(self, agent, sample_state, tmp_path):
+        """In-memory export rows equal what the CSV files read back as."""
+        import csv
+
+        state = dict(sample_state)
+        state["insights"] = {"cross_promotion_opportunities": [
+            {"partner_brand": "Beta", "campaign_concept": "Mix, \"quoted\"\nline", "potential_reach": 1.5},
+            {"partner_brand": None, "timing": 3},
+        ]}
+        state["product_catalog"] = {"products": [{"name": "P", "category": None, "target_market": 2}]}
+        state["relationships"] = {"sister_brands": [{"name": "S", "synergy_score": 8}]}
+
+        for build, generate in [
+            (lambda: agent._build_brands_rows(state), agent._generate_brands_database),
+            (lambda: agent._build_products_rows(state, tmp_path), agent._generate_products_export),
+            (lambda: agent._build_opportunities_rows(state), agent._generate_opportunities_export),
+        ]:
+            path = generate(state, tmp_path, "ts")
+            with open(path, encoding="utf-8-sig", newline="") as f:
+                assert build() == list(csv.DictReader(f))
+
+    def test_execute_embeds_reports_without_intermediate_files(self, agent, sample_state, tmp_path):
+        """Markdown reports and quick reference go straight into brand_report.json."""
+        from pathlib import Path
+
+        agent.output_dir = tmp_path
+        state = dict(sample_state)
+        state["insights"] = {"executive_summary": "line one\r\nline two"}
+
+        result = agent.execute(state)
+
+        report_path = Path(result["outputs"]["brand_report"])
+        report = json.loads(report_path.read_text(encoding="utf-8"))
+        assert sorted(p.name for p in report_path.parent.iterdir()) == ["brand_report.json"]
+        assert "line one\r\nline two" in report["executive_summary"]
+        assert report["quick_reference"]["brand_id"] == report["brand_id"]
+        assert report["complete_analysis_report"].startswith("# ")
+
+    def test_execute_builds_only_requested_sections(self, agent, sample_state, tmp_path):
+        """Sections left out of output_sections are skipped entirely."""
+        from pathlib import Path
+
+        agent.output_dir = tmp_path
+        state = dict(sample_state, output_sections=["executive_summary", "brands_database"])
+
+        with patch.object(agent, "_build_complete_analysis_report") as complete_report:
+            result = agent.execute(state)
+
+        complete_report.assert_not_called()
+        report = json.loads(Path(result["outputs"]["brand_report"]).read_text(encoding="utf-8"))
+        assert "executive_summary" in report and "brands_database" in report
+        for section in ("complete_analysis_report", "quick_reference", "product_catalog", "campaign_opportunities"):
+            assert section not in report
+        assert report["brand_id"] and report["generated_date"]
+
+    @pytest.mark.parametrize("brand_name,persian_name", [
+        ("تست برند", "تست برند"),
+        ("Digikala دیجی", "Digikala دیجی"),
+        ("Digikala", ""),
+    ])
+    def test_brand_profile_persian_name(self, agent, sample_state, tmp_path, brand_name, persian_name):
+        """Only names containing Persian characters are copied to brand_name_persian."""
+        state = dict(sample_state, brand_name=brand_name)
+
+        path = agent._generate_brand_profile(state, tmp_path, "ts")
+
+        profile = json.loads(path.read_text(encoding="utf-8"))
+        assert profile["basic_information"]["brand_name_persian"] == persian_name
+
+    @pytest.mark.parametrize("category,expected", [
+        ("Food Delivery", ("Technology_Services", "On-Demand_Platforms", "Food_Delivery")),
+        ("ride-hailing", ("Technology_Services", "On-Demand_Platforms", "Ride-Hailing")),
+        ("Pet Care-Products", ("Consumer_Products", "General_Products", "Pet_Care_Products")),
+    ])
+    def test_get_category_hierarchy(self, agent, category, expected):
+        """Categories are normalized before lookup; unknown ones get generic levels."""
+        hierarchy = agent._get_category_hierarchy(category)
+
+        assert (
+            hierarchy["category_level_1"],
+            hierarchy["category_level_2"],
+            hierarchy["category_level_3"],
+        ) == expected
+
+    def test_brands_rows_resolve_each_category_once(self, agent, sample_state):
+        """Repeated categories share one hierarchy lookup per build."""
+        state = dict(sample_state)
+        state["relationships"] = {
+            "sister_brands": [{"name": f"S{i}", "category": "Food Delivery"} for i in range(5)],
+            "competitors": [{"name": "C", "category": "Food Delivery"}],
+        }
+
+        with patch.object(agent, "_get_category_hierarchy", wraps=agent._get_category_hierarchy) as lookup:
+            rows = agent._build_brands_rows(state)
+
+        assert sorted(call.args[0] for call in lookup.call_args_list) == ["E-commerce", "Food Delivery"]
+        assert {row["category_level_3"] for row in rows[1:]} == {"Food_Delivery"}
+
+    def test_json_report_matches_stdlib_output(self, tmp_path):
+        """Report JSON is byte-identical to json.dump(ensure_ascii=False, indent=2)."""
+        import json
+        from agents.formatter_agent import _write_json_report
+
+        data = {"brand": "تست", "rows": [{"a": 1, "b": None}], "empty": {}, "ratio": 0.35, "huge": 2 ** 70}
+        report_path = tmp_path / "report.json"
+        _write_json_report(report_path, data)
+
+        assert report_path.read_text(encoding="utf-8") == json.dumps(data, ensure_ascii=False, indent=2)
+
+        data.pop("huge")
+        _write_json_report(report_path, data)
+        assert report_path.read_text(encoding="utf-8") == json.dumps(data, ensure_ascii=False, indent=2)
+
+    def test_knowledge_base_cached_until_modified(self, tmp_path):
+        """Knowledge base is parsed once and reloaded only when the file changes."""
+        import os
+
+        kb_path = tmp_path / "kb.json"
+        kb_path.write_text('{"version": 1}', encoding="utf-8")
+
+        first = OutputFormatterAgent._load_knowledge_base(kb_path)
+        assert OutputFormatterAgent._load_knowledge_base(kb_path) is first
+
+        kb_path.write_text('{"version": 2}', encoding="utf-8")
+        stat = kb_path.stat()
+        os.utime(kb_path, (stat.st_atime, stat.st_mtime + 10))
+
+        assert OutputFormatterAgent._load_knowledge_base(kb_path) == {"version": 2}
+        assert OutputFormatterAgent._load_knowledge_base(tmp_path / "missing.json") == {}
+
     def test_execute(self, agent, sample_state, tmp_path):
         """Test full execute method."""
         agent.output_dir = tmp_path
@@ -307,5 +631,229 @@ class TestOutputFormatterAgent:
         assert "markdown" in result["outputs"]
 
 
+class TestCustomerIntelligenceAgent:
+    """Test cases for CustomerIntelligenceAgent."""
+
+    @pytest.fixture
+    def agent(self, monkeypatch, tmp_path):
+        """Create CustomerIntelligenceAgent with a mocked Sheets client."""
+        from config.settings import settings
+        monkeypatch.setattr(settings, "SHEETS_CACHE_ENABLED", False)
+        monkeypatch.setattr(settings, "SHEETS_CACHE_DIR", str(tmp_path / "sheets"))
+        agent = CustomerIntelligenceAgent("credentials.json", "sheet-id")
+        agent.sheets_client = MagicMock()
+        return agent
+
+    def test_fetch_sheets_batch_single_request(self, agent):
+        """Both sheets come from one batchGet call, padded like get_all_values."""
+        spreadsheet = agent.sheets_client.client.open_by_key.return_value
+        spreadsheet.values_batch_get.return_value = {
+            "valueRanges": [
+                {"values": [["Brand", "Website", "Parent"], ["Acme", "https://acme.ir"]]},
+                {"values": [["h0", "h1", "h2"], ["a"]]},
+            ]
+        }
+
+        brand_rows, reference_rows = agent._fetch_sheets_batch()
+
+        spreadsheet.values_batch_get.assert_called_once()
+        spreadsheet.worksheet.assert_not_called()
+        assert brand_rows[1] == ["Acme", "https://acme.ir", ""]
+        assert reference_rows == [["h0", "h1", "h2"], ["a", "", ""]]
+
+    def test_spreadsheet_handle_memoized(self, agent):
+        """open_by_key is only called once across repeated fetches."""
+        spreadsheet = agent.sheets_client.client.open_by_key.return_value
+        spreadsheet.values_batch_get.return_value = {"valueRanges": []}
+
+        agent._fetch_sheets_batch()
+        agent._fetch_sheets_batch()
+
+        agent.sheets_client.client.open_by_key.assert_called_once_with("sheet-id")
+        assert spreadsheet.values_batch_get.call_count == 2
+
+    def test_sheets_cache_keyed_by_modified_time(self, agent, monkeypatch, tmp_path):
+        """Unchanged sheets are served from disk; a new revision refetches."""
+        from config.settings import settings
+        monkeypatch.setattr(settings, "SHEETS_CACHE_ENABLED", True)
+        spreadsheet = agent.sheets_client.client.open_by_key.return_value
+        spreadsheet.get_lastUpdateTime.return_value = "2024-01-01T00:00:00Z"
+        spreadsheet.values_batch_get.return_value = {
+            "valueRanges": [{"values": [["Brand"], ["Acme"]]}, {"values": [["h0"], ["x"]]}]
+        }
+
+        first = agent._fetch_sheets_batch()
+        second = agent._fetch_sheets_batch()
+        assert first == second
+        assert spreadsheet.values_batch_get.call_count == 1
+
+        spreadsheet.get_lastUpdateTime.return_value = "2024-01-02T00:00:00Z"
+        agent._fetch_sheets_batch()
+        assert spreadsheet.values_batch_get.call_count == 2
+        assert len(list((tmp_path / "sheets").glob("sheet-id_*.json"))) == 1
+
+    def test_cold_cache_fetch_survives_metadata_failure(self, agent, monkeypatch, tmp_path):
+        """With nothing cached, a failed modifiedTime lookup still returns data."""
+        from config.settings import settings
+        monkeypatch.setattr(settings, "SHEETS_CACHE_ENABLED", True)
+        spreadsheet = agent.sheets_client.client.open_by_key.return_value
+        spreadsheet.get_lastUpdateTime.side_effect = RuntimeError("drive unavailable")
+        spreadsheet.values_batch_get.return_value = {
+            "valueRanges": [{"values": [["Brand"], ["Acme"]]}, {"values": [["h0"]]}]
+        }
+
+        brand_rows, reference_rows = agent._fetch_sheets_batch()
+
+        assert brand_rows == [["Brand"], ["Acme"]]
+        assert reference_rows == [["h0"]]
+        assert not (tmp_path / "sheets").exists()
+
+    def test_load_from_prefetched_rows(self, agent):
+        """Metadata and transactions are parsed from pre-fetched grids."""
+        brand_rows = [["Brand", "Website", "Parent"], ["Acme", "https://acme.ir", "Acme Group"]]
+        headers = [f"col{i}" for i in range(9)]
+        reference_rows = [
+            headers,
+            ["1"] + [""] * 6 + ["Acme Store", ""],
+            ["2"] + [""] * 6 + ["Other", "ACME customer"],
+            ["3"] + [""] * 6 + ["Other", "Someone"],
+        ]
+
+        metadata = agent._load_brand_metadata("Acme", brand_rows)
+        transactions = agent._load_transaction_data("Acme", reference_rows)
+
+        assert metadata["parent_company"] == "Acme Group"
+        assert transactions["col0"] == ["1", "2"]
+        assert transactions["col8"] == ["", "ACME customer"]
+        agent.sheets_client.client.open_by_key.assert_not_called()
+
+    def test_lowered_reference_rows_reused_across_brands(self, agent):
+        """The lowercased match columns are built once per fetched grid."""
+        reference_rows = [
+            [f"col{i}" for i in range(9)],
+            ["1"] + [""] * 6 + ["Acme", "Beta Co"],
+        ]
+
+        index = agent._lowered_reference_rows(reference_rows)
+        assert agent._load_transaction_data("acme", reference_rows)["col0"] == ["1"]
+        assert agent._load_transaction_data("BETA", reference_rows)["col0"] == ["1"]
+        assert agent._lowered_reference_rows(reference_rows) is index
+
+    def test_brand_index_first_match_wins(self, agent):
+        """Brand_Data is indexed once per grid and keeps the first row per name."""
+        brand_rows = [
+            ["Brand", "Website"],
+            [],
+            [" Acme ", "https://acme.ir"],
+            ["Acme", "https://duplicate.ir"],
+            ["Beta"],
+        ]
+
+        index = agent._indexed_brand_rows(brand_rows)
+        assert agent._load_brand_metadata("Acme", brand_rows)["website"] == "https://acme.ir"
+        assert agent._load_brand_metadata("Beta", brand_rows)["website"] == "Not Available"
+        assert agent._load_brand_metadata("acme", brand_rows) is None
+        assert agent._indexed_brand_rows(brand_rows) is index
+
+    def test_process_transaction_data_aggregates(self, agent):
+        """Campaign, platform and overall totals are aggregated per column."""
+        transactions = {
+            "Campaign Name": ["Launch", "Launch", " "],
+            "Total Cost": ["1,000", "500", "x"],
+            "Revenue": ["2,500", "٬500", "1000"],
+            "View": ["100", "", "50"],
+            "Media": ["ig", "IG ", "yt"],
+            "Date": ["14020101", "14020301", "14010505"],
+            "Payment status": ["Paid", "pending", ""],
+            "Invoice Number": ["INV-1", "", ""],
+        }
+
+        result = agent._process_transaction_data(transactions, {})
+
+        assert list(result["campaigns"]) == ["Launch", "Unnamed Campaign"]
+        launch = result["campaigns"]["Launch"]
+        assert launch.total_cost == 1500
+        assert launch.platforms == {"IG"}
+        assert launch.transaction_count == 2
+        assert (launch.min_date, launch.max_date) == ("14020101", "14020301")
+        assert result["campaigns"]["Unnamed Campaign"].min_date == "14010505"
+        assert result["total_transactions"] == 3
+        assert result["total_revenue"] == 4000
+        assert result["platform_breakdown"]["IG"]["transactions"] == 2
+        assert result["platform_breakdown"]["YT"]["avg_cpv"] == 0
+        assert result["year_revenue"] == {"1402": 3000, "1401": 1000}
+        assert result["total_paid"] == 1
+        assert result["invoices"][0]["amount"] == 2500
+
+    def test_year_revenue_requires_numeric_year(self, agent):
+        """Only 8-character dates with a numeric year prefix count toward a year."""
+        result = agent._process_transaction_data(
+            {"Date": ["14020101", "Jan 2024", "1402", ""], "Revenue": ["10", "20", "30", "40"]}, {}
+        )
+
+        assert result["year_revenue"] == {"1402": 10}
+
+    def test_parse_number_series_matches_scalar_parser(self, agent):
+        """Column parsing agrees with _parse_persian_number cell by cell."""
+        values = ["1,000", "۱۲۳", " 7 ", "3٬000", "", "-", "2.5", None]
+
+        parsed = agent._parse_number_series(values).tolist()
+        assert parsed == [agent._parse_persian_number(v) for v in values]
+        assert agent._parse_number_series(["1,000", "۲٬۰۰۰"]).tolist() == [1000.0, 2000.0]
+
+    def test_generate_markdown_report_streams_all_sections(self, agent, tmp_path):
+        """The streamed report contains every section and no trailing newline."""
+        data = agent._process_transaction_data(
+            {"Campaign Name": ["Launch"], "Revenue": ["1,000"], "Media": ["ig"]}, {}
+        )
+        metadata = {"website": "https://acme.ir", "parent_company": "Acme Group"}
+
+        path = agent._generate_markdown_report("Acme", metadata, data, tmp_path)
+        content = path.read_text(encoding="utf-8")
+
+        assert content.startswith("# Customer Intelligence Folder Specification\n")
+        for section in range(8, 15):
+            assert f"## {section}. " in content
+        assert content.endswith("(Refrences)")
+
+    def test_report_sections_are_valid_json(self, agent, tmp_path):
+        """Every JSON block parses, even with quotes in sheet values."""
+        data = agent._process_transaction_data(
+            {"Campaign Name": ['Say "hi"'], "Total Cost": ["1,500"], "View": ["30"],
+             "Media": ["ig"], "Sale": ['Ali "A"'], "Invoice Number": ["INV-1"]}, {}
+        )
+
+        path = agent._generate_markdown_report("Acme", {}, data, tmp_path)
+        blocks = re.findall(r"```json\n(.*?)\n```", path.read_text(encoding="utf-8"), re.S)
+
+        payloads = [json.loads(block) for block in blocks]
+        assert len(payloads) == 7
+        assert payloads[1]["campaigns"][0]["campaign_name"] == 'Say "hi"'
+        assert payloads[1]["campaigns"][0]["performance"]["cost_per_view"] == 50
+
+    @pytest.mark.parametrize("data, expected", [
+        ({"total_campaigns": 20, "payment_rate": 1.0, "total_revenue": 5e8}, ("low", 0.15)),
+        ({"total_campaigns": 20, "payment_rate": 0.5, "total_revenue": 0}, ("medium", 0.35)),
+        ({"total_campaigns": 10, "payment_rate": 0.5, "total_revenue": 0}, ("high", 0.60)),
+    ])
+    def test_churn_risk_bands(self, agent, data, expected):
+        """Scores of exactly 70 and 50 fall in the lower-risk band."""
+        section = agent._generate_section_13(data, "2024-01-01T00:00:00Z")
+        payload = json.loads(re.search(r"```json\n(.*?)\n```", section, re.S).group(1))
+
+        churn = payload["churn_risk"]
+        assert (churn["risk_level"], churn["probability"]) == expected
+
+    def test_json_block_matches_stdlib_formatting(self, agent, monkeypatch):
+        """The orjson fast path renders exactly like json.dumps(indent=2)."""
+        import agents.customer_intelligence_agent as module
+
+        payload = {"name": "دیجی‌کالا", "rate": 0.35, "count": 3, "empty": [], "nested": {}, "nps": None}
+
+        fast = agent._render_section("## 1. Test", "Unit test", payload)
+        monkeypatch.setattr(module, "ORJSON_AVAILABLE", False)
+        assert fast == agent._render_section("## 1. Test", "Unit test", payload)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -1,13 +1,18 @@
 """Tests for CodeReviewAgent."""
 
+import ast
+import asyncio
 import json
 import os
 import tempfile
+import threading
 import pytest
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-from agents.code_review_agent import CodeReviewAgent, FileMetrics, SKIP_DIRS
+from agents.code_review_agent import (
+    AST_CACHE_SIZE, CodeReviewAgent, FileMetrics, SKIP_DIRS, _ast_cache, _walk_nodes,
+)
 
 
 # ─── FileMetrics Tests ────────────────────────────────────────────
@@ -54,6 +59,26 @@ def standalone():
         assert m.function_count == 0  # Can't parse
         assert m.class_count == 0
 
+    def test_ast_cache_reuses_tree_by_digest(self):
+        _ast_cache.clear()
+        source = "def cached():\n    return 1\n"
+        first = FileMetrics(source)
+        second = FileMetrics(source)
+        assert second._tree is first._tree
+        assert second.function_count == 1
+
+        for i in range(AST_CACHE_SIZE):
+            FileMetrics(f"x = {i}\n")
+        assert len(_ast_cache) == AST_CACHE_SIZE
+        assert FileMetrics(source)._tree is not first._tree
+
+    def test_walk_nodes_matches_ast_walk(self):
+        tree = ast.parse(
+            "import os\nclass A:\n    def f(self, x=[]):\n        return [y for y in x]\n"
+            "async def g():\n    await h()\n"
+        )
+        assert _walk_nodes(tree) == list(ast.walk(tree))
+
     def test_to_dict(self):
         m = FileMetrics("x = 1\n# comment\n")
         d = m.to_dict()
@@ -225,6 +250,16 @@ class TestCodeReviewAgent:
         review = report["file_reviews"][0]
         assert review["overall_score"] >= 8  # Clean file should score well
 
+    def test_static_review_reused_for_unchanged_files(self, agent, temp_project):
+        files = agent.discover_files()
+        with patch.object(agent.llm, "is_available", return_value=False):
+            first = agent.review_files(files, parallel=False)
+            with patch.object(agent, "_static_review") as static_review:
+                second = agent.review_files(files, parallel=False)
+
+        static_review.assert_not_called()
+        assert second["file_reviews"] == first["file_reviews"]
+
     def test_empty_file_skipped(self, agent, temp_project):
         empty = temp_project / "empty.py"
         empty.write_text("")
@@ -287,6 +322,29 @@ class TestCodeReviewAgentLLM:
     def agent(self, temp_project):
         return CodeReviewAgent(project_root=str(temp_project))
 
+    def test_truncate_source_loads_encoding_lazily(self, monkeypatch):
+        from agents import code_review_agent
+
+        encoding = MagicMock()
+        encoding.encode.return_value = list(range(code_review_agent.MAX_INPUT_TOKENS + 1))
+        encoding.decode.return_value = "head"
+        get_encoding = MagicMock(return_value=encoding)
+        monkeypatch.setattr(code_review_agent, "TIKTOKEN_AVAILABLE", True)
+        monkeypatch.setattr(code_review_agent, "tiktoken", MagicMock(get_encoding=get_encoding), raising=False)
+        code_review_agent._get_token_encoding.cache_clear()
+        try:
+            assert code_review_agent._truncate_source("x = 1\n") == ("x = 1\n", "")
+            get_encoding.assert_not_called()
+
+            source = "y" * (code_review_agent.MAX_INPUT_TOKENS + 1)
+            truncated, note = code_review_agent._truncate_source(source)
+            code_review_agent._truncate_source(source)
+        finally:
+            code_review_agent._get_token_encoding.cache_clear()
+
+        assert truncated == "head" and "TRUNCATED" in note
+        get_encoding.assert_called_once_with("cl100k_base")
+
     def test_llm_review_called_when_available(self, agent, temp_project):
         mock_response = json.dumps({
             "file_path": "sample.py",
@@ -314,6 +372,105 @@ class TestCodeReviewAgentLLM:
             # Should still produce a report via static fallback
             assert report["files_reviewed"] == 1
 
+    def test_small_files_reviewed_in_one_batch(self, agent, temp_project):
+        (temp_project / "other.py").write_text('"""Other."""\nX = 1\n')
+        mock_response = json.dumps({"reviews": [
+            {"overall_score": 8, "summary": "First.", "findings": [], "strengths": []},
+            {"overall_score": 7, "summary": "Second.", "findings": [], "strengths": []},
+        ]})
+
+        with patch.object(agent.llm, "is_available", return_value=True), \
+             patch.object(agent.llm, "generate", return_value=mock_response) as generate:
+            files = [temp_project / "sample.py", temp_project / "other.py"]
+            report = agent.review_files(files, parallel=False)
+
+            assert generate.call_count == 1
+            reviews = {r["file_path"]: r for r in report["file_reviews"]}
+            assert reviews["sample.py"]["overall_score"] == 8
+            assert reviews["other.py"]["overall_score"] == 7
+            assert reviews["other.py"]["metrics"]["total_lines"] == 2
+
+    def test_batch_count_mismatch_reviews_individually(self, agent, temp_project):
+        (temp_project / "other.py").write_text('"""Other."""\nX = 1\n')
+        batch_response = json.dumps({"reviews": [{"overall_score": 8, "findings": []}]})
+        single_response = json.dumps({"overall_score": 6, "findings": []})
+
+        with patch.object(agent.llm, "is_available", return_value=True), \
+             patch.object(agent.llm, "generate",
+                          side_effect=[batch_response, single_response, single_response]) as generate:
+            files = [temp_project / "sample.py", temp_project / "other.py"]
+            report = agent.review_files(files, parallel=False)
+
+            assert generate.call_count == 3
+            assert report["files_reviewed"] == 2
+            assert all(r["overall_score"] == 6 for r in report["file_reviews"])
+
+    def test_parallel_review_runs_batches_in_worker_threads(self, agent, temp_project):
+        (temp_project / "big.py").write_text('"""Big."""\ndef f():\n    return 1\n' + "X = 1\n" * 1000)
+        mock_response = json.dumps({"overall_score": 9, "findings": [], "strengths": []})
+        callers = []
+
+        def generate(**kwargs):
+            callers.append(threading.get_ident())
+            return mock_response
+
+        with patch.object(agent.llm, "is_available", return_value=True), \
+             patch.object(agent.llm, "generate", side_effect=generate):
+            files = [temp_project / "sample.py", temp_project / "big.py"]
+            report = agent.review_files(files, parallel=True)
+
+        assert len(callers) == 2
+        assert threading.get_ident() not in callers
+        assert sorted(r["file_path"] for r in report["file_reviews"]) == ["big.py", "sample.py"]
+
+    def test_parallel_review_inside_running_loop_is_sequential(self, agent, temp_project):
+        (temp_project / "big.py").write_text('"""Big."""\ndef f():\n    return 1\n' + "X = 1\n" * 1000)
+        mock_response = json.dumps({"overall_score": 9, "findings": [], "strengths": []})
+        files = [temp_project / "sample.py", temp_project / "big.py"]
+
+        async def review():
+            return agent.review_files(files, parallel=True)
+
+        with patch.object(agent.llm, "is_available", return_value=True), \
+             patch.object(agent.llm, "generate", return_value=mock_response) as generate, \
+             patch.object(agent, "_review_all_async") as review_all_async:
+            report = asyncio.run(review())
+
+            review_all_async.assert_not_called()
+            assert generate.call_count == 2
+            assert report["files_reviewed"] == 2
+
+    def test_unchanged_file_review_is_cached(self, agent, temp_project):
+        mock_response = json.dumps({"overall_score": 9, "findings": [], "strengths": []})
+        files = [temp_project / "sample.py"]
+
+        with patch.object(agent.llm, "is_available", return_value=True), \
+             patch.object(agent.llm, "generate", return_value=mock_response) as generate:
+            agent.review_files(files, parallel=False)
+
+            # Trailing whitespace changes keep line numbers, so the review is reused
+            (temp_project / "sample.py").write_text(
+                '"""Sample."""  \ndef foo():\n    return 1\n\n'
+            )
+            fresh_agent = CodeReviewAgent(project_root=str(temp_project))
+            report = fresh_agent.review_files(files, parallel=False)
+
+            assert generate.call_count == 1
+            assert report["file_reviews"][0]["overall_score"] == 9
+            assert report["file_reviews"][0]["metrics"]["total_lines"] == 4
+
+    def test_data_module_skips_llm(self, agent, temp_project):
+        (temp_project / "table.py").write_text(
+            "TABLE = [\n" + "".join(f"    {i},\n" for i in range(150)) + "]\n"
+        )
+
+        with patch.object(agent.llm, "is_available", return_value=True), \
+             patch.object(agent.llm, "generate") as generate:
+            report = agent.review_files([temp_project / "table.py"], parallel=False)
+
+            generate.assert_not_called()
+            assert report["files_reviewed"] == 1
+
     def test_llm_unavailable_uses_static(self, agent, temp_project):
         with patch.object(agent.llm, "is_available", return_value=False):
             files = [temp_project / "sample.py"]
@@ -0,0 +1,84 @@
+"""Unit tests for concurrent agent execution in the workflow graph."""
+
+import asyncio
+from typing import Optional, TypedDict
+
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import StateGraph, END
+
+from agents.base_agent import BaseAgent
+from graph import run_agents_concurrently, run_agents_in_threads
+
+
+class RecordingAgent(BaseAgent):
+    """Agent that writes one key and optionally records an error."""
+
+    def __init__(self, name, key, error=None):
+        super().__init__(name)
+        self.key = key
+        self.error = error
+
+    def execute(self, state):
+        state[self.key] = {"by": self.agent_name}
+        if self.error:
+            self._add_error(state, self.error)
+        return state
+
+
+class MiniState(TypedDict):
+    brand_name: str
+    insights: Optional[dict]
+    customer_intelligence: Optional[dict]
+    errors: list
+
+
+def _agents():
+    return {
+        "insights": RecordingAgent("Insights", "insights", error="no data"),
+        "customer_intelligence": RecordingAgent("Customers", "customer_intelligence"),
+    }
+
+
+def _initial_state():
+    return {"brand_name": "Acme", "insights": None, "customer_intelligence": None,
+            "errors": [{"agent": "Earlier", "error": "old"}]}
+
+
+class TestConcurrentAgents:
+    """Test cases for running independent agents in one graph node."""
+
+    def test_threads_and_coroutines_return_the_same_update(self):
+        """Both runners return each agent's key plus merged errors, leaving state untouched."""
+        state = _initial_state()
+
+        threaded = run_agents_in_threads(_agents(), state)
+        gathered = asyncio.run(run_agents_concurrently(_agents(), state))
+
+        assert threaded == gathered == {
+            "insights": {"by": "Insights"},
+            "customer_intelligence": {"by": "Customers"},
+            "errors": [{"agent": "Earlier", "error": "old"}, {"agent": "Insights", "error": "no data"}],
+        }
+        assert state == _initial_state()
+
+    def test_node_runs_under_invoke_and_ainvoke(self):
+        """The node works from a synchronous run and inside a running event loop."""
+        agents = _agents()
+        workflow = StateGraph(MiniState)
+        workflow.add_node("insights_generation", RunnableLambda(
+            lambda state: run_agents_in_threads(agents, state),
+            afunc=lambda state: run_agents_concurrently(agents, state),
+        ))
+        workflow.set_entry_point("insights_generation")
+        workflow.add_edge("insights_generation", END)
+        app = workflow.compile()
+
+        async def run_async():
+            return await app.ainvoke(_initial_state())
+
+        sync_result = app.invoke(_initial_state())
+        async_result = asyncio.run(run_async())
+
+        assert sync_result == async_result
+        assert sync_result["insights"] == {"by": "Insights"}
+        assert len(sync_result["errors"]) == 2
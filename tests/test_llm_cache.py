@@ -0,0 +1,52 @@
+"""Unit tests for the LLM response cache."""
+
+import pytest
+from utils.llm_cache import LLMResponseCache
+
+
+class TestLLMResponseCache:
+    """Test cases for LLMResponseCache."""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Create a cache backed by a temporary database."""
+        return LLMResponseCache(db_path=str(tmp_path / "llm.sqlite3"), max_entries=2)
+
+    def test_key_uses_exact_prompt_text(self):
+        """Test prompts differing only in whitespace or mode get distinct keys."""
+        a = LLMResponseCache.make_key("m", "if x:\n    a()\nb()", "sys", 0.7, 100, True)
+        b = LLMResponseCache.make_key("m", "if x:\n    a()\n    b()", "sys", 0.7, 100, True)
+        c = LLMResponseCache.make_key("m", "if x:\n    a()\nb()", "sys", 0.7, 100, False)
+
+        assert a == LLMResponseCache.make_key("m", "if x:\n    a()\nb()", "sys", 0.7, 100, True)
+        assert len({a, b, c}) == 3
+
+    def test_get_and_set(self, cache):
+        """Test a stored response is returned and misses return None."""
+        cache.set("k1", '{"a": 1}')
+
+        assert cache.get("k1") == '{"a": 1}'
+        assert cache.get("missing") is None
+
+    def test_lru_eviction_falls_back_to_database(self, cache):
+        """Test entries evicted from memory are served from SQLite."""
+        cache.set("k1", "one")
+        cache.set("k2", "two")
+        cache.set("k3", "three")
+
+        assert "k1" not in cache._memory
+        assert cache.get("k1") == "one"
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test responses survive a new cache instance."""
+        db_path = str(tmp_path / "llm.sqlite3")
+        LLMResponseCache(db_path=db_path).set("k", "v")
+
+        assert LLMResponseCache(db_path=db_path).get("k") == "v"
+
+    def test_expired_entries_are_ignored(self, tmp_path):
+        """Test persisted entries older than the TTL are misses."""
+        db_path = str(tmp_path / "llm.sqlite3")
+        LLMResponseCache(db_path=db_path).set("k", "v")
+
+        assert LLMResponseCache(db_path=db_path, ttl_hours=0).get("k") is None
@@ -245,6 +245,36 @@ class TestWebSearchScraper:
         assert result["page_title"] == "Test Brand"
         assert result["meta_data"]["description"] == "Test description"
 
+    @patch('scrapers.base_scraper.httpx.Client')
+    def test_http_client_reused_across_requests(self, mock_client, scraper, monkeypatch):
+        """One pooled client serves every request the scraper makes."""
+        from config.settings import settings
+
+        monkeypatch.setattr(settings, "RATE_LIMIT_DELAY", 0)
+        mock_client.return_value.request.return_value = Mock(status_code=200)
+
+        scraper._make_request("https://test.com/a")
+        scraper._make_request("https://test.com/b")
+
+        mock_client.assert_called_once()
+        assert mock_client.return_value.request.call_count == 2
+
+    @patch('scrapers.base_scraper.httpx.Client')
+    def test_close_releases_http_client(self, mock_client, scraper, monkeypatch):
+        """close() shuts the pooled client; the next request opens a new one."""
+        from config.settings import settings
+
+        monkeypatch.setattr(settings, "RATE_LIMIT_DELAY", 0)
+        mock_client.return_value.request.return_value = Mock(status_code=200)
+
+        scraper.close()  # Nothing to close yet
+        with scraper:
+            scraper._make_request("https://test.com/a")
+        mock_client.return_value.close.assert_called_once()
+
+        scraper._make_request("https://test.com/b")
+        assert mock_client.call_count == 2
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -1,6 +1,7 @@
 """Utilities - Helper functions and clients."""
 
 from utils.llm_client import LLMClient, llm_client
+from utils.llm_cache import LLMResponseCache
 from utils.logger import get_logger
 from utils.helpers import (
     generate_timestamp,
@@ -27,6 +28,7 @@ __all__ = [
     # LLM Client
     "LLMClient",
     "llm_client",
+    "LLMResponseCache",
     # Logger
     "get_logger",
     # Helpers
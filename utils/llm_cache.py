@@ -0,0 +1,153 @@
+"""Response cache for LLM calls."""
+
+import hashlib
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LLMResponseCache:
+    """Two-tier cache for LLM responses.
+
+    Tier 1 is an in-process LRU; tier 2 is a SQLite file shared across runs.
+    Keys hash the full request (model, exact prompt text, sampling parameters).
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = "data/cache/llm_cache.sqlite3",
+        max_entries: int = 1024,
+        ttl_hours: float = 24
+    ):
+        """Initialize the cache.
+
+        Args:
+            db_path: SQLite file for the persistent tier (None for memory only)
+            max_entries: Maximum entries kept in the in-process LRU
+            ttl_hours: Maximum age of a persisted entry
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_hours * 3600
+        self.lock = Lock()
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._db = None
+
+        if db_path:
+            try:
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses "
+                    "(key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache database unavailable, using memory only: {e}")
+                self._db = None
+
+    @staticmethod
+    def make_key(
+        model: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        json_mode: bool
+    ) -> str:
+        """Compute the cache key for a request.
+
+        Args:
+            model: Model identifier
+            prompt: The user prompt
+            system_prompt: Optional system prompt
+            temperature: Sampling temperature
+            max_tokens: Max tokens for the completion
+            json_mode: Whether JSON output was requested
+
+        Returns:
+            Hex digest identifying the request
+        """
+        parts = (
+            model,
+            system_prompt or "",
+            prompt,
+            repr(temperature),
+            str(max_tokens),
+            "json" if json_mode else "text",
+        )
+        return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=32).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a cached response.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Cached response text or None on a miss
+        """
+        with self.lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+            if self._db is None:
+                return None
+
+            try:
+                row = self._db.execute(
+                    "SELECT response, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache lookup failed: {e}")
+                return None
+
+            if row is None or time.time() - row[1] > self.ttl_seconds:
+                return None
+
+            self._remember(key, row[0])
+            return row[0]
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response in both tiers.
+
+        Args:
+            key: Cache key from make_key()
+            response: Response text to cache
+        """
+        with self.lock:
+            self._remember(key, response)
+
+            if self._db is None:
+                return
+
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created) VALUES (?, ?, ?)",
+                    (key, response, time.time())
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache write failed: {e}")
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self.lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def _remember(self, key: str, response: str) -> None:
+        """Insert into the in-process LRU (caller holds the lock)."""
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
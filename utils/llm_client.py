@@ -1,15 +1,24 @@
 """OpenRouter API client wrapper for Gemini 3 Pro."""
 
+import asyncio
 import json
 import re
-from typing import Optional, Dict, Any
-from openai import OpenAI
+from typing import Optional, Dict, Any, List, Tuple
+from openai import AsyncOpenAI, OpenAI
 from config.settings import settings
 from utils.logger import get_logger
 from utils.exceptions import APIKeyError
+from utils.llm_cache import LLMResponseCache
 
 logger = get_logger(__name__)
 
+JSON_INSTRUCTION = "IMPORTANT: Return ONLY valid JSON. No explanations, no markdown formatting, just pure JSON."
+
+# Marks a content block as a reusable prefix. OpenRouter forwards it to
+# providers with explicit caching (Anthropic, Gemini); OpenAI caches
+# long identical prefixes automatically and ignores the field.
+_CACHE_CONTROL = {"type": "ephemeral"}
+
 # Import rate limiter (avoid circular import)
 _openrouter_limiter = None
 
@@ -35,15 +44,28 @@ class LLMClient:
                 base_url="https://openrouter.ai/api/v1",
                 api_key=settings.OPENROUTER_API_KEY,
             )
+            # Async twin of the client for agents running under asyncio
+            self.async_client = AsyncOpenAI(
+                base_url="https://openrouter.ai/api/v1",
+                api_key=settings.OPENROUTER_API_KEY,
+            )
             logger.info(f"OpenRouter API client initialized with model: {settings.MODEL_NAME}")
         else:
             self.client = None
+            self.async_client = None
             logger.warning("OpenRouter API client NOT initialized - API key missing or invalid")
 
         self.model = settings.MODEL_NAME
         self.max_tokens = settings.MAX_TOKENS
         self.temperature = settings.TEMPERATURE
 
+        # Only needed when calls can be made; avoids creating the database otherwise
+        self.cache = LLMResponseCache(
+            db_path=settings.LLM_CACHE_PATH,
+            max_entries=settings.LLM_CACHE_SIZE,
+            ttl_hours=settings.CACHE_TTL_HOURS
+        ) if settings.LLM_CACHE_ENABLED and self.api_key_valid else None
+
     def is_available(self) -> bool:
         """Check if OpenRouter API is available.
 
@@ -85,13 +107,221 @@ class LLMClient:
                     provider="OpenRouter"
                 )
 
-    def generate(
+    def _build_request(
+        self,
+        prompt: Optional[str],
+        system_prompt: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        json_mode: bool,
+        messages: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Build chat completion request parameters.
+
+        Args:
+            prompt: The user prompt (ignored when messages is given)
+            system_prompt: Optional system prompt (ignored when messages is given)
+            temperature: Optional temperature override
+            max_tokens: Optional max tokens override
+            json_mode: If True, ensures JSON output
+            messages: Optional chat messages; a message with "cache": True is
+                marked as a cacheable prefix
+
+        Returns:
+            Keyword arguments for chat.completions.create
+        """
+        if messages:
+            request_messages = []
+            for message in messages:
+                if message.get("cache"):
+                    request_messages.append({
+                        "role": message["role"],
+                        "content": [{"type": "text", "text": message["content"], "cache_control": _CACHE_CONTROL}]
+                    })
+                else:
+                    request_messages.append({"role": message["role"], "content": message["content"]})
+
+            # Keep the cached prefix intact by sending the JSON instruction last
+            if json_mode:
+                request_messages.append({"role": "user", "content": JSON_INSTRUCTION})
+        else:
+            request_messages = []
+
+            # Add system prompt if provided
+            if system_prompt:
+                request_messages.append({"role": "system", "content": system_prompt})
+
+            # Add user prompt
+            if json_mode:
+                # Append JSON instruction to the prompt
+                request_messages.append({"role": "user", "content": f"{prompt}\n\n{JSON_INSTRUCTION}"})
+            else:
+                request_messages.append({"role": "user", "content": prompt})
+
+        return {
+            "model": self.model,
+            "messages": request_messages,
+            "max_tokens": max_tokens or self.max_tokens,
+            "temperature": temperature or self.temperature,
+        }
+
+    def _cache_key(
         self,
         prompt: str,
+        system_prompt: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        json_mode: bool
+    ) -> str:
+        """Compute the response cache key for a request.
+
+        Args:
+            prompt: The user prompt
+            system_prompt: Optional system prompt
+            temperature: Optional temperature override
+            max_tokens: Optional max tokens override
+            json_mode: If True, ensures JSON output
+
+        Returns:
+            Cache key string
+        """
+        return self.cache.make_key(
+            self.model,
+            prompt,
+            system_prompt,
+            temperature or self.temperature,
+            max_tokens or self.max_tokens,
+            json_mode
+        )
+
+    def _resolve_cached(
+        self,
+        prompt: Optional[str],
+        system_prompt: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        json_mode: bool,
+        cache: bool,
+        messages: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Look up a request in the response cache.
+
+        Args:
+            prompt: The user prompt
+            system_prompt: Optional system prompt
+            temperature: Optional temperature override
+            max_tokens: Optional max tokens override
+            json_mode: If True, ensures JSON output
+            cache: If False, skip the cache entirely
+            messages: Optional chat messages used instead of prompt/system_prompt
+
+        Returns:
+            (cache key, cached response) tuple; the key is None when caching
+            is off and the response is None on a miss
+        """
+        if not cache or self.cache is None:
+            return None, None
+
+        if messages:
+            prompt = "\n\n".join(f"{m['role']}: {m['content']}" for m in messages)
+            system_prompt = None
+
+        cache_key = self._cache_key(prompt, system_prompt, temperature, max_tokens, json_mode)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info("LLM cache hit, skipping OpenRouter call")
+        return cache_key, cached
+
+    def _store_response(
+        self,
+        response_text: str,
+        json_mode: bool,
+        cache_key: Optional[str]
+    ) -> str:
+        """Validate a completion's text and cache it.
+
+        Args:
+            response_text: Text of the completion
+            json_mode: If True, repair and validate the text as JSON
+            cache_key: Key from _resolve_cached(), or None to skip caching
+
+        Returns:
+            The response text (cleaned JSON in json_mode)
+        """
+        # Validate JSON if json_mode is enabled
+        if json_mode:
+            response_text = self._clean_json_response(response_text)
+
+        logger.info("OpenRouter API call successful")
+
+        # Don't cache unrecoverable JSON so the next call retries
+        if cache_key and response_text and response_text != "{}":
+            self.cache.set(cache_key, response_text)
+
+        return response_text
+
+    def _clean_json_response(self, response_text: str) -> str:
+        """Validate a JSON response, repairing common LLM formatting mistakes.
+
+        Args:
+            response_text: Raw response text from the model
+
+        Returns:
+            Valid JSON text, or "{}" if it could not be recovered
+        """
+        try:
+            json.loads(response_text)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Invalid JSON response, attempting to extract: {e}")
+            # Try to extract JSON from markdown code blocks
+            if "```json" in response_text:
+                response_text = response_text.split("```json")[1].split("```")[0].strip()
+            elif "```" in response_text:
+                response_text = response_text.split("```")[1].split("```")[0].strip()
+            # Validate again
+            try:
+                json.loads(response_text)
+            except json.JSONDecodeError:
+                # Strip trailing commas before } or ] (common LLM mistake)
+                cleaned = re.sub(r',\s*([}\]])', r'\1', response_text)
+                try:
+                    json.loads(cleaned)
+                    response_text = cleaned
+                    logger.info("Fixed trailing comma(s) in JSON response")
+                except json.JSONDecodeError:
+                    logger.error("Failed to extract valid JSON from response")
+                    return "{}"
+
+        return response_text
+
+    def _handle_api_error(self, e: Exception) -> None:
+        """Log an API error and convert authentication failures to APIKeyError.
+
+        Args:
+            e: Exception raised by the OpenAI client
+
+        Raises:
+            APIKeyError: If the error is an authentication failure
+        """
+        error_str = str(e)
+        logger.error(f"OpenRouter API error: {e}")
+
+        # Check for authentication errors (401)
+        if "401" in error_str or "authentication" in error_str.lower() or "user not found" in error_str.lower():
+            raise APIKeyError(
+                message=f"Authentication failed during API call: {error_str}",
+                provider="OpenRouter"
+            )
+
+    def generate(
+        self,
+        prompt: Optional[str] = None,
         system_prompt: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
-        json_mode: bool = False
+        json_mode: bool = False,
+        cache: bool = True,
+        messages: Optional[List[Dict[str, Any]]] = None
     ) -> str:
         """Generate a response from Gemini via OpenRouter.
 
@@ -101,6 +331,10 @@ class LLMClient:
             temperature: Optional temperature override
             max_tokens: Optional max tokens override
             json_mode: If True, ensures JSON output
+            cache: If True, reuse a cached response for an identical request
+            messages: Optional chat messages used instead of prompt/system_prompt.
+                Put static messages first and flag them "cache": True so
+                providers can reuse the prefix across calls
 
         Returns:
             The generated response text
@@ -115,28 +349,16 @@ class LLMClient:
                 provider="OpenRouter"
             )
 
-        try:
-            messages = []
-
-            # Add system prompt if provided
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-
-            # Add user prompt
-            messages.append({"role": "user", "content": prompt})
-
-            # Build request parameters
-            kwargs: Dict[str, Any] = {
-                "model": self.model,
-                "messages": messages,
-                "max_tokens": max_tokens or self.max_tokens,
-                "temperature": temperature or self.temperature,
-            }
+        cache_key, cached = self._resolve_cached(
+            prompt, system_prompt, temperature, max_tokens, json_mode, cache, messages
+        )
+        if cached is not None:
+            return cached
 
-            # Add JSON mode instruction if requested
-            if json_mode:
-                # Append JSON instruction to the prompt
-                messages[-1]["content"] = f"{prompt}\n\nIMPORTANT: Return ONLY valid JSON. No explanations, no markdown formatting, just pure JSON."
+        try:
+            kwargs = self._build_request(
+                prompt, system_prompt, temperature, max_tokens, json_mode, messages
+            )
 
             logger.info(f"Calling OpenRouter API with model {self.model}")
 
@@ -147,47 +369,77 @@ class LLMClient:
 
             response = self.client.chat.completions.create(**kwargs)
 
-            response_text = response.choices[0].message.content
-
-            # Validate JSON if json_mode is enabled
-            if json_mode:
-                try:
-                    json.loads(response_text)
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Invalid JSON response, attempting to extract: {e}")
-                    # Try to extract JSON from markdown code blocks
-                    if "```json" in response_text:
-                        response_text = response_text.split("```json")[1].split("```")[0].strip()
-                    elif "```" in response_text:
-                        response_text = response_text.split("```")[1].split("```")[0].strip()
-                    # Validate again
-                    try:
-                        json.loads(response_text)
-                    except json.JSONDecodeError:
-                        # Strip trailing commas before } or ] (common LLM mistake)
-                        cleaned = re.sub(r',\s*([}\]])', r'\1', response_text)
-                        try:
-                            json.loads(cleaned)
-                            response_text = cleaned
-                            logger.info("Fixed trailing comma(s) in JSON response")
-                        except json.JSONDecodeError:
-                            logger.error("Failed to extract valid JSON from response")
-                            return "{}"
-
-            logger.info("OpenRouter API call successful")
-            return response_text
+            return self._store_response(
+                response.choices[0].message.content, json_mode, cache_key
+            )
 
         except Exception as e:
-            error_str = str(e)
-            logger.error(f"OpenRouter API error: {e}")
+            self._handle_api_error(e)
+            # Re-raise other errors
+            raise
 
-            # Check for authentication errors (401)
-            if "401" in error_str or "authentication" in error_str.lower() or "user not found" in error_str.lower():
-                raise APIKeyError(
-                    message=f"Authentication failed during API call: {error_str}",
-                    provider="OpenRouter"
-                )
+    async def generate_async(
+        self,
+        prompt: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+        cache: bool = True,
+        messages: Optional[List[Dict[str, Any]]] = None
+    ) -> str:
+        """Async variant of generate() that does not block the event loop.
+
+        Args:
+            prompt: The user prompt
+            system_prompt: Optional system prompt
+            temperature: Optional temperature override
+            max_tokens: Optional max tokens override
+            json_mode: If True, ensures JSON output
+            cache: If True, reuse a cached response for an identical request
+            messages: Optional chat messages used instead of prompt/system_prompt.
+                Put static messages first and flag them "cache": True so
+                providers can reuse the prefix across calls
+
+        Returns:
+            The generated response text
 
+        Raises:
+            Exception: If API call fails or API key is not available
+        """
+        # Check if API is available
+        if not self.is_available() or self.async_client is None:
+            raise APIKeyError(
+                message="Cannot generate: API key not configured or invalid",
+                provider="OpenRouter"
+            )
+
+        cache_key, cached = self._resolve_cached(
+            prompt, system_prompt, temperature, max_tokens, json_mode, cache, messages
+        )
+        if cached is not None:
+            return cached
+
+        try:
+            kwargs = self._build_request(
+                prompt, system_prompt, temperature, max_tokens, json_mode, messages
+            )
+
+            logger.info(f"Calling OpenRouter API (async) with model {self.model}")
+
+            # Apply rate limiting (the limiter blocks, so wait in a worker thread)
+            rate_limiter = _get_rate_limiter()
+            if rate_limiter:
+                await asyncio.to_thread(rate_limiter.acquire)
+
+            response = await self.async_client.chat.completions.create(**kwargs)
+
+            return self._store_response(
+                response.choices[0].message.content, json_mode, cache_key
+            )
+
+        except Exception as e:
+            self._handle_api_error(e)
             # Re-raise other errors
             raise
 